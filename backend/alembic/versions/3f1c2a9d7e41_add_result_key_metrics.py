@@ -0,0 +1,40 @@
+"""Add materialized key metrics of simulation results
+
+Summaries read the compact key_metrics column instead of result payloads.
+create_all at startup creates missing tables but never alters existing
+ones, so this and later migrations bring existing tables up to the models.
+Each skips steps already applied, so they are safe on databases that
+create_all built from current models.
+
+Revision ID: 3f1c2a9d7e41
+Revises:
+Create Date: 2026-10-19 12:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3f1c2a9d7e41'
+down_revision: Union[str, None] = None
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    inspector = sa.inspect(op.get_bind())
+    if 'simulation_results' not in inspector.get_table_names():
+        return
+    if 'key_metrics' not in {column['name'] for column in inspector.get_columns('simulation_results')}:
+        with op.batch_alter_table('simulation_results') as batch:
+            batch.add_column(sa.Column('key_metrics', sa.JSON(), nullable=True))
+
+
+def downgrade() -> None:
+    if 'simulation_results' not in sa.inspect(op.get_bind()).get_table_names():
+        return
+    with op.batch_alter_table('simulation_results') as batch:
+        batch.drop_column('key_metrics')
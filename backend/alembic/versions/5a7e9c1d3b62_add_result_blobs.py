@@ -0,0 +1,64 @@
+"""Store result payloads as shared blobs
+
+Creates result_blobs and points simulation_results rows at them through
+blob_hash. Payloads moved to blobs leave the inline data column empty, so it
+becomes nullable. Steps already applied are skipped.
+
+Revision ID: 5a7e9c1d3b62
+Revises: 3f1c2a9d7e41
+Create Date: 2026-10-19 12:10:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5a7e9c1d3b62'
+down_revision: Union[str, None] = '3f1c2a9d7e41'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    inspector = sa.inspect(op.get_bind())
+    tables = set(inspector.get_table_names())
+    if 'simulation_results' not in tables:
+        return
+
+    # Result rows point at shared blobs, so the blob table comes first
+    if 'result_blobs' not in tables:
+        op.create_table(
+            'result_blobs',
+            sa.Column('content_hash', sa.String(length=64), primary_key=True),
+            sa.Column('data', sa.JSON(), nullable=False),
+            sa.Column('size_bytes', sa.Integer(), nullable=False),
+            sa.Column('ref_count', sa.Integer(), nullable=False, server_default='0'),
+            sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now()),
+        )
+
+    columns = {column['name']: column for column in inspector.get_columns('simulation_results')}
+    if 'blob_hash' not in columns or not columns['data']['nullable']:
+        with op.batch_alter_table('simulation_results') as batch:
+            if 'blob_hash' not in columns:
+                batch.add_column(sa.Column('blob_hash', sa.String(length=64), nullable=True))
+                batch.create_foreign_key(
+                    'fk_simulation_results_blob_hash', 'result_blobs', ['blob_hash'], ['content_hash']
+                )
+            if not columns['data']['nullable']:
+                batch.alter_column('data', existing_type=sa.JSON(), nullable=True)
+
+    if 'ix_simulation_results_blob_hash' not in {index['name'] for index in inspector.get_indexes('simulation_results')}:
+        op.create_index('ix_simulation_results_blob_hash', 'simulation_results', ['blob_hash'])
+
+
+def downgrade() -> None:
+    if 'simulation_results' not in sa.inspect(op.get_bind()).get_table_names():
+        return
+    op.drop_index('ix_simulation_results_blob_hash', table_name='simulation_results')
+    with op.batch_alter_table('simulation_results') as batch:
+        batch.drop_constraint('fk_simulation_results_blob_hash', type_='foreignkey')
+        batch.drop_column('blob_hash')
+    op.drop_table('result_blobs')
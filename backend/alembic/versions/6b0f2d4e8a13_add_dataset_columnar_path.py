@@ -0,0 +1,37 @@
+"""Add the columnar copy path of imported datasets
+
+Datasets keep a typed Parquet copy of their upload, stored under
+columnar_path. Skipped when the column already exists.
+
+Revision ID: 6b0f2d4e8a13
+Revises: 5a7e9c1d3b62
+Create Date: 2026-10-19 12:20:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '6b0f2d4e8a13'
+down_revision: Union[str, None] = '5a7e9c1d3b62'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    inspector = sa.inspect(op.get_bind())
+    if 'imported_datasets' not in inspector.get_table_names():
+        return
+    if 'columnar_path' not in {column['name'] for column in inspector.get_columns('imported_datasets')}:
+        with op.batch_alter_table('imported_datasets') as batch:
+            batch.add_column(sa.Column('columnar_path', sa.String(), nullable=True))
+
+
+def downgrade() -> None:
+    if 'imported_datasets' not in sa.inspect(op.get_bind()).get_table_names():
+        return
+    with op.batch_alter_table('imported_datasets') as batch:
+        batch.drop_column('columnar_path')
@@ -0,0 +1,37 @@
+"""Add the stored preview of imported datasets
+
+The leading rows of an upload are captured at ingest into preview_data.
+Skipped when the column already exists.
+
+Revision ID: 71c3e5a9f024
+Revises: 6b0f2d4e8a13
+Create Date: 2026-10-19 12:30:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '71c3e5a9f024'
+down_revision: Union[str, None] = '6b0f2d4e8a13'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    inspector = sa.inspect(op.get_bind())
+    if 'imported_datasets' not in inspector.get_table_names():
+        return
+    if 'preview_data' not in {column['name'] for column in inspector.get_columns('imported_datasets')}:
+        with op.batch_alter_table('imported_datasets') as batch:
+            batch.add_column(sa.Column('preview_data', sa.JSON(), nullable=True))
+
+
+def downgrade() -> None:
+    if 'imported_datasets' not in sa.inspect(op.get_bind()).get_table_names():
+        return
+    with op.batch_alter_table('imported_datasets') as batch:
+        batch.drop_column('preview_data')
@@ -0,0 +1,79 @@
+"""Add background ingestion jobs
+
+Creates ingestion_jobs, or brings a table create_all made earlier up to
+date: jobs record where their upload is spooled and when the process
+running them last renewed its lease, so that jobs whose process stopped can
+be failed and their spool files removed. Steps already applied are skipped.
+
+Revision ID: 8b2e5d0c4a17
+Revises: c4d81e6a2b90
+Create Date: 2026-10-19 15:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8b2e5d0c4a17'
+down_revision: Union[str, None] = 'c4d81e6a2b90'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def lease_columns():
+    return [
+        sa.Column('spool_path', sa.String(), nullable=True),
+        sa.Column('heartbeat_at', sa.DateTime(timezone=True), nullable=True),
+    ]
+
+
+def upgrade() -> None:
+    inspector = sa.inspect(op.get_bind())
+    tables = set(inspector.get_table_names())
+
+    # Base tables such as users come from create_all at startup
+    if 'users' in tables and 'ingestion_jobs' not in tables:
+        op.create_table(
+            'ingestion_jobs',
+            sa.Column('id', postgresql.UUID(as_uuid=True), primary_key=True),
+            sa.Column('filename', sa.String(), nullable=False),
+            sa.Column('file_type', sa.String(), nullable=False),
+            sa.Column('file_size', sa.Integer(), nullable=False),
+            sa.Column(
+                'status',
+                sa.Enum('QUEUED', 'RUNNING', 'COMPLETED', 'FAILED', name='ingestionstatus'),
+                nullable=True
+            ),
+            sa.Column('stage', sa.String(), nullable=True),
+            sa.Column('stages', sa.JSON(), nullable=True),
+            sa.Column('progress', sa.Float(), nullable=True),
+            sa.Column('error_message', sa.Text(), nullable=True),
+            sa.Column('result', sa.JSON(), nullable=True),
+            sa.Column('dataset_id', postgresql.UUID(as_uuid=True), nullable=True),
+            *lease_columns(),
+            sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now()),
+            sa.Column('updated_at', sa.DateTime(timezone=True), nullable=True),
+            sa.Column('completed_at', sa.DateTime(timezone=True), nullable=True),
+            sa.Column('owner_id', postgresql.UUID(as_uuid=True), sa.ForeignKey('users.id'), nullable=False),
+        )
+        op.create_index('ix_ingestion_jobs_id', 'ingestion_jobs', ['id'])
+        op.create_index('ix_ingestion_jobs_owner_id', 'ingestion_jobs', ['owner_id'])
+        return
+
+    if 'ingestion_jobs' in tables:
+        existing = {column['name'] for column in inspector.get_columns('ingestion_jobs')}
+        missing = [column for column in lease_columns() if column.name not in existing]
+        if missing:
+            with op.batch_alter_table('ingestion_jobs') as batch:
+                for column in missing:
+                    batch.add_column(column)
+
+
+def downgrade() -> None:
+    if 'ingestion_jobs' in sa.inspect(op.get_bind()).get_table_names():
+        op.drop_table('ingestion_jobs')
+        sa.Enum(name='ingestionstatus').drop(op.get_bind(), checkfirst=True)
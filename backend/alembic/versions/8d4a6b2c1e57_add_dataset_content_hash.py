@@ -0,0 +1,40 @@
+"""Add the content hash of imported datasets
+
+Repeat uploads are recognized by the SHA-256 of their bytes, looked up
+through an index on content_hash. Steps already applied are skipped.
+
+Revision ID: 8d4a6b2c1e57
+Revises: 71c3e5a9f024
+Create Date: 2026-10-19 12:40:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8d4a6b2c1e57'
+down_revision: Union[str, None] = '71c3e5a9f024'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    inspector = sa.inspect(op.get_bind())
+    if 'imported_datasets' not in inspector.get_table_names():
+        return
+    if 'content_hash' not in {column['name'] for column in inspector.get_columns('imported_datasets')}:
+        with op.batch_alter_table('imported_datasets') as batch:
+            batch.add_column(sa.Column('content_hash', sa.String(length=64), nullable=True))
+    if 'ix_imported_datasets_content_hash' not in {index['name'] for index in inspector.get_indexes('imported_datasets')}:
+        op.create_index('ix_imported_datasets_content_hash', 'imported_datasets', ['content_hash'])
+
+
+def downgrade() -> None:
+    if 'imported_datasets' not in sa.inspect(op.get_bind()).get_table_names():
+        return
+    op.drop_index('ix_imported_datasets_content_hash', table_name='imported_datasets')
+    with op.batch_alter_table('imported_datasets') as batch:
+        batch.drop_column('content_hash')
@@ -0,0 +1,37 @@
+"""Add the series store path of imported datasets
+
+Observations are kept in a date-indexed series store under the key
+prefix series_path. Skipped when the column already exists.
+
+Revision ID: 9e5b7c3d2f68
+Revises: 8d4a6b2c1e57
+Create Date: 2026-10-19 12:50:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9e5b7c3d2f68'
+down_revision: Union[str, None] = '8d4a6b2c1e57'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    inspector = sa.inspect(op.get_bind())
+    if 'imported_datasets' not in inspector.get_table_names():
+        return
+    if 'series_path' not in {column['name'] for column in inspector.get_columns('imported_datasets')}:
+        with op.batch_alter_table('imported_datasets') as batch:
+            batch.add_column(sa.Column('series_path', sa.String(), nullable=True))
+
+
+def downgrade() -> None:
+    if 'imported_datasets' not in sa.inspect(op.get_bind()).get_table_names():
+        return
+    with op.batch_alter_table('imported_datasets') as batch:
+        batch.drop_column('series_path')
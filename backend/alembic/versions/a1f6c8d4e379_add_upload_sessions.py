@@ -0,0 +1,67 @@
+"""Add resumable upload sessions
+
+Creates upload_sessions and widens ingestion_jobs.file_size to BIGINT, as
+resumable uploads accept archives larger than 2 GB. Steps already applied
+are skipped.
+
+Revision ID: a1f6c8d4e379
+Revises: 8b2e5d0c4a17
+Create Date: 2026-10-19 15:30:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a1f6c8d4e379'
+down_revision: Union[str, None] = '8b2e5d0c4a17'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    inspector = sa.inspect(op.get_bind())
+    tables = set(inspector.get_table_names())
+
+    # Base tables such as users come from create_all at startup
+    if 'users' in tables and 'upload_sessions' not in tables:
+        op.create_table(
+            'upload_sessions',
+            sa.Column('id', postgresql.UUID(as_uuid=True), primary_key=True),
+            sa.Column('filename', sa.String(), nullable=False),
+            sa.Column('file_type', sa.String(), nullable=False),
+            sa.Column('total_size', sa.BigInteger(), nullable=False),
+            sa.Column('received_bytes', sa.BigInteger(), nullable=True),
+            sa.Column('sha256', sa.String(length=64), nullable=True),
+            sa.Column('spool_path', sa.String(), nullable=False),
+            sa.Column('description', sa.Text(), nullable=True),
+            sa.Column('basin_polygon', sa.JSON(), nullable=True),
+            sa.Column('status', sa.Enum('UPLOADING', 'COMPLETED', name='uploadsessionstatus'), nullable=True),
+            sa.Column('job_id', postgresql.UUID(as_uuid=True), nullable=True),
+            sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now()),
+            sa.Column('updated_at', sa.DateTime(timezone=True), nullable=True),
+            sa.Column('expires_at', sa.DateTime(timezone=True), nullable=False),
+            sa.Column('owner_id', postgresql.UUID(as_uuid=True), sa.ForeignKey('users.id'), nullable=False),
+        )
+        op.create_index('ix_upload_sessions_id', 'upload_sessions', ['id'])
+        op.create_index('ix_upload_sessions_owner_id', 'upload_sessions', ['owner_id'])
+
+    if 'ingestion_jobs' in tables:
+        file_size = next(column for column in inspector.get_columns('ingestion_jobs') if column['name'] == 'file_size')
+        if not isinstance(file_size['type'], sa.BigInteger):
+            with op.batch_alter_table('ingestion_jobs') as batch:
+                batch.alter_column('file_size', existing_type=sa.Integer(), type_=sa.BigInteger())
+
+
+def downgrade() -> None:
+    tables = set(sa.inspect(op.get_bind()).get_table_names())
+    if 'ingestion_jobs' in tables:
+        with op.batch_alter_table('ingestion_jobs') as batch:
+            batch.alter_column('file_size', existing_type=sa.BigInteger(), type_=sa.Integer())
+    if 'upload_sessions' in tables:
+        op.drop_table('upload_sessions')
+        sa.Enum(name='uploadsessionstatus').drop(op.get_bind(), checkfirst=True)
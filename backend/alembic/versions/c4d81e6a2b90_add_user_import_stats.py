@@ -0,0 +1,53 @@
+"""Add per-user import counters
+
+Creates user_import_stats, whose rows are built from a user's datasets the
+first time their counters are needed, and the (owner, created_at) index
+that counts recent uploads. Steps already applied are skipped.
+
+Revision ID: c4d81e6a2b90
+Revises: 9e5b7c3d2f68
+Create Date: 2026-10-19 16:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c4d81e6a2b90'
+down_revision: Union[str, None] = '9e5b7c3d2f68'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    inspector = sa.inspect(op.get_bind())
+    tables = set(inspector.get_table_names())
+
+    # Base tables such as users come from create_all at startup
+    if 'users' in tables and 'user_import_stats' not in tables:
+        op.create_table(
+            'user_import_stats',
+            sa.Column('owner_id', postgresql.UUID(as_uuid=True), sa.ForeignKey('users.id'), primary_key=True),
+            sa.Column('file_type', sa.String(), primary_key=True),
+            sa.Column('dataset_count', sa.Integer(), nullable=False, server_default='0'),
+            sa.Column('active_count', sa.Integer(), nullable=False, server_default='0'),
+            sa.Column('total_bytes', sa.BigInteger(), nullable=False, server_default='0'),
+            sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.func.now()),
+        )
+
+    if 'imported_datasets' in tables and 'ix_imported_datasets_owner_created' not in {
+        index['name'] for index in inspector.get_indexes('imported_datasets')
+    }:
+        op.create_index('ix_imported_datasets_owner_created', 'imported_datasets', ['owner_id', 'created_at'])
+
+
+def downgrade() -> None:
+    tables = set(sa.inspect(op.get_bind()).get_table_names())
+    if 'imported_datasets' in tables:
+        op.drop_index('ix_imported_datasets_owner_created', table_name='imported_datasets')
+    if 'user_import_stats' in tables:
+        op.drop_table('user_import_stats')
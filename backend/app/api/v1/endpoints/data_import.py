@@ -1,21 +1,41 @@
-from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, Form, status
+from fastapi import APIRouter, BackgroundTasks, Depends, Header, HTTPException, Request, Response, UploadFile, File, Form, Query, status
 from fastapi.responses import JSONResponse
 from sqlalchemy.orm import Session
 from typing import List, Optional, Dict, Any
 from uuid import UUID
+import asyncio
 import pandas as pd
-import io
+import json
 import logging
+import os
 from datetime import datetime
 
+from app.core.config import settings
 from app.core.database import get_db
 from app.core.auth import get_current_user
+from app.schemas.data_import import UploadSessionCreate
 from app.schemas.user import User
-from app.services.data_import_service import DataImportService
+from app.core.serialization import FastJSONResponse
+from app.core.workers import run_in_process
+from app.services.data_import_service import DataImportService, spool_to_file, validate_upload
+from app.services.gridded_climate import GRIDDED_FILE_TYPE, describe_grid
+from app.services.ingestion_service import IngestionJobService, run_ingestion_jobs
+from app.services.preprocessing import FILL_METHODS
+from app.services.timeseries_store import RESAMPLE_UNITS, AGGREGATIONS
+from app.services.upload_sessions import UploadOffsetMismatch, UploadSessionService, parse_content_range
 
 logger = logging.getLogger(__name__)
 router = APIRouter()
 
+# Largest accepted upload
+MAX_UPLOAD_BYTES = 50 * 1024 * 1024
+
+# Largest accepted gridded upload; grids are read memory-mapped, never whole
+MAX_GRIDDED_UPLOAD_BYTES = 2 * 1024 * 1024 * 1024
+
+# Rows returned in a validation preview
+VALIDATION_PREVIEW_ROWS = 10
+
 # Supported file types
 SUPPORTED_FILE_TYPES = {
     'meteorological': {
@@ -42,6 +62,12 @@ SUPPORTED_FILE_TYPES = {
         'description': 'Basin characteristics and parameters',
         'required_columns': ['parameter', 'value'],
         'optional_columns': ['unit', 'source', 'confidence']
+    },
+    GRIDDED_FILE_TYPE: {
+        'description': 'Gridded climate data (NetCDF 3, time x lat x lon), stored as basin-average series',
+        'required_columns': [],
+        'optional_columns': ['basin_mask'],
+        'format': 'netcdf'
     }
 }
 
@@ -52,20 +78,30 @@ async def get_supported_file_types():
     """
     return {
         "supported_types": SUPPORTED_FILE_TYPES,
-        "supported_formats": ["csv", "txt"],
-        "max_file_size_mb": 50
+        "supported_formats": ["csv", "txt", "nc"],
+        "max_file_size_mb": MAX_UPLOAD_BYTES // (1024 * 1024),
+        "max_gridded_file_size_mb": MAX_GRIDDED_UPLOAD_BYTES // (1024 * 1024)
     }
 
-@router.post("/upload")
+@router.post("/upload", status_code=status.HTTP_202_ACCEPTED)
 async def upload_data_files(
+    background_tasks: BackgroundTasks,
     files: List[UploadFile] = File(...),
     file_types: List[str] = Form(...),
     description: Optional[str] = Form(None),
+    basin_polygon: Optional[str] = Form(None),
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
     """
-    Upload and validate data files for hydrological modeling
+    Upload data files for hydrological modeling.
+
+    Each file is spooled and queued as an ingestion job, returned with its
+    id; parsing, profiling, columnar conversion and indexing run in the
+    background on the worker pool. Poll ``/jobs/{job_id}`` for progress.
+
+    Gridded climate files are averaged over ``basin_polygon``, a JSON list
+    of [lon, lat] vertices, or over their own basin mask when it is omitted.
     """
     if len(files) != len(file_types):
         raise HTTPException(
@@ -73,64 +109,305 @@ async def upload_data_files(
             detail="Number of files must match number of file types"
         )
     
-    data_import_service = DataImportService(db)
-    results = []
-    
-    for file, file_type in zip(files, file_types):
+    polygon = None
+    if basin_polygon:
         try:
-            # Validate file type
-            if file_type not in SUPPORTED_FILE_TYPES:
-                results.append({
-                    "filename": file.filename,
-                    "status": "error",
-                    "error": f"Unsupported file type: {file_type}"
-                })
-                continue
-            
-            # Check file size (50MB limit)
-            if file.size and file.size > 50 * 1024 * 1024:
-                results.append({
-                    "filename": file.filename,
-                    "status": "error",
-                    "error": "File size exceeds 50MB limit"
-                })
-                continue
-            
-            # Read and validate file content
-            content = await file.read()
-            
-            # Reset file position for potential re-reading
-            await file.seek(0)
-            
-            # Process the file
-            result = await data_import_service.process_uploaded_file(
-                file=file,
-                file_type=file_type,
-                content=content,
-                user_id=current_user.id,
-                description=description
+            polygon = json.loads(basin_polygon)
+        except ValueError:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="basin_polygon must be a JSON list of [lon, lat] vertices"
             )
-            
-            results.append(result)
-            
-        except Exception as e:
-            logger.error(f"Error processing file {file.filename}: {str(e)}")
-            results.append({
+    
+    data_import_service = DataImportService(db)
+    ingestion_service = IngestionJobService(db)
+    semaphore = asyncio.Semaphore(settings.UPLOAD_CONCURRENCY)
+    queued = []
+    
+    async def accept_file(file: UploadFile, file_type: str) -> Dict[str, Any]:
+        # Validate file type
+        if file_type not in SUPPORTED_FILE_TYPES:
+            return {
                 "filename": file.filename,
                 "status": "error",
-                "error": f"Processing failed: {str(e)}"
-            })
+                "error": f"Unsupported file type: {file_type}"
+            }
+        
+        # Check declared file size before reading
+        max_bytes = MAX_GRIDDED_UPLOAD_BYTES if file_type == GRIDDED_FILE_TYPE else MAX_UPLOAD_BYTES
+        if file.size and file.size > max_bytes:
+            return {
+                "filename": file.filename,
+                "status": "error",
+                "error": f"File size exceeds {max_bytes // (1024 * 1024)}MB limit"
+            }
+        
+        async with semaphore:
+            # Stream the upload to disk instead of holding it in memory
+            try:
+                spool_path, file_size, content_hash = await data_import_service.spool_upload(
+                    file, current_user.id, max_bytes
+                )
+            except ValueError as e:
+                return {
+                    "filename": file.filename,
+                    "status": "error",
+                    "error": str(e)
+                }
+        
+        job = await ingestion_service.create_job(
+            current_user.id, file.filename, file_type, file_size, spool_path
+        )
+        queued.append({
+            "job_id": job.id,
+            "user_id": current_user.id,
+            "filename": file.filename,
+            "file_type": file_type,
+            "spool_path": spool_path,
+            "file_size": file_size,
+            "description": description,
+            "content_hash": content_hash,
+            "basin_polygon": polygon
+        })
+        return {
+            "filename": file.filename,
+            "status": job.status.value,
+            "job_id": str(job.id),
+            "file_type": file_type
+        }
+    
+    # Files are spooled concurrently; gather keeps results in upload order
+    results = await asyncio.gather(*(
+        accept_file(file, file_type) for file, file_type in zip(files, file_types)
+    ))
+    
+    if queued:
+        background_tasks.add_task(run_ingestion_jobs, queued)
     
     return {
-        "message": f"Processed {len(files)} files",
+        "message": f"Accepted {len(queued)} of {len(files)} files for ingestion",
         "results": results,
         "summary": {
             "total_files": len(results),
-            "successful": len([r for r in results if r["status"] == "success"]),
+            "queued": len(queued),
             "failed": len([r for r in results if r["status"] == "error"])
         }
     }
 
+@router.get("/jobs")
+async def get_ingestion_jobs(
+    limit: int = 20,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Get the user's most recent ingestion jobs
+    """
+    ingestion_service = IngestionJobService(db)
+    return {"jobs": await ingestion_service.get_user_jobs(current_user.id, limit=limit)}
+
+@router.get("/jobs/{job_id}")
+async def get_ingestion_job(
+    job_id: UUID,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Get the status and per-stage progress of an ingestion job
+    """
+    ingestion_service = IngestionJobService(db)
+    job = await ingestion_service.get_job(job_id, current_user.id)
+    
+    if not job:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Ingestion job not found"
+        )
+    
+    return job
+
+@router.post("/uploads", status_code=status.HTTP_201_CREATED)
+async def create_upload_session(
+    upload: UploadSessionCreate,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Start a resumable upload.
+
+    Send the file as byte ranges with ``PATCH /uploads/{upload_id}`` and a
+    ``Content-Range`` header, optionally with each chunk's SHA-256 in
+    ``X-Chunk-SHA256``. After an interruption, ``HEAD /uploads/{upload_id}``
+    gives the offset to continue from in ``Upload-Offset``. Once every byte
+    is sent, ``POST /uploads/{upload_id}/complete`` verifies the file and
+    queues its ingestion job.
+    """
+    if upload.file_type not in SUPPORTED_FILE_TYPES:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Unsupported file type: {upload.file_type}"
+        )
+    
+    max_bytes = MAX_GRIDDED_UPLOAD_BYTES if upload.file_type == GRIDDED_FILE_TYPE else MAX_UPLOAD_BYTES
+    if upload.total_size > max_bytes:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"File size exceeds {max_bytes // (1024 * 1024)}MB limit"
+        )
+    
+    upload_service = UploadSessionService(db)
+    session = await upload_service.create_session(
+        user_id=current_user.id,
+        filename=upload.filename,
+        file_type=upload.file_type,
+        total_size=upload.total_size,
+        sha256=upload.sha256,
+        description=upload.description,
+        basin_polygon=upload.basin_polygon
+    )
+    
+    return upload_service.session_summary(session)
+
+@router.head("/uploads/{upload_id}")
+async def get_upload_offset(
+    upload_id: UUID,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Get the offset a resumable upload continues from
+    """
+    session = await UploadSessionService(db).get_session(upload_id, current_user.id)
+    
+    if not session:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Upload not found"
+        )
+    
+    return Response(headers={
+        "Upload-Offset": str(session.received_bytes),
+        "Upload-Length": str(session.total_size),
+        "Cache-Control": "no-store"
+    })
+
+@router.get("/uploads/{upload_id}")
+async def get_upload_session(
+    upload_id: UUID,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Get the status of a resumable upload
+    """
+    upload_service = UploadSessionService(db)
+    session = await upload_service.get_session(upload_id, current_user.id)
+    
+    if not session:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Upload not found"
+        )
+    
+    return upload_service.session_summary(session)
+
+@router.patch("/uploads/{upload_id}")
+async def upload_chunk(
+    upload_id: UUID,
+    request: Request,
+    content_range: str = Header(...),
+    x_chunk_sha256: Optional[str] = Header(None),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Append a byte range to a resumable upload.
+
+    The range must start at the upload's current offset. A chunk that is
+    cut short or fails its checksum is discarded and can be resent.
+    """
+    upload_service = UploadSessionService(db)
+    session = await upload_service.get_session(upload_id, current_user.id)
+    
+    if not session:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Upload not found"
+        )
+    
+    try:
+        start, end = parse_content_range(content_range, session.total_size)
+        session = await upload_service.append_chunk(
+            upload_id, current_user.id, start, end, request.stream(), x_chunk_sha256
+        )
+    except UploadOffsetMismatch as e:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=str(e),
+            headers={"Upload-Offset": str(e.offset)}
+        )
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+    
+    return JSONResponse(
+        upload_service.session_summary(session),
+        headers={"Upload-Offset": str(session.received_bytes)}
+    )
+
+@router.post("/uploads/{upload_id}/complete", status_code=status.HTTP_202_ACCEPTED)
+async def complete_upload(
+    upload_id: UUID,
+    background_tasks: BackgroundTasks,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Verify a fully sent upload and queue its ingestion job. Completing an
+    upload again returns the same job.
+    """
+    upload_service = UploadSessionService(db)
+    
+    try:
+        session, job = await upload_service.complete(upload_id, current_user.id)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+    
+    if not session:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Upload not found"
+        )
+    
+    if job:
+        background_tasks.add_task(run_ingestion_jobs, [job])
+    
+    return upload_service.session_summary(session)
+
+@router.delete("/uploads/{upload_id}")
+async def cancel_upload(
+    upload_id: UUID,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Abandon a resumable upload
+    """
+    success = await UploadSessionService(db).cancel(upload_id, current_user.id)
+    
+    if not success:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Upload not found"
+        )
+    
+    return {"message": "Upload cancelled successfully"}
+
 @router.post("/validate")
 async def validate_file_content(
     file: UploadFile = File(...),
@@ -146,40 +423,53 @@ async def validate_file_content(
             detail=f"Unsupported file type: {file_type}"
         )
     
+    # Get file type configuration
+    config = SUPPORTED_FILE_TYPES[file_type]
+    
+    spool_path = None
     try:
-        content = await file.read()
-        
-        # Parse CSV content
-        df = pd.read_csv(io.StringIO(content.decode('utf-8')))
-        
-        # Get file type configuration
-        config = SUPPORTED_FILE_TYPES[file_type]
-        
-        # Check for required columns
-        missing_required = []
-        for col in config['required_columns']:
-            if not any(col.lower() in df_col.lower() for df_col in df.columns):
-                missing_required.append(col)
+        # Stream the upload to a temporary file and profile it on a worker
+        max_bytes = MAX_GRIDDED_UPLOAD_BYTES if file_type == GRIDDED_FILE_TYPE else MAX_UPLOAD_BYTES
+        try:
+            spool_path, _, _ = await spool_to_file(file, None, max_bytes)
+        except ValueError as e:
+            raise HTTPException(
+                status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+                detail=str(e)
+            )
         
-        # Check data quality
-        data_quality = {
-            "total_rows": len(df),
-            "total_columns": len(df.columns),
-            "missing_values": df.isnull().sum().to_dict(),
-            "data_types": df.dtypes.astype(str).to_dict()
-        }
+        if file_type == GRIDDED_FILE_TYPE:
+            # Only the axes and attributes are read, not the grids
+            try:
+                grid = await run_in_process(describe_grid, spool_path)
+            except ValueError as e:
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail=str(e)
+                )
+            return {
+                "filename": file.filename,
+                "file_type": file_type,
+                "is_valid": len(grid['variables']) > 0,
+                "missing_required_columns": [],
+                "available_columns": grid['variables'],
+                "data_quality": grid,
+                "preview": []
+            }
         
-        # Generate preview
-        preview = df.head(10).fillna('').to_dict(orient='records')
+        profile = await run_in_process(
+            validate_upload, spool_path, config['required_columns'], VALIDATION_PREVIEW_ROWS
+        )
+        missing_required = profile['missing_required_columns']
         
         validation_result = {
             "filename": file.filename,
             "file_type": file_type,
             "is_valid": len(missing_required) == 0,
             "missing_required_columns": missing_required,
-            "available_columns": list(df.columns),
-            "data_quality": data_quality,
-            "preview": preview
+            "available_columns": profile['available_columns'],
+            "data_quality": profile['data_quality'],
+            "preview": profile['preview']
         }
         
         if not validation_result["is_valid"]:
@@ -189,6 +479,8 @@ async def validate_file_content(
         
         return validation_result
         
+    except HTTPException:
+        raise
     except UnicodeDecodeError:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -210,6 +502,9 @@ async def validate_file_content(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Validation failed: {str(e)}"
         )
+    finally:
+        if spool_path and os.path.exists(spool_path):
+            os.remove(spool_path)
 
 @router.get("/user-datasets")
 async def get_user_datasets(
@@ -257,6 +552,129 @@ async def get_dataset_details(
     
     return dataset
 
+@router.get("/dataset/{dataset_id}/series")
+async def get_dataset_series(
+    dataset_id: UUID,
+    variable: Optional[List[str]] = Query(None),
+    start: Optional[str] = None,
+    end: Optional[str] = None,
+    frequency: Optional[str] = None,
+    aggregation: str = "mean",
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Get a dataset's series within a date range, optionally resampled to
+    hourly, daily, monthly or annual values
+    """
+    try:
+        start_date = pd.Timestamp(start) if start else None
+        end_date = pd.Timestamp(end) if end else None
+    except ValueError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid start or end date"
+        )
+    if frequency is not None and frequency not in RESAMPLE_UNITS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Unsupported frequency: {frequency}. Use one of: {', '.join(RESAMPLE_UNITS)}"
+        )
+    if aggregation not in AGGREGATIONS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Unsupported aggregation: {aggregation}. Use one of: {', '.join(AGGREGATIONS)}"
+        )
+    
+    data_import_service = DataImportService(db)
+    
+    try:
+        series = await data_import_service.get_dataset_series(
+            dataset_id=dataset_id,
+            user_id=current_user.id,
+            variables=variable,
+            start=start_date,
+            end=end_date,
+            frequency=frequency,
+            aggregation=aggregation
+        )
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+    
+    if not series:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Dataset not found"
+        )
+    
+    return FastJSONResponse(series)
+
+@router.get("/dataset/{dataset_id}/processed")
+async def get_processed_series(
+    dataset_id: UUID,
+    frequency: str = "daily",
+    method: str = "linear",
+    neighbour_id: Optional[UUID] = None,
+    variable: Optional[List[str]] = Query(None),
+    start: Optional[str] = None,
+    end: Optional[str] = None,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Get a dataset's series regularized to a time step, with gaps filled by
+    linear interpolation, climatological means or regression on a
+    neighbouring station's dataset
+    """
+    try:
+        start_date = pd.Timestamp(start) if start else None
+        end_date = pd.Timestamp(end) if end else None
+    except ValueError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid start or end date"
+        )
+    if frequency not in RESAMPLE_UNITS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Unsupported frequency: {frequency}. Use one of: {', '.join(RESAMPLE_UNITS)}"
+        )
+    if method not in FILL_METHODS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Unsupported fill method: {method}. Use one of: {', '.join(FILL_METHODS)}"
+        )
+    
+    data_import_service = DataImportService(db)
+    
+    try:
+        series = await data_import_service.get_processed_series(
+            dataset_id=dataset_id,
+            user_id=current_user.id,
+            frequency=frequency,
+            method=method,
+            neighbour_id=neighbour_id,
+            variables=variable,
+            start=start_date,
+            end=end_date
+        )
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+    
+    if not series:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Dataset not found"
+        )
+    
+    return FastJSONResponse(series)
+
 @router.delete("/dataset/{dataset_id}")
 async def delete_dataset(
     dataset_id: UUID,
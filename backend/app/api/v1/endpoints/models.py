@@ -151,6 +151,6 @@ async def get_model_capabilities(
             "real_time_data": False,
             "forecasting": True
         },
-        "export_formats": ["csv", "json", "pdf", "netcdf"],
+        "export_formats": ["csv", "json", "parquet", "netcdf"],
         "visualization_types": ["time_series", "spatial_maps", "statistical_plots", "dashboards"]
     }
\ No newline at end of file
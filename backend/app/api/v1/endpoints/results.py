@@ -1,21 +1,106 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Response
+from fastapi import APIRouter, Depends, HTTPException, Query, status, Request, Response
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
-from typing import Optional
+from typing import List, Optional
 from uuid import UUID
-import pandas as pd
-import io
-import json
 
 from app.core.database import get_db
 from app.core.auth import get_current_user
-from app.models.models import User, Simulation, SimulationResult
+from app.core.cache import results_cache
+from app.core.http_cache import compute_etag, etag_matches, cache_headers, not_modified
+from app.core.serialization import FastJSONResponse, dumps
+from app.core.storage import storage
+from app.models.models import User, Simulation
+from app.schemas.simulation import ResultsCompareRequest
 from app.services.simulation_service import SimulationService
+from app.services.comparison_service import ResultsComparisonService, SERIES_INDEX_KEYS
+from app.services.hydro_statistics import DEFAULT_EXCEEDANCE
+from app.services.export_service import (
+    ResultsExporter,
+    TABULAR_RESULT_TYPES,
+    PYARROW_AVAILABLE,
+    export_key
+)
 
 router = APIRouter()
 
+@router.get("/cache/stats")
+async def get_results_cache_stats(
+    current_user: User = Depends(get_current_user),
+):
+    """
+    Get hit-rate and occupancy metrics of the results cache
+    """
+    return results_cache.stats()
+
+@router.post("/compare")
+async def compare_simulation_results(
+    compare_request: ResultsCompareRequest,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    """
+    Compare result series of several simulations on a common date index
+    """
+    if compare_request.result_type not in SERIES_INDEX_KEYS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Result type '{compare_request.result_type}' cannot be compared. "
+                   f"Use one of: {', '.join(SERIES_INDEX_KEYS)}"
+        )
+    
+    simulation_ids = list(dict.fromkeys(compare_request.simulation_ids))
+    variables = list(dict.fromkeys(compare_request.variables))
+    baseline_id = compare_request.baseline_id or simulation_ids[0]
+    if baseline_id not in simulation_ids:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Baseline must be one of the compared simulations"
+        )
+    
+    comparison_service = ResultsComparisonService(db)
+    
+    # Verify user owns every simulation
+    simulation_names = comparison_service.get_owned_simulations(simulation_ids, current_user.id)
+    missing = [str(sim_id) for sim_id in simulation_ids if sim_id not in simulation_names]
+    if missing:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Simulations not found: {', '.join(missing)}"
+        )
+    
+    series = await run_in_threadpool(
+        comparison_service.load_series,
+        simulation_ids,
+        variables,
+        compare_request.result_type
+    )
+    
+    missing = [str(sim_id) for sim_id in simulation_ids if sim_id not in series]
+    if missing:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"No '{compare_request.result_type}' results found for simulations: {', '.join(missing)}"
+        )
+    
+    comparison = await run_in_threadpool(
+        comparison_service.compare,
+        simulation_names,
+        series,
+        simulation_ids,
+        variables,
+        compare_request.result_type,
+        baseline_id,
+        compare_request.join
+    )
+    
+    return FastJSONResponse(comparison)
+
 @router.get("/{simulation_id}")
 async def get_simulation_results(
     simulation_id: UUID,
+    request: Request,
     result_type: Optional[str] = None,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user),
@@ -24,6 +109,14 @@ async def get_simulation_results(
     Get simulation results
     """
     simulation_service = SimulationService(db)
+    
+    # Answer repeat requests from the results version alone
+    results_version = await simulation_service.get_results_version(simulation_id, current_user.id)
+    if results_version:
+        etag = compute_etag(results_version["version"], "results", result_type)
+        if etag_matches(request, etag):
+            return not_modified(etag)
+    
     results = await simulation_service.get_simulation_results(
         simulation_id=simulation_id,
         user_id=current_user.id,
@@ -36,17 +129,22 @@ async def get_simulation_results(
             detail="No results found for this simulation"
         )
     
-    return results
+    return FastJSONResponse(results, headers=cache_headers(etag))
 
 @router.get("/{simulation_id}/export/{format}")
 async def export_simulation_results(
     simulation_id: UUID,
     format: str,
+    request: Request,
+    result_type: str = "daily_results",
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user),
 ):
     """
-    Export simulation results in different formats
+    Export simulation results in different formats.
+
+    Parquet holds a single table, so it exports the result type given by
+    ``result_type``; the other formats export every result.
     """
     # Verify user owns the simulation
     simulation = db.query(Simulation).filter(
@@ -60,112 +158,185 @@ async def export_simulation_results(
             detail="Simulation not found"
         )
     
-    # Get all results
-    results = db.query(SimulationResult).filter(
-        SimulationResult.simulation_id == simulation_id
-    ).all()
+    simulation_service = SimulationService(db)
+    results_version = await simulation_service.get_results_version(simulation_id, current_user.id)
+    etag = compute_etag(results_version["version"], "export", format.lower(), result_type)
+    if etag_matches(request, etag):
+        return not_modified(etag)
     
-    if not results:
+    exporter = ResultsExporter(db)
+    result_refs = exporter.list_results(simulation_id)
+    
+    if not result_refs:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="No results found for this simulation"
         )
     
     if format.lower() == "csv":
-        # Export as CSV
-        output = io.StringIO()
-        
-        for result in results:
-            if result.result_type in ["daily_results", "monthly_results", "annual_results"]:
-                df = pd.DataFrame(result.data)
-                df.to_csv(output, index=False)
-                output.write("\n\n")
-        
-        return Response(
-            content=output.getvalue(),
+        # Stream CSV one row block at a time
+        return StreamingResponse(
+            exporter.iter_csv(result_refs),
             media_type="text/csv",
             headers={
-                "Content-Disposition": f"attachment; filename=simulation_{simulation_id}_results.csv"
+                "Content-Disposition": f"attachment; filename=simulation_{simulation_id}_results.csv",
+                **cache_headers(etag)
             }
         )
     
     elif format.lower() == "json":
-        # Export as JSON
+        # Export as JSON, at full precision whatever the API responses use
         all_results = {
-            result.result_type: result.data
-            for result in results
+            result_type: exporter.load_result_data(result_id)
+            for result_id, result_type in result_refs
         }
         
         return Response(
-            content=json.dumps(all_results, indent=2),
+            content=dumps(all_results, indent=True),
             media_type="application/json",
             headers={
-                "Content-Disposition": f"attachment; filename=simulation_{simulation_id}_results.json"
+                "Content-Disposition": f"attachment; filename=simulation_{simulation_id}_results.json",
+                **cache_headers(etag)
+            }
+        )
+    
+    elif format.lower() == "parquet":
+        if not PYARROW_AVAILABLE:
+            raise HTTPException(
+                status_code=status.HTTP_501_NOT_IMPLEMENTED,
+                detail="Parquet export is not available on this server"
+            )
+        
+        # The newest result of the type, should a re-run have left older ones
+        result_ref = next((ref for ref in reversed(result_refs) if ref[1] == result_type), None)
+        if result_type not in TABULAR_RESULT_TYPES or not result_ref:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail=f"No '{result_type}' results found for this simulation"
+            )
+        
+        # Exports are written once per results version and shared by every replica
+        key = export_key(simulation_id, etag, "parquet")
+        if not await storage.exists(key):
+            path = await run_in_threadpool(exporter.write_parquet, result_ref[0], result_type)
+            await storage.put_file(path, key)
+        
+        return StreamingResponse(
+            storage.iter_chunks(key),
+            media_type="application/vnd.apache.parquet",
+            headers={
+                "Content-Disposition": f"attachment; filename=simulation_{simulation_id}_{result_type}.parquet",
+                **cache_headers(etag)
+            }
+        )
+    
+    elif format.lower() == "netcdf":
+        key = export_key(simulation_id, etag, "nc")
+        if not await storage.exists(key):
+            path = await run_in_threadpool(exporter.write_netcdf, simulation, result_refs)
+            await storage.put_file(path, key)
+        
+        return StreamingResponse(
+            storage.iter_chunks(key),
+            media_type="application/x-netcdf",
+            headers={
+                "Content-Disposition": f"attachment; filename=simulation_{simulation_id}_results.nc",
+                **cache_headers(etag)
             }
         )
     
     else:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
-            detail=f"Export format '{format}' not supported. Use 'csv' or 'json'."
+            detail=f"Export format '{format}' not supported. Use 'csv', 'json', 'parquet' or 'netcdf'."
         )
 
 @router.get("/{simulation_id}/summary")
 async def get_simulation_summary(
     simulation_id: UUID,
+    request: Request,
+    response: Response,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user),
 ):
     """
     Get a summary of simulation results
     """
+    simulation_service = SimulationService(db)
+    
     # Verify user owns the simulation
-    simulation = db.query(Simulation).filter(
-        Simulation.id == simulation_id,
-        Simulation.owner_id == current_user.id
-    ).first()
+    results_version = await simulation_service.get_results_version(simulation_id, current_user.id)
     
-    if not simulation:
+    if not results_version:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Simulation not found"
         )
     
-    # Get results
-    results = db.query(SimulationResult).filter(
-        SimulationResult.simulation_id == simulation_id
-    ).all()
+    etag = compute_etag(results_version["version"], "summary")
     
-    if not results:
+    if etag_matches(request, etag):
+        return not_modified(etag)
+    
+    summary = await simulation_service.get_simulation_summary(simulation_id, current_user.id)
+    
+    if not summary:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="No results found for this simulation"
         )
     
-    # Build summary
-    summary = {
-        "simulation_id": str(simulation_id),
-        "simulation_name": simulation.name,
-        "status": simulation.status.value,
-        "model_type": simulation.model_type.value,
-        "time_period": {
-            "start": simulation.start_date.isoformat(),
-            "end": simulation.end_date.isoformat()
-        },
-        "results_available": [result.result_type for result in results],
-        "key_metrics": {}
-    }
-    
-    # Extract key metrics from results
-    for result in results:
-        if result.result_type == "annual_results" and isinstance(result.data, dict):
-            summary["key_metrics"]["annual"] = {
-                "total_precipitation": result.data.get("total_precipitation"),
-                "total_evapotranspiration": result.data.get("total_evapotranspiration"),
-                "total_runoff": result.data.get("total_runoff"),
-                "water_balance_error": result.data.get("water_balance_error")
-            }
-        elif result.result_type == "indicators" and isinstance(result.data, dict):
-            summary["key_metrics"]["indicators"] = result.data
+    response.headers.update(cache_headers(etag))
+    
+    return summary
+
+@router.get("/{simulation_id}/statistics")
+async def get_simulation_statistics(
+    simulation_id: UUID,
+    request: Request,
+    variable: List[str] = Query(["runoff"]),
+    exceedance: List[float] = Query(DEFAULT_EXCEEDANCE),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    """
+    Get flow-duration curves, Q10/Q50/Q90 flow indices and monthly climatology
+    of daily result series.
+
+    ``exceedance`` sets the exceedance probabilities (percent of time) at which
+    the flow-duration curve is evaluated.
+    """
+    if any(not 0 <= p <= 100 for p in exceedance):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Exceedance probabilities must be between 0 and 100"
+        )
+    
+    simulation_service = SimulationService(db)
+    
+    results_version = await simulation_service.get_results_version(simulation_id, current_user.id)
+    if not results_version:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Simulation not found"
+        )
+    
+    variables = list(dict.fromkeys(variable))
+    etag = compute_etag(results_version["version"], "statistics", *variables, *sorted(exceedance))
+    if etag_matches(request, etag):
+        return not_modified(etag)
+    
+    statistics = await simulation_service.get_simulation_statistics(
+        simulation_id=simulation_id,
+        user_id=current_user.id,
+        variables=variables,
+        exceedance_percent=exceedance
+    )
+    
+    if not statistics:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="No daily results found for this simulation"
+        )
     
-    return summary
\ No newline at end of file
+    return FastJSONResponse(statistics, headers=cache_headers(etag))
@@ -16,6 +16,8 @@ from app.schemas.simulation import (
 from app.schemas.user import User
 from app.services.simulation_service import SimulationService
 from app.services.model_runner import ModelRunner
+from app.services.forcing import load_linked_forcing
+from app.services.water_balance import SOIL_MOISTURE_MM, soil_bucket
 
 logger = logging.getLogger(__name__)
 router = APIRouter()
@@ -36,10 +38,8 @@ async def run_simulation_background(simulation_id: UUID, db: Session):
         await asyncio.sleep(5)  # Simulate 5 seconds of processing
         
         # Generate sample results for the new simulation
-        from datetime import datetime, timedelta
-        import uuid
         import numpy as np
-        from app.models.models import SimulationResult
+        import pandas as pd
         
         # Get the simulation
         from app.models.models import Simulation
@@ -54,47 +54,52 @@ async def run_simulation_background(simulation_id: UUID, db: Session):
         
         # Calculate number of days
         days = (end_date - start_date).days + 1
-        dates = [(start_date + timedelta(days=i)).strftime('%Y-%m-%d') for i in range(days)]
+        dates = pd.date_range(start_date, periods=days, freq='D').strftime('%Y-%m-%d').tolist()
         
         # Generate realistic data
-        precipitation = [max(0, np.random.gamma(2, 3)) for _ in range(days)]
-        runoff = [max(0, p * 0.35 + np.random.normal(0, 0.5)) for p in precipitation]
-        evapotranspiration = [max(0, p * 0.4 + np.random.normal(2, 0.5)) for p in precipitation]
-        infiltration = [max(0, p - r - et) for p, r, et in zip(precipitation, runoff, evapotranspiration)]
-        temperature = [20 + np.random.normal(0, 5) for _ in range(days)]
+        precipitation = np.maximum(0, np.random.gamma(2, 3, days))
+        temperature = 20 + np.random.normal(0, 5, days)
         
-        # Create daily results
-        daily_result = SimulationResult(
-            id=uuid.uuid4(),
-            simulation_id=simulation_id,
-            result_type="daily_results",
-            data={
-                "dates": dates,
-                "precipitation": [round(x, 2) for x in precipitation],
-                "runoff": [round(x, 2) for x in runoff],
-                "evapotranspiration": [round(x, 2) for x in evapotranspiration],
-                "infiltration": [round(x, 2) for x in infiltration],
-                "temperature": [round(x, 1) for x in temperature]
-            }
-        )
-        db.add(daily_result)
+        # Observed inputs from a linked meteorological dataset take precedence
+        forcing = await load_linked_forcing(simulation.configuration, start_date, end_date)
+        if forcing is not None and len(forcing) == days:
+            if 'precipitation_mm' in forcing:
+                precipitation = forcing['precipitation_mm'].to_numpy()
+            if 'temperature_c' in forcing:
+                temperature = forcing['temperature_c'].to_numpy()
         
-        # Create annual summary
-        annual_result = SimulationResult(
-            id=uuid.uuid4(),
-            simulation_id=simulation_id,
-            result_type="annual_results",
-            data={
-                "total_precipitation": round(sum(precipitation), 2),
-                "total_evapotranspiration": round(sum(evapotranspiration), 2),
-                "total_runoff": round(sum(runoff), 2),
-                "total_infiltration": round(sum(infiltration), 2),
-                "mean_temperature": round(sum(temperature) / len(temperature), 2),
-                "water_balance_error": 0.02,
-                "runoff_coefficient": round(sum(runoff) / sum(precipitation) if sum(precipitation) > 0 else 0, 3)
-            }
-        )
-        db.add(annual_result)
+        runoff = np.clip(precipitation * 0.35 + np.random.normal(0, 0.5, days), 0, precipitation)
+        infiltration = precipitation - runoff
+        # Evapotranspiration draws on a soil store so the series close the water balance
+        potential_evapotranspiration = np.maximum(0, precipitation * 0.4 + np.random.normal(2, 0.5, days))
+        evapotranspiration, soil_storage = soil_bucket(infiltration, potential_evapotranspiration)
+        
+        total_precipitation = precipitation.sum()
+        
+        # Save results through the service so key metrics, events and the
+        # water-balance closure are derived from the series
+        await simulation_service.save_simulation_results(simulation_id, {
+            'results': {
+                'daily_results': {
+                    "dates": dates,
+                    "precipitation": np.round(precipitation, 2).tolist(),
+                    "runoff": np.round(runoff, 2).tolist(),
+                    "evapotranspiration": np.round(evapotranspiration, 2).tolist(),
+                    "infiltration": np.round(infiltration, 2).tolist(),
+                    "soil_moisture": np.round(soil_storage, 2).tolist(),
+                    "temperature": np.round(temperature, 1).tolist()
+                },
+                'annual_results': {
+                    "total_precipitation": round(float(total_precipitation), 2),
+                    "total_evapotranspiration": round(float(evapotranspiration.sum()), 2),
+                    "total_runoff": round(float(runoff.sum()), 2),
+                    "total_infiltration": round(float(infiltration.sum()), 2),
+                    "mean_temperature": round(float(temperature.mean()), 2),
+                    "runoff_coefficient": round(float(runoff.sum() / total_precipitation) if total_precipitation > 0 else 0, 3)
+                }
+            },
+            'metadata': {'units': {'soil_moisture': SOIL_MOISTURE_MM}}
+        })
         
         # Update simulation status to completed
         await simulation_service.update_simulation_status(simulation_id, SimulationStatusEnum.COMPLETED, progress=100.0)
@@ -0,0 +1,265 @@
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+from uuid import UUID
+import json
+import logging
+import threading
+import time
+
+from app.core.config import settings
+
+try:
+    import redis
+    REDIS_AVAILABLE = True
+except ImportError:
+    REDIS_AVAILABLE = False
+    logging.warning("redis not available - results cache will be in-process only")
+
+logger = logging.getLogger(__name__)
+
+
+class ResultsCache:
+    """
+    Read-through cache for simulation results and derived payloads.
+
+    Entries live in an in-process LRU bounded by their serialized size, with an
+    optional Redis tier shared between API replicas. Every entry is tagged with
+    the simulation it belongs to so all of a simulation's entries can be dropped
+    at once when its results change.
+
+    Replicas see each other's invalidations through a per-simulation
+    generation counter in Redis: invalidating bumps it, and an in-process
+    entry cached under an older generation is dropped on its next lookup.
+    In-process entries also expire after ``ttl`` seconds, which bounds how
+    stale they can get while Redis is unreachable.
+    """
+
+    KEY_PREFIX = "mhia:results-cache"
+
+    def __init__(self, max_bytes: int, redis_client: Optional[Any] = None, ttl: int = 3600):
+        self.max_bytes = max_bytes
+        self.redis = redis_client
+        self.ttl = ttl
+
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self._keys_by_simulation: Dict[str, set] = {}
+        self._current_bytes = 0
+        self._lock = threading.Lock()
+        self._stats = {
+            "memory_hits": 0,
+            "redis_hits": 0,
+            "misses": 0,
+            "stores": 0,
+            "evictions": 0,
+            "invalidations": 0,
+            "stale_drops": 0,
+            "redis_errors": 0
+        }
+
+    def get(self, key: str) -> Optional[Any]:
+        """
+        Get a cached value, checking the in-process tier before Redis
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and time.monotonic() - entry[4] >= self.ttl:
+                self._drop_local(key)
+                entry = None
+
+        if entry is not None:
+            value, _, simulation_id, generation, _ = entry
+            if self.redis is None or self._generation(simulation_id) in (None, generation):
+                with self._lock:
+                    if key in self._entries:
+                        self._entries.move_to_end(key)
+                    self._stats["memory_hits"] += 1
+                return value
+
+            # Invalidated by another replica
+            with self._lock:
+                self._drop_local(key)
+                self._stats["stale_drops"] += 1
+
+        if self.redis is not None:
+            try:
+                payload = self.redis.get(self._redis_key(key))
+            except Exception as e:
+                self._redis_failed("get", e)
+                payload = None
+
+            if payload is not None:
+                value = json.loads(payload)
+                # Keys follow cache_key(), so the simulation id is the second part
+                simulation_id = key.split(":")[1] if ":" in key else None
+                self._store_local(key, value, len(payload), simulation_id, self._generation(simulation_id))
+                with self._lock:
+                    self._stats["redis_hits"] += 1
+                return value
+
+        with self._lock:
+            self._stats["misses"] += 1
+        return None
+
+    def set(self, key: str, value: Any, simulation_id: UUID):
+        """
+        Cache a JSON-serializable value under a key tagged with its simulation
+        """
+        payload = json.dumps(value, default=str).encode("utf-8")
+
+        generation = self._generation(str(simulation_id)) if self.redis is not None else None
+        self._store_local(key, value, len(payload), str(simulation_id), generation)
+
+        if self.redis is not None:
+            try:
+                pipe = self.redis.pipeline()
+                pipe.set(self._redis_key(key), payload, ex=self.ttl)
+                pipe.sadd(self._redis_index(str(simulation_id)), key)
+                pipe.expire(self._redis_index(str(simulation_id)), self.ttl)
+                pipe.execute()
+            except Exception as e:
+                self._redis_failed("set", e)
+
+        with self._lock:
+            self._stats["stores"] += 1
+
+    def invalidate(self, simulation_id: UUID):
+        """
+        Drop every cached entry for a simulation from both tiers
+        """
+        simulation_key = str(simulation_id)
+
+        with self._lock:
+            for key in list(self._keys_by_simulation.get(simulation_key, ())):
+                self._drop_local(key)
+            self._keys_by_simulation.pop(simulation_key, None)
+            self._stats["invalidations"] += 1
+
+        if self.redis is not None:
+            try:
+                index_key = self._redis_index(simulation_key)
+                keys = self.redis.smembers(index_key)
+                pipe = self.redis.pipeline()
+                for key in keys:
+                    key = key.decode("utf-8") if isinstance(key, bytes) else key
+                    pipe.delete(self._redis_key(key))
+                pipe.delete(index_key)
+                # Outlives any in-process entry cached under the old generation
+                pipe.incr(self._redis_generation(simulation_key))
+                pipe.expire(self._redis_generation(simulation_key), 2 * self.ttl)
+                pipe.execute()
+            except Exception as e:
+                self._redis_failed("invalidate", e)
+
+    def clear(self):
+        """
+        Drop all in-process entries and reset the counters
+        """
+        with self._lock:
+            self._entries.clear()
+            self._keys_by_simulation.clear()
+            self._current_bytes = 0
+            for name in self._stats:
+                self._stats[name] = 0
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Get hit-rate and occupancy metrics
+        """
+        with self._lock:
+            stats = dict(self._stats)
+            stats["entries"] = len(self._entries)
+            stats["bytes"] = self._current_bytes
+
+        hits = stats["memory_hits"] + stats["redis_hits"]
+        lookups = hits + stats["misses"]
+        stats["max_bytes"] = self.max_bytes
+        stats["hit_rate"] = round(hits / lookups, 4) if lookups else 0.0
+        stats["redis_enabled"] = self.redis is not None
+
+        return stats
+
+    def _generation(self, simulation_id: Optional[str]) -> Optional[int]:
+        """
+        Get a simulation's invalidation generation from Redis, or None when
+        it cannot be read
+        """
+        if simulation_id is None:
+            return None
+        try:
+            generation = self.redis.get(self._redis_generation(simulation_id))
+        except Exception as e:
+            self._redis_failed("generation", e)
+            return None
+        return int(generation) if generation is not None else 0
+
+    def _drop_local(self, key: str):
+        # Caller holds the lock
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self._current_bytes -= entry[1]
+            if entry[2] in self._keys_by_simulation:
+                self._keys_by_simulation[entry[2]].discard(key)
+
+    def _store_local(self, key: str, value: Any, size: int, simulation_id: Optional[str],
+                     generation: Optional[int] = None):
+        """
+        Insert into the in-process LRU, evicting the oldest entries past the byte budget
+        """
+        if size > self.max_bytes:
+            return
+
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._current_bytes -= previous[1]
+
+            self._entries[key] = (value, size, simulation_id, generation, time.monotonic())
+            self._current_bytes += size
+            if simulation_id:
+                self._keys_by_simulation.setdefault(simulation_id, set()).add(key)
+
+            while self._current_bytes > self.max_bytes:
+                evicted_key, (_, evicted_size, evicted_simulation, _, _) = self._entries.popitem(last=False)
+                self._current_bytes -= evicted_size
+                self._stats["evictions"] += 1
+                if evicted_simulation in self._keys_by_simulation:
+                    self._keys_by_simulation[evicted_simulation].discard(evicted_key)
+
+    def _redis_key(self, key: str) -> str:
+        return f"{self.KEY_PREFIX}:{key}"
+
+    def _redis_index(self, simulation_id: str) -> str:
+        return f"{self.KEY_PREFIX}:simulation:{simulation_id}"
+
+    def _redis_generation(self, simulation_id: str) -> str:
+        return f"{self.KEY_PREFIX}:generation:{simulation_id}"
+
+    def _redis_failed(self, operation: str, error: Exception):
+        with self._lock:
+            self._stats["redis_errors"] += 1
+        logger.warning(f"Results cache Redis {operation} failed: {str(error)}")
+
+
+def cache_key(kind: str, simulation_id: UUID, *parts: Optional[str]) -> str:
+    """
+    Build a cache key of the form ``kind:simulation_id:part...``
+    """
+    return ":".join([kind, str(simulation_id)] + [str(part) if part is not None else "*" for part in parts])
+
+
+def _create_results_cache() -> ResultsCache:
+    redis_client = None
+    if settings.RESULTS_CACHE_REDIS_ENABLED:
+        if REDIS_AVAILABLE:
+            redis_client = redis.Redis.from_url(settings.REDIS_URL, socket_timeout=1)
+        else:
+            logger.warning("RESULTS_CACHE_REDIS_ENABLED is set but redis is not installed")
+
+    return ResultsCache(
+        max_bytes=settings.RESULTS_CACHE_MAX_BYTES,
+        redis_client=redis_client,
+        ttl=settings.RESULTS_CACHE_TTL
+    )
+
+
+results_cache = _create_results_cache()
@@ -24,6 +24,11 @@ class Settings(BaseSettings):
     # Redis Settings
     REDIS_URL: str = os.getenv("REDIS_URL", "redis://localhost:6379/0")
     
+    # Results Cache
+    RESULTS_CACHE_MAX_BYTES: int = 256 * 1024 * 1024  # in-process LRU budget
+    RESULTS_CACHE_REDIS_ENABLED: bool = os.getenv("RESULTS_CACHE_REDIS_ENABLED", "false").lower() == "true"
+    RESULTS_CACHE_TTL: int = 3600  # seconds entries live in Redis
+    
     # Security Settings
     SECRET_KEY: str = os.getenv(
         "SECRET_KEY", 
@@ -36,10 +41,39 @@ class Settings(BaseSettings):
     MAX_SIMULATION_DURATION: int = 365  # days
     DEFAULT_TIME_STEP: str = "daily"
     RESULTS_RETENTION_DAYS: int = 90
+    WATER_BALANCE_TOLERANCE_PERCENT: float = 5.0  # closure error above which a run is flagged
+    FORCING_CACHE_ENTRIES: int = 32  # daily forcing frames kept for reuse across scenarios and members
+    FORCING_GAP_FILL: str = "climatology"  # gap-fill method for linked datasets without their own
     
     # File Storage
-    UPLOAD_DIR: str = "uploads"
+    STORAGE_BACKEND: str = os.getenv("STORAGE_BACKEND", "local")  # 'local' or 's3'
+    STORAGE_LOCAL_ROOT: str = os.getenv("STORAGE_LOCAL_ROOT", ".")  # directory local storage keys resolve against
+    STORAGE_CACHE_DIR: Optional[str] = os.getenv("STORAGE_CACHE_DIR")  # local copies of S3 files, system temp when unset
+    S3_BUCKET: str = os.getenv("S3_BUCKET", "mhia")
+    S3_ENDPOINT_URL: Optional[str] = os.getenv("S3_ENDPOINT_URL")  # e.g. a MinIO server for development
+    S3_REGION: Optional[str] = os.getenv("S3_REGION")
+    S3_ACCESS_KEY_ID: Optional[str] = os.getenv("S3_ACCESS_KEY_ID")
+    S3_SECRET_ACCESS_KEY: Optional[str] = os.getenv("S3_SECRET_ACCESS_KEY")
+    UPLOAD_DIR: str = "uploads"  # key prefix of uploaded datasets
+    EXPORT_DIR: str = "exports"  # key prefix of generated result exports
     MAX_FILE_SIZE: int = 10 * 1024 * 1024  # 10MB
+    UPLOAD_SPOOL_CHUNK_BYTES: int = 1024 * 1024  # bytes read from an upload per write to its spool file
+    IMPORT_CHUNK_BYTES: int = 4 * 1024 * 1024  # CSV block size parsed at a time by pyarrow
+    IMPORT_CHUNK_ROWS: int = 50000  # CSV rows parsed at a time by the pandas fallback
+    GRIDDED_CHUNK_BYTES: int = 64 * 1024 * 1024  # gridded values read at a time when averaging over a basin
+    UPLOAD_SESSION_CHUNK_BYTES: int = 8 * 1024 * 1024  # chunk size suggested to resumable upload clients
+    UPLOAD_SESSION_MAX_CHUNK_BYTES: int = 64 * 1024 * 1024  # largest chunk accepted by one PATCH
+    UPLOAD_SESSION_TTL_HOURS: int = 24  # hours an idle resumable upload is kept
+    
+    # Results Export
+    EXPORT_CHUNK_ROWS: int = 5000  # rows rendered per streamed block
+    JSON_FLOAT_PRECISION: Optional[int] = None  # decimals kept in JSON API responses, None keeps full precision
+    
+    # Ingestion Workers
+    INGEST_WORKERS: int = int(os.getenv("INGEST_WORKERS", max(1, (os.cpu_count() or 2) - 1)))
+    UPLOAD_CONCURRENCY: int = 4  # files of one upload processed at the same time
+    INGEST_HEARTBEAT_SECONDS: int = 30  # how often a process renews the lease on the jobs it runs
+    INGEST_LEASE_SECONDS: int = 180  # jobs not renewed for this long are failed as orphaned
     
     # Background Tasks
     CELERY_BROKER_URL: str = os.getenv("CELERY_BROKER_URL", "redis://localhost:6379/1")
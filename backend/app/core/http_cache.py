@@ -0,0 +1,47 @@
+from fastapi import Request, Response, status
+from typing import Dict, Optional
+import hashlib
+
+
+def compute_etag(*parts: Optional[str]) -> str:
+    """
+    Build a strong ETag from the parts that identify a response version
+    """
+    digest = hashlib.sha256("|".join(str(part) for part in parts).encode("utf-8")).hexdigest()
+    return f'"{digest[:32]}"'
+
+
+def etag_matches(request: Request, etag: str) -> bool:
+    """
+    Check whether the request's If-None-Match header already names this ETag
+    """
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    
+    candidates = [candidate.strip() for candidate in header.split(",")]
+    if "*" in candidates:
+        return True
+    
+    # If-None-Match uses weak comparison, so ignore W/ prefixes
+    return any(candidate.removeprefix("W/") == etag for candidate in candidates)
+
+
+def cache_headers(etag: str) -> Dict[str, str]:
+    """
+    Get the validator and Cache-Control headers for a results payload.
+
+    Results URLs carry no version and a simulation can be run again, so
+    clients always revalidate; an unchanged payload costs only a 304.
+    """
+    return {"ETag": etag, "Cache-Control": "private, no-cache"}
+
+
+def not_modified(etag: str) -> Response:
+    """
+    Build an empty 304 response carrying the cache headers
+    """
+    return Response(
+        status_code=status.HTTP_304_NOT_MODIFIED,
+        headers=cache_headers(etag)
+    )
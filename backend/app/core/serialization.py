@@ -0,0 +1,119 @@
+from fastapi.responses import JSONResponse
+from datetime import date, datetime
+from decimal import Decimal
+from typing import Any, Optional
+from uuid import UUID
+import enum
+import json
+import logging
+import numpy as np
+
+from app.core.config import settings
+
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+    logging.warning("orjson not available - falling back to the standard json encoder")
+
+logger = logging.getLogger(__name__)
+
+
+def _default(obj: Any) -> Any:
+    """
+    Encode the non-JSON types that appear in API payloads
+    """
+    if isinstance(obj, np.ndarray):
+        if obj.dtype.kind == 'f':
+            return np.where(np.isfinite(obj), obj, None).tolist()
+        return obj.tolist()
+    if isinstance(obj, np.generic):
+        return obj.item()
+    if isinstance(obj, (datetime, date)):
+        return obj.isoformat()
+    if isinstance(obj, (UUID, Decimal)):
+        return str(obj)
+    if isinstance(obj, enum.Enum):
+        return obj.value
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+def _is_number(value: Any) -> bool:
+    return isinstance(value, (int, float, np.number)) and not isinstance(value, bool)
+
+
+def round_floats(obj: Any, decimals: int) -> Any:
+    """
+    Round every numeric series in a payload with one vectorized np.round per series.
+
+    Lists made only of numbers become arrays (integer lists keep their type), which the encoder
+    writes directly without walking each element in Python; NaN becomes null. Any other list,
+    including one mixing numbers with strings, booleans or None, is rounded element by element
+    so its values keep their types.
+    """
+    if isinstance(obj, dict):
+        return {key: round_floats(value, decimals) for key, value in obj.items()}
+    if isinstance(obj, np.ndarray):
+        return np.round(obj, decimals) if obj.dtype.kind == 'f' else obj
+    if isinstance(obj, (list, tuple)):
+        if obj and all(map(_is_number, obj)):
+            array = np.asarray(obj)
+            if array.dtype.kind in 'iu':
+                return array
+            if array.dtype.kind == 'f':
+                return np.round(array, decimals)
+        return [round_floats(value, decimals) for value in obj]
+    if isinstance(obj, float):
+        return round(obj, decimals)
+    return obj
+
+
+def _finite(obj: Any) -> Any:
+    """
+    Replace NaN and infinite floats with None for the standard json encoder, which would
+    otherwise write them as the invalid JSON tokens NaN and Infinity
+    """
+    if isinstance(obj, dict):
+        return {key: _finite(value) for key, value in obj.items()}
+    if isinstance(obj, (list, tuple)):
+        return [_finite(value) for value in obj]
+    if isinstance(obj, (np.ndarray, np.generic)):
+        return _finite(_default(obj))
+    if isinstance(obj, float) and not np.isfinite(obj):
+        return None
+    return obj
+
+
+def dumps(obj: Any, precision: Optional[int] = None, indent: bool = False) -> bytes:
+    """
+    Serialize a payload to JSON bytes, encoding NumPy arrays natively
+    """
+    if precision is not None:
+        obj = round_floats(obj, precision)
+
+    if ORJSON_AVAILABLE:
+        option = orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS
+        if indent:
+            option |= orjson.OPT_INDENT_2
+        return orjson.dumps(obj, default=_default, option=option)
+
+    return json.dumps(
+        _finite(obj), default=_default, indent=2 if indent else None, allow_nan=False
+    ).encode("utf-8")
+
+
+class FastJSONResponse(JSONResponse):
+    """
+    JSON response encoded with orjson at the configured float precision.
+
+    Endpoints return it directly so FastAPI skips jsonable_encoder, which would
+    otherwise walk every float in large result payloads.
+    """
+
+    def __init__(self, content: Any, precision: Optional[int] = None, **kwargs):
+        self.precision = settings.JSON_FLOAT_PRECISION if precision is None else precision
+        super().__init__(content, **kwargs)
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content, precision=self.precision)
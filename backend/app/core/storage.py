@@ -0,0 +1,326 @@
+from abc import ABC, abstractmethod
+from typing import AsyncIterator, Iterator, Optional
+import asyncio
+import errno
+import logging
+import os
+import shutil
+import tempfile
+
+from app.core.config import settings
+
+try:
+    import boto3
+    from botocore.exceptions import ClientError
+    BOTO3_AVAILABLE = True
+except ImportError:
+    BOTO3_AVAILABLE = False
+    logging.warning("boto3 not available - S3 storage backend will be disabled")
+
+logger = logging.getLogger(__name__)
+
+STREAM_CHUNK_BYTES = 64 * 1024
+
+
+class StorageBackend(ABC):
+    """
+    Storage for uploaded datasets and generated result files.
+
+    Files are addressed by ``/``-separated keys. Backends implement blocking
+    primitives; the public coroutines run them on a thread so the event loop
+    is never blocked by disk or network I/O. ``local_path`` is the one
+    blocking entry point, for code that already runs off the event loop and
+    needs a real file to memory-map or parse.
+    """
+
+    def staging_dir(self) -> Optional[str]:
+        """
+        Local directory for files about to be stored, or None for the system
+        temporary directory
+        """
+        return None
+
+    async def put_file(self, source_path: str, key: str):
+        """
+        Store a local file under ``key``, consuming the source file
+        """
+        await asyncio.to_thread(self._put_file, source_path, key)
+
+    async def put_bytes(self, key: str, data: bytes):
+        await asyncio.to_thread(self._put_bytes, key, data)
+
+    async def get_bytes(self, key: str) -> bytes:
+        return await asyncio.to_thread(self._get_bytes, key)
+
+    async def exists(self, key: str) -> bool:
+        return await asyncio.to_thread(self._exists, key)
+
+    async def delete(self, key: str):
+        await asyncio.to_thread(self._delete, key)
+
+    async def delete_prefix(self, prefix: str):
+        """
+        Delete every file under a ``/``-terminated key prefix
+        """
+        await asyncio.to_thread(self._delete_prefix, prefix)
+
+    async def fetch_local(self, key: str) -> str:
+        """
+        Get a local path holding the file stored under ``key``
+        """
+        return await asyncio.to_thread(self.local_path, key)
+
+    async def iter_chunks(self, key: str, chunk_size: int = STREAM_CHUNK_BYTES) -> AsyncIterator[bytes]:
+        """
+        Stream a stored file without holding it in memory
+        """
+        chunks = await asyncio.to_thread(self._open_chunks, key, chunk_size)
+        try:
+            while True:
+                chunk = await asyncio.to_thread(next, chunks, None)
+                if chunk is None:
+                    break
+                yield chunk
+        finally:
+            chunks.close()
+
+    @abstractmethod
+    def local_path(self, key: str) -> str:
+        """
+        Blocking: get a local path holding the file, raising FileNotFoundError
+        when nothing is stored under ``key``
+        """
+
+    @abstractmethod
+    def _put_file(self, source_path: str, key: str):
+        pass
+
+    @abstractmethod
+    def _put_bytes(self, key: str, data: bytes):
+        pass
+
+    @abstractmethod
+    def _get_bytes(self, key: str) -> bytes:
+        pass
+
+    @abstractmethod
+    def _exists(self, key: str) -> bool:
+        pass
+
+    @abstractmethod
+    def _delete(self, key: str):
+        pass
+
+    @abstractmethod
+    def _delete_prefix(self, prefix: str):
+        pass
+
+    @abstractmethod
+    def _open_chunks(self, key: str, chunk_size: int) -> Iterator[bytes]:
+        pass
+
+
+class LocalStorageBackend(StorageBackend):
+    """
+    Stores files under a root directory.
+
+    Writes go to a temporary file in the target directory and are renamed into
+    place, so readers never see a partial file. Keys that are absolute paths,
+    or relative paths stored before this backend existed, resolve as-is
+    against the root.
+    """
+
+    def __init__(self, root: str):
+        self.root = root
+
+    def staging_dir(self) -> str:
+        # Inside the root, so storing a staged file is a rename rather than a copy
+        path = os.path.join(self.root, ".staging")
+        os.makedirs(path, exist_ok=True)
+        return path
+
+    def local_path(self, key: str) -> str:
+        path = self._path(key)
+        if not os.path.exists(path):
+            raise FileNotFoundError(key)
+        return path
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.root, key)
+
+    def _temporary(self, path: str):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        return tempfile.NamedTemporaryFile(dir=os.path.dirname(path) or ".", prefix=".tmp-", delete=False)
+
+    def _put_file(self, source_path: str, key: str):
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        try:
+            os.replace(source_path, path)
+        except OSError as e:
+            if e.errno != errno.EXDEV:
+                raise
+            # Source on another filesystem: copy beside the target, then rename
+            with self._temporary(path) as target, open(source_path, 'rb') as source:
+                shutil.copyfileobj(source, target)
+            os.replace(target.name, path)
+            os.remove(source_path)
+
+    def _put_bytes(self, key: str, data: bytes):
+        path = self._path(key)
+        with self._temporary(path) as target:
+            target.write(data)
+        os.replace(target.name, path)
+
+    def _get_bytes(self, key: str) -> bytes:
+        with open(self.local_path(key), 'rb') as f:
+            return f.read()
+
+    def _exists(self, key: str) -> bool:
+        return os.path.exists(self._path(key))
+
+    def _delete(self, key: str):
+        path = self._path(key)
+        if os.path.exists(path):
+            os.remove(path)
+
+    def _delete_prefix(self, prefix: str):
+        # Prefixes name directories here, e.g. "exports/<simulation id>/"
+        shutil.rmtree(self._path(prefix), ignore_errors=True)
+
+    def _open_chunks(self, key: str, chunk_size: int) -> Iterator[bytes]:
+        path = self.local_path(key)
+
+        def chunks():
+            with open(path, 'rb') as f:
+                while True:
+                    chunk = f.read(chunk_size)
+                    if not chunk:
+                        break
+                    yield chunk
+
+        return chunks()
+
+
+class S3StorageBackend(StorageBackend):
+    """
+    Stores files in an S3-compatible bucket, shared by every API replica.
+
+    ``endpoint_url`` points the client at a compatible service such as MinIO
+    for local development and tests. Files read through ``local_path`` are
+    cached on local disk; stored files are never rewritten in place, so a
+    cached copy stays valid until the key is deleted.
+    """
+
+    def __init__(
+        self,
+        bucket: str,
+        cache_dir: str,
+        endpoint_url: Optional[str] = None,
+        region: Optional[str] = None,
+        access_key_id: Optional[str] = None,
+        secret_access_key: Optional[str] = None
+    ):
+        if not BOTO3_AVAILABLE:
+            raise RuntimeError("boto3 is required for the S3 storage backend")
+
+        self.bucket = bucket
+        self.cache_dir = cache_dir
+        self.client = boto3.client(
+            's3',
+            endpoint_url=endpoint_url,
+            region_name=region,
+            aws_access_key_id=access_key_id,
+            aws_secret_access_key=secret_access_key
+        )
+        os.makedirs(cache_dir, exist_ok=True)
+
+    def local_path(self, key: str) -> str:
+        path = os.path.join(self.cache_dir, key)
+        if os.path.exists(path):
+            return path
+
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with tempfile.NamedTemporaryFile(dir=os.path.dirname(path), prefix=".tmp-", delete=False) as target:
+            try:
+                self.client.download_fileobj(self.bucket, key, target)
+            except ClientError as e:
+                os.remove(target.name)
+                if self._is_missing(e):
+                    raise FileNotFoundError(key)
+                raise
+        os.replace(target.name, path)
+        return path
+
+    def _put_file(self, source_path: str, key: str):
+        self.client.upload_file(source_path, self.bucket, key)
+        os.remove(source_path)
+
+    def _put_bytes(self, key: str, data: bytes):
+        self.client.put_object(Bucket=self.bucket, Key=key, Body=data)
+
+    def _get_bytes(self, key: str) -> bytes:
+        try:
+            return self.client.get_object(Bucket=self.bucket, Key=key)['Body'].read()
+        except ClientError as e:
+            if self._is_missing(e):
+                raise FileNotFoundError(key)
+            raise
+
+    def _exists(self, key: str) -> bool:
+        try:
+            self.client.head_object(Bucket=self.bucket, Key=key)
+            return True
+        except ClientError as e:
+            if self._is_missing(e):
+                return False
+            raise
+
+    def _delete(self, key: str):
+        self.client.delete_object(Bucket=self.bucket, Key=key)
+        self._drop_cached(key)
+
+    def _delete_prefix(self, prefix: str):
+        paginator = self.client.get_paginator('list_objects_v2')
+        for page in paginator.paginate(Bucket=self.bucket, Prefix=prefix):
+            keys = [{'Key': item['Key']} for item in page.get('Contents', [])]
+            if keys:
+                self.client.delete_objects(Bucket=self.bucket, Delete={'Objects': keys})
+                for item in keys:
+                    self._drop_cached(item['Key'])
+
+    def _open_chunks(self, key: str, chunk_size: int) -> Iterator[bytes]:
+        try:
+            body = self.client.get_object(Bucket=self.bucket, Key=key)['Body']
+        except ClientError as e:
+            if self._is_missing(e):
+                raise FileNotFoundError(key)
+            raise
+        return body.iter_chunks(chunk_size)
+
+    def _drop_cached(self, key: str):
+        path = os.path.join(self.cache_dir, key)
+        if os.path.exists(path):
+            os.remove(path)
+
+    @staticmethod
+    def _is_missing(error: "ClientError") -> bool:
+        return error.response.get('Error', {}).get('Code') in ('404', 'NoSuchKey', 'NotFound')
+
+
+def _create_storage() -> StorageBackend:
+    if settings.STORAGE_BACKEND == "s3":
+        return S3StorageBackend(
+            bucket=settings.S3_BUCKET,
+            cache_dir=settings.STORAGE_CACHE_DIR or os.path.join(tempfile.gettempdir(), "mhia-storage"),
+            endpoint_url=settings.S3_ENDPOINT_URL,
+            region=settings.S3_REGION,
+            access_key_id=settings.S3_ACCESS_KEY_ID,
+            secret_access_key=settings.S3_SECRET_ACCESS_KEY
+        )
+    if settings.STORAGE_BACKEND != "local":
+        logger.warning(f"Unknown STORAGE_BACKEND '{settings.STORAGE_BACKEND}', using local storage")
+    return LocalStorageBackend(settings.STORAGE_LOCAL_ROOT)
+
+
+storage = _create_storage()
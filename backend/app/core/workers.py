@@ -0,0 +1,123 @@
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Awaitable, Callable, Optional
+import asyncio
+import functools
+import json
+import logging
+import multiprocessing
+import os
+import threading
+import time
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+_process_pool: Optional[ProcessPoolExecutor] = None
+_pool_lock = threading.Lock()
+
+
+def get_process_pool() -> ProcessPoolExecutor:
+    """
+    Get the shared pool for CPU-heavy ingestion work, starting it on first use.
+
+    Workers are spawned rather than forked so they never inherit the server's
+    threads, locks or database connections.
+    """
+    global _process_pool
+    with _pool_lock:
+        if _process_pool is None:
+            _process_pool = ProcessPoolExecutor(
+                max_workers=settings.INGEST_WORKERS,
+                mp_context=multiprocessing.get_context("spawn")
+            )
+            logger.info(f"Started ingestion worker pool with {settings.INGEST_WORKERS} workers")
+        return _process_pool
+
+
+async def run_in_process(func: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+    """
+    Run a picklable function on the worker pool without blocking the event loop
+    """
+    loop = asyncio.get_running_loop()
+    try:
+        return await loop.run_in_executor(get_process_pool(), functools.partial(func, *args, **kwargs))
+    except BrokenProcessPool:
+        # A crashed worker breaks the whole pool; replace it for later calls
+        logger.error("Ingestion worker pool broke, restarting it")
+        shutdown_process_pool(wait=False)
+        raise
+
+
+class ProgressFile:
+    """
+    Progress of work on a worker process, written to a file the event loop
+    polls. Writes are atomic and throttled, so reporting per chunk is cheap.
+    """
+
+    def __init__(self, path: Optional[str], min_interval: float = 0.5):
+        self.path = path
+        self.min_interval = min_interval
+        self._last_write = 0.0
+
+    def report(self, fraction: float):
+        if not self.path:
+            return
+        now = time.monotonic()
+        if now - self._last_write < self.min_interval and fraction < 1.0:
+            return
+        self._last_write = now
+        temporary = f"{self.path}.tmp"
+        with open(temporary, 'w') as f:
+            json.dump({"fraction": max(0.0, min(1.0, fraction))}, f)
+        os.replace(temporary, self.path)
+
+    @staticmethod
+    def read(path: str) -> Optional[float]:
+        try:
+            with open(path) as f:
+                return json.load(f)["fraction"]
+        except (OSError, ValueError, KeyError):
+            return None
+
+
+async def run_in_process_with_progress(
+    func: Callable[..., Any],
+    *args: Any,
+    progress_path: str,
+    on_progress: Callable[[float], Awaitable[None]],
+    interval: float = 1.0,
+    **kwargs: Any
+) -> Any:
+    """
+    Run a function on the worker pool like ``run_in_process``, passing it
+    ``progress_path`` to report through a ``ProgressFile`` and calling
+    ``on_progress`` with each new fraction while it runs
+    """
+    task = asyncio.ensure_future(run_in_process(func, *args, progress_path=progress_path, **kwargs))
+    last = None
+    try:
+        while True:
+            done, _ = await asyncio.wait({task}, timeout=interval)
+            fraction = ProgressFile.read(progress_path)
+            if fraction is not None and fraction != last:
+                last = fraction
+                await on_progress(fraction)
+            if done:
+                return task.result()
+    finally:
+        for path in (progress_path, f"{progress_path}.tmp"):
+            if os.path.exists(path):
+                os.remove(path)
+
+
+def shutdown_process_pool(wait: bool = True):
+    """
+    Stop the worker pool, cancelling work that has not started
+    """
+    global _process_pool
+    with _pool_lock:
+        if _process_pool is not None:
+            _process_pool.shutdown(wait=wait, cancel_futures=True)
+            _process_pool = None
@@ -2,13 +2,17 @@ from fastapi import FastAPI, HTTPException, Depends, BackgroundTasks
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import JSONResponse
 from contextlib import asynccontextmanager
+import asyncio
 import uvicorn
 from typing import List, Optional
 import logging
 
 from app.core.config import settings
 from app.core.database import engine, SessionLocal
+from app.core.workers import shutdown_process_pool
 from app.models import models
+from app.services.ingestion_service import maintain_ingestion_jobs
+from app.services.upload_sessions import remove_expired_uploads
 from app.api.v1.api import api_router
 from app.core.auth import get_current_user
 from app.schemas.user import User
@@ -20,8 +24,15 @@ logger = logging.getLogger(__name__)
 async def lifespan(app: FastAPI):
     logger.info("Starting MHIA API server...")
     models.Base.metadata.create_all(bind=engine)
+    # Renews this process's ingestion job leases and fails jobs whose
+    # process stopped, here or on another replica
+    ingestion_maintenance = asyncio.create_task(maintain_ingestion_jobs())
+    # Later expiries are swept whenever an upload starts
+    await remove_expired_uploads()
     yield
     logger.info("Shutting down MHIA API server...")
+    ingestion_maintenance.cancel()
+    shutdown_process_pool()
 
 app = FastAPI(
     title="MHIA - Hydrological Modeling API",
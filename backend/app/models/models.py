@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, DateTime, Text, JSON, Float, Boolean, ForeignKey, Enum
+from sqlalchemy import Column, Integer, BigInteger, String, DateTime, Text, JSON, Float, Boolean, ForeignKey, Enum, Index
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import relationship
@@ -22,6 +22,16 @@ class ModelType(enum.Enum):
     ARTIFICIAL_AQUIFER = "artificial_aquifer"
     INTEGRATED = "integrated"
 
+class IngestionStatus(enum.Enum):
+    QUEUED = "queued"
+    RUNNING = "running"
+    COMPLETED = "completed"
+    FAILED = "failed"
+
+class UploadSessionStatus(enum.Enum):
+    UPLOADING = "uploading"
+    COMPLETED = "completed"
+
 class TimeStep(enum.Enum):
     DAILY = "daily"
     MONTHLY = "monthly"
@@ -74,16 +84,33 @@ class SimulationResult(Base):
 
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4, index=True)
     result_type = Column(String, nullable=False)  # 'daily', 'monthly', 'annual', 'indicators'
-    data = Column(JSON, nullable=False)
+    data = Column(JSON, nullable=True)  # Inline payload of rows saved before result blobs
     result_metadata = Column(JSON, nullable=True)
+    key_metrics = Column(JSON, nullable=True)  # Compact metrics materialized at save time for summaries
     file_path = Column(String, nullable=True)  # Path to CSV file if saved
     created_at = Column(DateTime(timezone=True), server_default=func.now())
 
     # Foreign Keys
     simulation_id = Column(UUID(as_uuid=True), ForeignKey("simulations.id"), nullable=False)
+    blob_hash = Column(String(64), ForeignKey("result_blobs.content_hash"), nullable=True, index=True)
 
     # Relationships
     simulation = relationship("Simulation", back_populates="results")
+    blob = relationship("ResultBlob")
+
+    @property
+    def payload(self):
+        """Result payload, whether stored in a shared blob or inline"""
+        return self.blob.data if self.blob_hash else self.data
+
+class ResultBlob(Base):
+    __tablename__ = "result_blobs"
+
+    content_hash = Column(String(64), primary_key=True)  # SHA-256 of the canonical JSON payload
+    data = Column(JSON, nullable=False)
+    size_bytes = Column(Integer, nullable=False)
+    ref_count = Column(Integer, nullable=False, default=0)  # Number of SimulationResult rows pointing here
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
 
 class Scenario(Base):
     __tablename__ = "scenarios"
@@ -153,11 +180,15 @@ class ImportedDataset(Base):
     original_filename = Column(String, nullable=False)
     file_type = Column(String, nullable=False)  # meteorological, observed_flow, etc.
     file_path = Column(String, nullable=False)  # Path to stored file
+    columnar_path = Column(String, nullable=True)  # Typed Parquet copy with parsed dates
+    series_path = Column(String, nullable=True)  # Key prefix of the date-indexed series store
     file_size = Column(Integer, nullable=False)  # File size in bytes
+    content_hash = Column(String(64), nullable=True, index=True)  # SHA-256 of the uploaded bytes
     description = Column(Text, nullable=True)
     data_summary = Column(JSON, nullable=True)  # Summary statistics
     quality_metrics = Column(JSON, nullable=True)  # Data quality metrics
     column_mapping = Column(JSON, nullable=True)  # Mapping to model parameters
+    preview_data = Column(JSON, nullable=True)  # Leading rows captured at ingest
     is_active = Column(Boolean, default=True)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
@@ -166,4 +197,63 @@ class ImportedDataset(Base):
     owner_id = Column(UUID(as_uuid=True), ForeignKey("users.id"), nullable=False)
 
     # Relationships
-    owner = relationship("User")
\ No newline at end of file
+    owner = relationship("User")
+
+    __table_args__ = (
+        Index("ix_imported_datasets_owner_created", "owner_id", "created_at"),
+    )
+
+class UserImportStats(Base):
+    __tablename__ = "user_import_stats"
+
+    # One row per user and file type, kept in step with imported_datasets
+    owner_id = Column(UUID(as_uuid=True), ForeignKey("users.id"), primary_key=True)
+    file_type = Column(String, primary_key=True)
+    dataset_count = Column(Integer, nullable=False, default=0)
+    active_count = Column(Integer, nullable=False, default=0)
+    total_bytes = Column(BigInteger, nullable=False, default=0)
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+
+class IngestionJob(Base):
+    __tablename__ = "ingestion_jobs"
+
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4, index=True)
+    filename = Column(String, nullable=False)
+    file_type = Column(String, nullable=False)
+    file_size = Column(BigInteger, nullable=False)
+    status = Column(Enum(IngestionStatus), default=IngestionStatus.QUEUED)
+    stage = Column(String, nullable=True)  # Stage currently running
+    stages = Column(JSON, nullable=True)  # Status and progress of each stage
+    progress = Column(Float, default=0.0)
+    error_message = Column(Text, nullable=True)
+    result = Column(JSON, nullable=True)  # Import result, as returned by a synchronous upload
+    dataset_id = Column(UUID(as_uuid=True), nullable=True)  # Not a foreign key; datasets may be deleted later
+    spool_path = Column(String, nullable=True)  # Spooled upload, removed when the job ends
+    heartbeat_at = Column(DateTime(timezone=True), nullable=True)  # Last lease renewal by the process running the job
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+    completed_at = Column(DateTime(timezone=True), nullable=True)
+
+    # Foreign Keys
+    owner_id = Column(UUID(as_uuid=True), ForeignKey("users.id"), nullable=False, index=True)
+
+class UploadSession(Base):
+    __tablename__ = "upload_sessions"
+
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4, index=True)
+    filename = Column(String, nullable=False)
+    file_type = Column(String, nullable=False)
+    total_size = Column(BigInteger, nullable=False)  # Declared size of the whole file
+    received_bytes = Column(BigInteger, default=0)  # Bytes committed to the spool file
+    sha256 = Column(String(64), nullable=True)  # Declared SHA-256 of the whole file
+    spool_path = Column(String, nullable=False)  # Local file the received parts are joined into
+    description = Column(Text, nullable=True)
+    basin_polygon = Column(JSON, nullable=True)
+    status = Column(Enum(UploadSessionStatus), default=UploadSessionStatus.UPLOADING)
+    job_id = Column(UUID(as_uuid=True), nullable=True)  # Ingestion job started on completion
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+    expires_at = Column(DateTime(timezone=True), nullable=False)
+
+    # Foreign Keys
+    owner_id = Column(UUID(as_uuid=True), ForeignKey("users.id"), nullable=False, index=True)
@@ -0,0 +1,10 @@
+from pydantic import BaseModel, Field
+from typing import Optional, List
+
+class UploadSessionCreate(BaseModel):
+    filename: str = Field(..., min_length=1)
+    file_type: str
+    total_size: int = Field(..., gt=0, description="Size of the whole file in bytes")
+    sha256: Optional[str] = Field(None, pattern=r"^[0-9a-fA-F]{64}$", description="SHA-256 of the whole file, checked on completion")
+    description: Optional[str] = None
+    basin_polygon: Optional[List[List[float]]] = Field(None, description="[lon, lat] vertices for gridded climate files")
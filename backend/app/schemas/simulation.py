@@ -139,4 +139,11 @@ class SimulationResultResponse(BaseModel):
     created_at: datetime
     
     class Config:
-        from_attributes = True
\ No newline at end of file
+        from_attributes = True
+
+class ResultsCompareRequest(BaseModel):
+    simulation_ids: List[UUID] = Field(..., min_length=2, max_length=100)
+    variables: List[str] = Field(..., min_length=1)
+    result_type: str = Field("daily_results", description="Series result type to compare")
+    baseline_id: Optional[UUID] = Field(None, description="Simulation used as reference, defaults to the first id")
+    join: str = Field("inner", pattern="^(inner|outer)$", description="How dates of different runs are aligned")
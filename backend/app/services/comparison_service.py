@@ -0,0 +1,189 @@
+from sqlalchemy.orm import Session
+from sqlalchemy import and_
+from typing import List, Optional, Dict, Any
+from uuid import UUID
+import logging
+import numpy as np
+import pandas as pd
+
+from app.models.models import Simulation, SimulationResult, ResultBlob
+from app.services.result_store import payload_field
+
+logger = logging.getLogger(__name__)
+
+# Key holding the time index of each comparable result type
+SERIES_INDEX_KEYS = {
+    'daily_results': 'dates',
+    'monthly_results': 'months'
+}
+
+
+def _finite_or_none(value: float) -> Optional[float]:
+    return float(value) if np.isfinite(value) else None
+
+
+class ResultsComparisonService:
+    """
+    Aligns result series of several simulations and compares them against a baseline
+    """
+    
+    def __init__(self, db: Session):
+        self.db = db
+    
+    def get_owned_simulations(self, simulation_ids: List[UUID], user_id: UUID) -> Dict[UUID, str]:
+        """
+        Get names of the requested simulations owned by the user
+        """
+        rows = self.db.query(Simulation.id, Simulation.name).filter(
+            and_(
+                Simulation.id.in_(simulation_ids),
+                Simulation.owner_id == user_id
+            )
+        ).all()
+        
+        return {row.id: row.name for row in rows}
+    
+    def load_series(
+        self,
+        simulation_ids: List[UUID],
+        variables: List[str],
+        result_type: str
+    ) -> Dict[UUID, Dict[str, Any]]:
+        """
+        Load only the time index and requested variables of each simulation in one query.
+
+        The JSON payload is indexed in SQL, so other series in the result rows are
+        never transferred. When a simulation has several rows of the same type the
+        latest one wins.
+        """
+        index_key = SERIES_INDEX_KEYS[result_type]
+        columns = [payload_field(index_key).label(index_key)]
+        columns += [payload_field(variable).label(f"var_{i}") for i, variable in enumerate(variables)]
+        
+        rows = self.db.query(SimulationResult.simulation_id, *columns).outerjoin(
+            ResultBlob, SimulationResult.blob_hash == ResultBlob.content_hash
+        ).filter(
+            and_(
+                SimulationResult.simulation_id.in_(simulation_ids),
+                SimulationResult.result_type == result_type
+            )
+        ).order_by(SimulationResult.created_at).all()
+        
+        series = {}
+        for row in rows:
+            series[row.simulation_id] = {
+                index_key: row[1] or [],
+                **{variable: row[2 + i] or [] for i, variable in enumerate(variables)}
+            }
+        
+        return series
+    
+    def compare(
+        self,
+        simulation_names: Dict[UUID, str],
+        series: Dict[UUID, Dict[str, Any]],
+        simulation_ids: List[UUID],
+        variables: List[str],
+        result_type: str,
+        baseline_id: UUID,
+        join: str = "inner"
+    ) -> Dict[str, Any]:
+        """
+        Align every variable on a common date index and compare each run with the baseline
+        """
+        index_key = SERIES_INDEX_KEYS[result_type]
+        ordered_ids = [baseline_id] + [sim_id for sim_id in simulation_ids if sim_id != baseline_id]
+        ordered_ids = [sim_id for sim_id in dict.fromkeys(ordered_ids) if sim_id in series]
+        variables = list(dict.fromkeys(variables))
+        
+        # One frame per run with its variables as columns, then a single aligned join
+        frames = []
+        for sim_id in ordered_ids:
+            dates = pd.to_datetime(series[sim_id][index_key], format='ISO8601')
+            frame = pd.DataFrame(index=dates)
+            for variable in variables:
+                values = pd.to_numeric(pd.Series(series[sim_id][variable], dtype=object), errors='coerce')
+                values = values.to_numpy(dtype=np.float64)[:len(dates)]
+                frame[variable] = np.pad(values, (0, len(dates) - len(values)), constant_values=np.nan)
+            frames.append(frame[~frame.index.duplicated(keep='last')])
+        
+        aligned = pd.concat(frames, axis=1, keys=range(len(ordered_ids)), join=join).sort_index()
+        
+        comparison = {
+            "result_type": result_type,
+            "baseline_id": str(baseline_id),
+            "join": join,
+            "simulations": [
+                {"id": str(sim_id), "name": simulation_names.get(sim_id)}
+                for sim_id in ordered_ids
+            ],
+            "dates": [date.strftime('%Y-%m-%d') for date in aligned.index],
+            "variables": {}
+        }
+        
+        for variable in variables:
+            # simulations x dates
+            matrix = aligned.xs(variable, axis=1, level=1).to_numpy(dtype=np.float64).T
+            baseline = matrix[0]
+            
+            with np.errstate(divide='ignore', invalid='ignore'):
+                differences = matrix[1:] - baseline
+                ratios = matrix[1:] / baseline
+            
+            # Arrays are left as NumPy for the response encoder; NaN/inf are written as null
+            comparison["variables"][variable] = {
+                "values": {str(sim_id): matrix[i] for i, sim_id in enumerate(ordered_ids)},
+                "difference": {str(sim_id): differences[i] for i, sim_id in enumerate(ordered_ids[1:])},
+                "ratio": {str(sim_id): ratios[i] for i, sim_id in enumerate(ordered_ids[1:])},
+                "statistics": self._summary_statistics(matrix, ordered_ids)
+            }
+        
+        return comparison
+    
+    def _summary_statistics(self, matrix: np.ndarray, ordered_ids: List[UUID]) -> Dict[str, Dict[str, Any]]:
+        """
+        Per-run statistics and error metrics against the baseline row, computed column-wise
+        """
+        baseline = matrix[0]
+        finite = np.isfinite(matrix)
+        counts = finite.sum(axis=1)
+        filled = np.where(finite, matrix, 0.0)
+        
+        with np.errstate(divide='ignore', invalid='ignore'):
+            totals = filled.sum(axis=1)
+            means = totals / counts
+            stds = np.sqrt(np.where(finite, (matrix - means[:, None]) ** 2, 0.0).sum(axis=1) / counts)
+            minimums = np.where(finite, matrix, np.inf).min(axis=1, initial=np.inf)
+            maximums = np.where(finite, matrix, -np.inf).max(axis=1, initial=-np.inf)
+            
+            # Error metrics only over dates where both runs have values
+            paired = finite & np.isfinite(baseline)
+            paired_counts = paired.sum(axis=1)
+            errors = np.where(paired, matrix - baseline, 0.0)
+            bias = errors.sum(axis=1) / paired_counts
+            rmse = np.sqrt((errors ** 2).sum(axis=1) / paired_counts)
+            baseline_totals = np.where(paired, baseline, 0.0).sum(axis=1)
+            percent_bias = errors.sum(axis=1) / baseline_totals * 100
+            
+            run_anomaly = np.where(paired, matrix - (np.where(paired, matrix, 0.0).sum(axis=1) / paired_counts)[:, None], 0.0)
+            base_anomaly = np.where(paired, baseline - (baseline_totals / paired_counts)[:, None], 0.0)
+            correlation = (run_anomaly * base_anomaly).sum(axis=1) / np.sqrt(
+                (run_anomaly ** 2).sum(axis=1) * (base_anomaly ** 2).sum(axis=1)
+            )
+        
+        statistics = {}
+        for i, sim_id in enumerate(ordered_ids):
+            statistics[str(sim_id)] = {
+                "count": int(counts[i]),
+                "mean": _finite_or_none(means[i]),
+                "std": _finite_or_none(stds[i]),
+                "min": _finite_or_none(minimums[i]),
+                "max": _finite_or_none(maximums[i]),
+                "total": _finite_or_none(totals[i]) if counts[i] else None,
+                "bias": _finite_or_none(bias[i]),
+                "rmse": _finite_or_none(rmse[i]),
+                "percent_bias": _finite_or_none(percent_bias[i]),
+                "correlation": _finite_or_none(correlation[i])
+            }
+        
+        return statistics
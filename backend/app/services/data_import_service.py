@@ -1,19 +1,306 @@
 from sqlalchemy.orm import Session
 from sqlalchemy import and_, func
-from typing import List, Optional, Dict, Any
+from typing import Awaitable, Callable, Iterator, List, Optional, Dict, Any, Tuple
 from uuid import UUID
+import numpy as np
 import pandas as pd
 import io
 import logging
 from datetime import datetime
+import asyncio
+import hashlib
 import json
 import os
+import re
+import shutil
+import tempfile
+import uuid
 from pathlib import Path
 
+try:
+    import pyarrow as pa
+    import pyarrow.csv as pa_csv
+    import pyarrow.parquet as pq
+    PYARROW_AVAILABLE = True
+except ImportError:
+    PYARROW_AVAILABLE = False
+    logging.warning("pyarrow not available - CSV imports will be parsed with pandas and kept without a columnar copy")
+
+from app.core.config import settings
+from app.core.storage import storage
+from app.core.workers import ProgressFile, run_in_process, run_in_process_with_progress
 from app.models.models import User, ImportedDataset, Simulation
+from app.services.data_profiler import DataProfiler
+from app.services.gridded_climate import GRIDDED_FILE_TYPE, basin_average, cf_column_mapping
+from app.services.import_stats import ImportStatsStore
+from app.services.preprocessing import ACCUMULATED_TARGETS, derived_series_key, preprocess_series
+from app.services.timeseries_store import RESAMPLE_UNITS, SeriesBuilder, TimeSeriesStore, META_FILE, INDEX_FILE
 
 logger = logging.getLogger(__name__)
 
+# Rows shown in a dataset preview
+PREVIEW_ROWS = 20
+
+
+def preview_records(df: pd.DataFrame) -> List[Dict[str, Any]]:
+    """
+    Convert the leading rows of a frame to JSON-safe preview records
+    """
+    records = json.loads(df.head(PREVIEW_ROWS).to_json(orient='records', date_format='iso'))
+    return [{key: '' if value is None else value for key, value in record.items()} for record in records]
+
+
+def _csv_error(error: Exception) -> Exception:
+    """
+    Map a pyarrow CSV error to the exception pandas raises for the same input
+    """
+    message = str(error)
+    if "Empty CSV" in message:
+        return pd.errors.EmptyDataError("No columns to parse from file")
+    if "invalid UTF8" in message:
+        return UnicodeDecodeError('utf-8', b'', 0, 1, message)
+    return pd.errors.ParserError(message)
+
+
+def iter_csv_chunks(path: str, progress: Optional[Callable[[float], None]] = None) -> Iterator[pd.DataFrame]:
+    """
+    Parse a CSV file as a sequence of DataFrame chunks.
+
+    pyarrow's streaming reader infers column types from the first block, so
+    integer columns are widened to float64 and all-empty columns read as
+    strings, to accept values that only appear in later blocks. A column
+    that meets a value it cannot convert (a ``missing`` marker in a numeric
+    column) is read as strings from that chunk on, as pandas reads such a
+    chunk as objects. Files that are not UTF-8 raise UnicodeDecodeError, as
+    they do with pandas. ``progress`` is called with the fraction of the
+    file parsed after each chunk.
+    """
+    size = max(os.path.getsize(path), 1)
+    if PYARROW_AVAILABLE:
+        read_options = pa_csv.ReadOptions(block_size=settings.IMPORT_CHUNK_BYTES)
+        try:
+            schema = pa_csv.open_csv(path, read_options=read_options).schema
+            
+            # Undecodable text is inferred as binary rather than rejected
+            binary = [field.name for field in schema if pa.types.is_binary(field.type)]
+            if binary:
+                raise UnicodeDecodeError('utf-8', b'', 0, 1, f"invalid UTF8 data in column {binary[0]}")
+            
+            column_types = {field.name: pa.float64() for field in schema if pa.types.is_integer(field.type)}
+            column_types.update({field.name: pa.string() for field in schema if pa.types.is_null(field.type)})
+        except pa.ArrowInvalid as e:
+            raise _csv_error(e)
+        
+        blocks = 0
+        while True:
+            try:
+                reader = pa_csv.open_csv(
+                    path,
+                    read_options=read_options,
+                    convert_options=pa_csv.ConvertOptions(column_types=column_types)
+                )
+                # Each batch is parsed from one block of the file, so a
+                # re-read skips the blocks already yielded
+                for number, batch in enumerate(reader, start=1):
+                    if number <= blocks:
+                        continue
+                    yield batch.to_pandas()
+                    blocks = number
+                    if progress:
+                        progress(min(1.0, blocks * settings.IMPORT_CHUNK_BYTES / size))
+                return
+            except pa.ArrowInvalid as e:
+                column = _unconvertible_column(e, schema)
+                if column is None or pa.types.is_string(column_types.get(column, schema.field(column).type)):
+                    raise _csv_error(e)
+                logger.info(f"Reading column {column} of {os.path.basename(path)} as text from block {blocks + 1}")
+                column_types[column] = pa.string()
+    else:
+        with open(path, 'rb') as f:
+            for chunk in pd.read_csv(f, chunksize=settings.IMPORT_CHUNK_ROWS):
+                yield chunk
+                if progress:
+                    progress(f.tell() / size)
+
+
+def _unconvertible_column(error: Exception, schema: Any) -> Optional[str]:
+    """
+    Name of the column a pyarrow CSV conversion error refers to, if any
+    """
+    match = re.match(r"In CSV column #(\d+): .*CSV conversion error", str(error))
+    if not match or int(match.group(1)) >= len(schema):
+        return None
+    return schema.field(int(match.group(1))).name
+
+
+class _ColumnarWriter:
+    """
+    Writes parsed CSV chunks to a typed Parquet copy, with the date column
+    stored as timestamps. A chunk that does not fit the schema of the first
+    one abandons the copy, and readers fall back to the raw file.
+    """
+    
+    def __init__(self, path: str):
+        self.path = path
+        self.schema = None
+        self.writer = None
+        self.failed = False
+    
+    def write(self, chunk: pd.DataFrame, date_column: Optional[str], dates: Optional[pd.Series]):
+        if self.failed:
+            return
+        if date_column and dates is not None:
+            chunk = chunk.assign(**{date_column: dates})
+        
+        try:
+            table = pa.Table.from_pandas(chunk, schema=self.schema, preserve_index=False)
+            if self.writer is None:
+                # Columns that are empty in the first chunk default to strings
+                self.schema = pa.schema([
+                    field.with_type(pa.string()) if pa.types.is_null(field.type) else field
+                    for field in table.schema
+                ]).remove_metadata()
+                table = table.cast(self.schema)
+                self.writer = pq.ParquetWriter(self.path, self.schema, compression='zstd')
+            self.writer.write_table(table)
+        except (pa.ArrowInvalid, pa.ArrowTypeError, pa.ArrowNotImplementedError) as e:
+            logger.warning(f"Columnar copy abandoned: {str(e)}")
+            self.failed = True
+    
+    def close(self) -> bool:
+        """
+        Finish the copy, returning whether it is complete
+        """
+        if self.writer is not None:
+            self.writer.close()
+        if self.failed or self.writer is None:
+            if os.path.exists(self.path):
+                os.remove(self.path)
+            return False
+        return True
+
+
+async def spool_to_file(file: Any, directory: Optional[str], max_bytes: int) -> Tuple[str, int, str]:
+    """
+    Stream an upload to a spool file in ``directory`` (the system temp
+    directory when None).
+
+    Returns the spool path, size in bytes and SHA-256 hex digest, hashed as
+    the bytes stream past. Raises ValueError when the upload exceeds
+    ``max_bytes``, however the client declared its size.
+    """
+    spool = tempfile.NamedTemporaryFile(dir=directory, prefix=".upload-", delete=False)
+    digest = hashlib.sha256()
+    size = 0
+    try:
+        with spool:
+            while True:
+                chunk = await file.read(settings.UPLOAD_SPOOL_CHUNK_BYTES)
+                if not chunk:
+                    break
+                size += len(chunk)
+                if size > max_bytes:
+                    raise ValueError(f"File size exceeds {max_bytes // (1024 * 1024)}MB limit")
+                digest.update(chunk)
+                spool.write(chunk)
+    except Exception:
+        os.remove(spool.name)
+        raise
+    
+    return spool.name, size, digest.hexdigest()
+
+
+def profile_upload(
+    spool_path: str,
+    columnar_path: Optional[str],
+    file_type: str,
+    series_dir: Optional[str] = None,
+    progress_path: Optional[str] = None
+) -> Dict[str, Any]:
+    """
+    Parse a spooled CSV upload and build everything stored with its dataset.
+
+    Runs on an ingestion worker process, so it takes and returns only
+    picklable values. The typed columnar copy is written to ``columnar_path``
+    and, for dated data, the series store to ``series_dir``. Progress is
+    reported to ``progress_path`` when given.
+    """
+    profile = DataProfiler()
+    writer = _ColumnarWriter(columnar_path) if columnar_path and PYARROW_AVAILABLE else None
+    series = SeriesBuilder(series_dir) if series_dir else None
+    try:
+        for chunk in iter_csv_chunks(spool_path, ProgressFile(progress_path).report):
+            dates = profile.update(chunk)
+            if writer:
+                writer.write(chunk, profile.date_column, dates)
+            if series and dates is not None:
+                series.append(chunk, profile.date_column, dates)
+    finally:
+        has_columnar = writer.close() if writer else False
+    
+    return {
+        "validation": profile.validate(file_type),
+        "records_count": profile.total_rows,
+        "columns": profile.columns,
+        "data_summary": profile.summary(),
+        "quality_metrics": profile.quality_metrics(),
+        "column_mapping": profile.column_mapping(),
+        "preview_data": preview_records(profile.head) if profile.head is not None else None,
+        "has_columnar": has_columnar,
+        "series": series.close() if series else None
+    }
+
+
+def profile_gridded_upload(
+    spool_path: str,
+    csv_path: str,
+    columnar_path: Optional[str],
+    series_dir: str,
+    basin_polygon: Optional[List[List[float]]] = None,
+    progress_path: Optional[str] = None
+) -> Dict[str, Any]:
+    """
+    Reduce a spooled NetCDF upload to basin-average series and profile them.
+
+    The series are written to ``csv_path`` and stored in place of the grid,
+    then profiled like a CSV upload. Runs on an ingestion worker process.
+    """
+    grid = basin_average(spool_path, csv_path, basin_polygon, ProgressFile(progress_path).report)
+    profile = profile_upload(csv_path, columnar_path, GRIDDED_FILE_TYPE, series_dir)
+    profile['data_summary']['grid'] = grid
+    profile['column_mapping'].update(cf_column_mapping(grid['variables']))
+    return profile
+
+
+def build_series_store(path: str, date_column: str, directory: str) -> Optional[Dict[str, Any]]:
+    """
+    Build the series store of a stored CSV file, for datasets imported
+    before series were kept. Runs on an ingestion worker process.
+    """
+    series = SeriesBuilder(directory)
+    for chunk in iter_csv_chunks(path):
+        series.append(chunk, date_column, pd.to_datetime(chunk[date_column], errors='coerce'))
+    return series.close()
+
+
+def validate_upload(spool_path: str, required_columns: List[str], preview_rows: int) -> Dict[str, Any]:
+    """
+    Profile a spooled CSV upload for validation without storing it.
+
+    Runs on an ingestion worker process like ``profile_upload``.
+    """
+    profile = DataProfiler()
+    for chunk in iter_csv_chunks(spool_path):
+        profile.update(chunk)
+    
+    return {
+        "missing_required_columns": profile.missing_required(required_columns),
+        "available_columns": profile.columns,
+        "data_quality": profile.data_quality(),
+        "preview": preview_records(profile.head.head(preview_rows)) if profile.head is not None else []
+    }
+
+
 class DataImportService:
     """
     Service layer for handling data imports
@@ -21,229 +308,204 @@ class DataImportService:
     
     def __init__(self, db: Session):
         self.db = db
-        self.upload_directory = Path("./uploads")
-        self.upload_directory.mkdir(exist_ok=True)
+    
+    async def spool_upload(self, file: Any, user_id: UUID, max_bytes: int) -> Tuple[str, int, str]:
+        """
+        Stream an upload to a spool file in the storage staging directory.
+
+        Returns the spool path, size in bytes and content hash. Raises
+        ValueError when the upload exceeds ``max_bytes``.
+        """
+        return await spool_to_file(file, storage.staging_dir(), max_bytes)
     
     async def process_uploaded_file(
         self,
-        file: Any,  # UploadFile
+        filename: str,
         file_type: str,
-        content: bytes,
+        spool_path: str,
+        file_size: int,
         user_id: UUID,
-        description: Optional[str] = None
+        description: Optional[str] = None,
+        content_hash: Optional[str] = None,
+        basin_polygon: Optional[List[List[float]]] = None,
+        report: Optional[Callable[[str, float], Awaitable[None]]] = None
     ) -> Dict[str, Any]:
         """
-        Process and store an uploaded file
+        Profile, validate and store a spooled upload.
+
+        The file is parsed chunk by chunk on a worker process, so peak memory
+        is bounded by the chunk size and the event loop stays free. The spool
+        file is moved into place on success and removed otherwise. Content
+        the user already imported with the same type is not parsed again: the
+        new dataset shares the stored file, columnar copy and profile.
+        
+        Gridded climate files are reduced to basin-average series over
+        ``basin_polygon`` (or the file's own mask), and only the series are
+        stored.
+        
+        ``report`` is awaited with each stage entered ('processing',
+        'storing', 'recording') and the fraction of it done.
         """
+        async def stage(name: str, fraction: float = 0.0):
+            if report:
+                await report(name, fraction)
+        
+        gridded = file_type == GRIDDED_FILE_TYPE
+        columnar_spool = f"{spool_path}.parquet"
+        series_spool = f"{spool_path}.series"
+        csv_spool = f"{spool_path}.csv"
+        if gridded and basin_polygon and content_hash:
+            # The same grid averaged over another basin is different content
+            polygon = json.dumps(basin_polygon, separators=(',', ':'))
+            content_hash = hashlib.sha256(f"{content_hash}:{polygon}".encode()).hexdigest()
         try:
-            # Parse the CSV content
-            df = pd.read_csv(io.StringIO(content.decode('utf-8')))
-            
-            # Validate the data
-            validation_result = self._validate_data(df, file_type)
-            
-            if not validation_result['is_valid']:
-                return {
-                    "filename": file.filename,
-                    "status": "error",
-                    "error": f"Validation failed: {', '.join(validation_result['errors'])}"
-                }
-            
-            # Store the file
-            file_path = await self._store_file(file, content, user_id, file_type)
+            existing = await self._find_imported_content(user_id, file_type, content_hash) if content_hash else None
             
-            # Create database record
-            dataset_record = ImportedDataset(
-                filename=file.filename,
-                original_filename=file.filename,
-                file_type=file_type,
-                file_path=str(file_path),
-                file_size=len(content),
-                description=description,
-                data_summary=self._generate_data_summary(df),
-                quality_metrics=self._calculate_quality_metrics(df),
-                column_mapping=self._generate_column_mapping(df, file_type),
-                owner_id=user_id
-            )
+            if existing:
+                dataset_record = ImportedDataset(
+                    filename=filename,
+                    original_filename=filename,
+                    file_type=file_type,
+                    file_path=existing.file_path,
+                    columnar_path=existing.columnar_path,
+                    series_path=existing.series_path,
+                    file_size=file_size,
+                    content_hash=content_hash,
+                    description=description,
+                    data_summary=existing.data_summary,
+                    quality_metrics=existing.quality_metrics,
+                    column_mapping=existing.column_mapping,
+                    preview_data=existing.preview_data,
+                    owner_id=user_id
+                )
+            else:
+                # Parsing, profiling, the columnar copy and the series index
+                # are built in one pass on an ingestion worker process
+                await stage('processing')
+                if gridded:
+                    worker, args = profile_gridded_upload, (spool_path, csv_spool, columnar_spool, series_spool, basin_polygon)
+                else:
+                    worker, args = profile_upload, (spool_path, columnar_spool, file_type, series_spool)
+                if report:
+                    profile = await run_in_process_with_progress(
+                        worker,
+                        *args,
+                        progress_path=f"{spool_path}.progress",
+                        on_progress=lambda fraction: report('processing', fraction)
+                    )
+                else:
+                    profile = await run_in_process(worker, *args)
+                
+                # Validate the data
+                validation_result = profile['validation']
+                
+                if not validation_result['is_valid']:
+                    return {
+                        "filename": filename,
+                        "status": "error",
+                        "error": f"Validation failed: {', '.join(validation_result['errors'])}"
+                    }
+                
+                # Store the file, with its columnar copy alongside; gridded
+                # files are stored as their basin series
+                await stage('storing')
+                if gridded:
+                    file_path = await self._store_file(csv_spool, f"{filename}.csv", user_id, file_type)
+                else:
+                    file_path = await self._store_file(spool_path, filename, user_id, file_type)
+                columnar_path = None
+                if profile['has_columnar']:
+                    columnar_path = f"{file_path}.parquet"
+                    await storage.put_file(columnar_spool, columnar_path)
+                series_path = None
+                if profile['series']:
+                    series_path = f"{file_path}.series"
+                    await self._store_series(series_spool, series_path)
+                
+                dataset_record = ImportedDataset(
+                    filename=filename,
+                    original_filename=filename,
+                    file_type=file_type,
+                    file_path=file_path,
+                    columnar_path=columnar_path,
+                    series_path=series_path,
+                    file_size=file_size,
+                    content_hash=content_hash,
+                    description=description,
+                    data_summary=profile['data_summary'],
+                    quality_metrics=profile['quality_metrics'],
+                    column_mapping=profile['column_mapping'],
+                    preview_data=profile['preview_data'],
+                    owner_id=user_id
+                )
             
+            # Create database record, counted in the same transaction
+            await stage('recording')
             self.db.add(dataset_record)
+            self.db.flush()
+            ImportStatsStore(self.db).record(dataset_record, 1)
             self.db.commit()
             self.db.refresh(dataset_record)
             
-            logger.info(f"Successfully imported dataset {dataset_record.id} for user {user_id}")
+            logger.info(
+                f"Successfully imported dataset {dataset_record.id} for user {user_id}"
+                + (f" (content of dataset {existing.id})" if existing else "")
+            )
             
             return {
-                "filename": file.filename,
+                "filename": filename,
                 "status": "success",
                 "dataset_id": str(dataset_record.id),
                 "file_type": file_type,
-                "records_count": len(df),
-                "columns": list(df.columns),
-                "data_summary": dataset_record.data_summary
+                "records_count": dataset_record.data_summary['total_rows'],
+                "columns": dataset_record.data_summary['columns'],
+                "data_summary": dataset_record.data_summary,
+                "deduplicated": existing is not None
             }
             
         except Exception as e:
-            logger.error(f"Error processing file {file.filename}: {str(e)}")
+            logger.error(f"Error processing file {filename}: {str(e)}")
             return {
-                "filename": file.filename,
+                "filename": filename,
                 "status": "error",
                 "error": str(e)
             }
+        finally:
+            for path in (spool_path, columnar_spool, csv_spool):
+                if os.path.exists(path):
+                    os.remove(path)
+            shutil.rmtree(series_spool, ignore_errors=True)
     
-    def _validate_data(self, df: pd.DataFrame, file_type: str) -> Dict[str, Any]:
-        """
-        Validate the imported data based on file type
-        """
-        errors = []
-        warnings = []
-        
-        # Basic validation
-        if df.empty:
-            errors.append("File is empty")
-            return {"is_valid": False, "errors": errors, "warnings": warnings}
-        
-        # File type specific validation
-        if file_type == 'meteorological':
-            if not any('date' in col.lower() for col in df.columns):
-                errors.append("Date column not found")
-            if not any('precip' in col.lower() for col in df.columns):
-                errors.append("Precipitation column not found")
-            if not any('temp' in col.lower() for col in df.columns):
-                warnings.append("Temperature column not found")
-                
-        elif file_type == 'observed_flow':
-            if not any('date' in col.lower() for col in df.columns):
-                errors.append("Date column not found")
-            if not any('flow' in col.lower() or 'discharge' in col.lower() for col in df.columns):
-                errors.append("Flow/discharge column not found")
-                
-        elif file_type == 'streamflow':
-            if not any('date' in col.lower() for col in df.columns):
-                errors.append("Date column not found")
-            if not any('discharge' in col.lower() or 'flow' in col.lower() for col in df.columns):
-                errors.append("Discharge column not found")
-                
-        elif file_type == 'groundwater':
-            if not any('date' in col.lower() for col in df.columns):
-                errors.append("Date column not found")
-            if not any('level' in col.lower() or 'depth' in col.lower() for col in df.columns):
-                errors.append("Water level column not found")
-                
-        elif file_type == 'basin_data':
-            if not any('parameter' in col.lower() for col in df.columns):
-                errors.append("Parameter column not found")
-            if not any('value' in col.lower() for col in df.columns):
-                errors.append("Value column not found")
-        
-        # Check for missing values
-        missing_percent = (df.isnull().sum() / len(df) * 100).max()
-        if missing_percent > 50:
-            warnings.append(f"High percentage of missing values ({missing_percent:.1f}%)")
-        elif missing_percent > 20:
-            warnings.append(f"Moderate missing values ({missing_percent:.1f}%)")
-        
-        return {
-            "is_valid": len(errors) == 0,
-            "errors": errors,
-            "warnings": warnings
-        }
-    
-    async def _store_file(self, file: Any, content: bytes, user_id: UUID, file_type: str) -> Path:
-        """
-        Store the uploaded file to disk
-        """
-        # Create user-specific directory
-        user_dir = self.upload_directory / str(user_id)
-        user_dir.mkdir(exist_ok=True)
-        
-        # Generate unique filename
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        filename = f"{file_type}_{timestamp}_{file.filename}"
-        file_path = user_dir / filename
-        
-        # Write file
-        with open(file_path, 'wb') as f:
-            f.write(content)
-        
-        return file_path
-    
-    def _generate_data_summary(self, df: pd.DataFrame) -> Dict[str, Any]:
+    async def _find_imported_content(self, user_id: UUID, file_type: str, content_hash: str) -> Optional[ImportedDataset]:
         """
-        Generate a summary of the data
+        Find a dataset of the user with the same content and type whose
+        stored file still exists
         """
-        summary = {
-            "total_rows": len(df),
-            "total_columns": len(df.columns),
-            "columns": list(df.columns),
-            "data_types": df.dtypes.astype(str).to_dict(),
-            "date_range": None,
-            "numeric_summary": {}
-        }
-        
-        # Try to find date column and get range
-        date_cols = [col for col in df.columns if 'date' in col.lower()]
-        if date_cols:
-            try:
-                date_series = pd.to_datetime(df[date_cols[0]])
-                summary["date_range"] = {
-                    "start": date_series.min().isoformat(),
-                    "end": date_series.max().isoformat(),
-                    "total_days": (date_series.max() - date_series.min()).days
-                }
-            except:
-                pass
-        
-        # Get numeric column summary
-        numeric_cols = df.select_dtypes(include=['number']).columns
-        for col in numeric_cols[:5]:  # Limit to first 5 numeric columns
-            summary["numeric_summary"][col] = {
-                "min": float(df[col].min()),
-                "max": float(df[col].max()),
-                "mean": float(df[col].mean()),
-                "count": int(df[col].count())
-            }
+        candidates = self.db.query(ImportedDataset).filter(
+            and_(
+                ImportedDataset.content_hash == content_hash,
+                ImportedDataset.owner_id == user_id,
+                ImportedDataset.file_type == file_type
+            )
+        ).order_by(ImportedDataset.created_at.desc()).all()
         
-        return summary
+        for dataset in candidates:
+            if await storage.exists(dataset.file_path):
+                return dataset
+        return None
     
-    def _calculate_quality_metrics(self, df: pd.DataFrame) -> Dict[str, Any]:
-        """
-        Calculate data quality metrics
+    async def _store_file(self, spool_path: str, filename: str, user_id: UUID, file_type: str) -> str:
         """
-        return {
-            "completeness": float((1 - df.isnull().sum().sum() / (len(df) * len(df.columns))) * 100),
-            "missing_values": df.isnull().sum().to_dict(),
-            "duplicate_rows": int(df.duplicated().sum()),
-            "unique_values": {col: int(df[col].nunique()) for col in df.columns[:10]}  # Limit to 10 columns
-        }
-    
-    def _generate_column_mapping(self, df: pd.DataFrame, file_type: str) -> Dict[str, str]:
+        Move a spooled upload to storage, returning its key
         """
-        Generate mapping between data columns and model parameters
-        """
-        mapping = {}
+        # Generate unique filename; files of one upload are stored
+        # concurrently and may share a name and second
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        key = f"{settings.UPLOAD_DIR}/{user_id}/{file_type}_{timestamp}_{uuid.uuid4().hex[:12]}_{filename}"
         
-        for col in df.columns:
-            col_lower = col.lower()
-            
-            # Common mappings
-            if 'date' in col_lower:
-                mapping[col] = 'date'
-            elif 'precip' in col_lower:
-                mapping[col] = 'precipitation'
-            elif 'temp' in col_lower:
-                mapping[col] = 'temperature'
-            elif 'flow' in col_lower or 'discharge' in col_lower:
-                mapping[col] = 'flow'
-            elif 'level' in col_lower:
-                mapping[col] = 'water_level'
-            elif 'humid' in col_lower:
-                mapping[col] = 'humidity'
-            elif 'wind' in col_lower:
-                mapping[col] = 'wind_speed'
-            else:
-                mapping[col] = col  # Keep original name
+        await storage.put_file(spool_path, key)
         
-        return mapping
+        return key
     
     async def get_user_datasets(
         self,
@@ -297,13 +559,25 @@ class DataImportService:
         if not dataset:
             return None
         
-        # Load and preview data if file exists
-        preview_data = None
-        if os.path.exists(dataset.file_path):
+        # Previews are stored at ingest; older datasets read a bounded number
+        # of rows once and keep the result
+        preview_data = dataset.preview_data
+        if preview_data is None and await storage.exists(dataset.file_path):
             try:
-                df = pd.read_csv(dataset.file_path)
-                preview_data = df.head(20).fillna('').to_dict(orient='records')
+                frame = await asyncio.to_thread(self.load_dataset_frame, dataset, limit=PREVIEW_ROWS)
+                preview_data = preview_records(frame)
+                
+                # Backfilling the preview is not an edit, so keep updated_at
+                self.db.query(ImportedDataset).filter(ImportedDataset.id == dataset.id).update(
+                    {
+                        ImportedDataset.preview_data: preview_data,
+                        ImportedDataset.updated_at: dataset.updated_at
+                    },
+                    synchronize_session=False
+                )
+                self.db.commit()
             except Exception as e:
+                self.db.rollback()
                 logger.warning(f"Could not load data preview for dataset {dataset_id}: {str(e)}")
         
         return {
@@ -322,6 +596,296 @@ class DataImportService:
             "is_active": dataset.is_active
         }
     
+    def load_dataset_frame(
+        self,
+        dataset: ImportedDataset,
+        columns: Optional[List[str]] = None,
+        start: Optional[datetime] = None,
+        end: Optional[datetime] = None,
+        limit: Optional[int] = None
+    ) -> pd.DataFrame:
+        """
+        Read a dataset, preferring its memory-mapped columnar copy.
+
+        ``start`` and ``end`` filter on the date column, and are pushed down to
+        Parquet row groups when the copy exists. Datasets imported without a
+        copy are read from the raw CSV. Blocks on storage, so call it off the
+        event loop.
+        """
+        date_column = next(
+            (col for col, target in (dataset.column_mapping or {}).items() if target == 'date'),
+            None
+        )
+        if columns is not None and date_column and date_column not in columns and (start or end):
+            columns = [date_column] + list(columns)
+        
+        columnar_path = None
+        if dataset.columnar_path and PYARROW_AVAILABLE:
+            try:
+                columnar_path = storage.local_path(dataset.columnar_path)
+            except FileNotFoundError:
+                logger.warning(f"Columnar copy of dataset {dataset.id} is missing, reading the raw file")
+        
+        if columnar_path:
+            filters = []
+            if date_column and start is not None:
+                filters.append((date_column, '>=', pd.Timestamp(start)))
+            if date_column and end is not None:
+                filters.append((date_column, '<=', pd.Timestamp(end)))
+            
+            if limit is not None and not filters:
+                # Read only the leading rows instead of the whole copy
+                parquet_file = pq.ParquetFile(columnar_path, memory_map=True)
+                batch = next(parquet_file.iter_batches(batch_size=limit, columns=columns), None)
+                return batch.to_pandas() if batch is not None else pd.DataFrame(columns=columns or [])
+            
+            table = pq.read_table(
+                columnar_path,
+                columns=columns,
+                filters=filters or None,
+                memory_map=True
+            )
+            df = table.to_pandas()
+            return df.head(limit) if limit is not None else df
+        
+        df = pd.read_csv(storage.local_path(dataset.file_path), usecols=columns, nrows=limit if not (start or end) else None)
+        if date_column and date_column in df.columns:
+            df[date_column] = pd.to_datetime(df[date_column], errors='coerce')
+            if start is not None:
+                df = df[df[date_column] >= pd.Timestamp(start)]
+            if end is not None:
+                df = df[df[date_column] <= pd.Timestamp(end)]
+        return df.head(limit) if limit is not None else df
+    
+    async def _store_series(self, directory: str, series_path: str):
+        """
+        Move a series store built on local disk to storage
+        """
+        # Metadata goes last, so a store whose metadata exists is complete
+        for name in sorted(os.listdir(directory), key=lambda name: name == META_FILE):
+            await storage.put_file(os.path.join(directory, name), f"{series_path}/{name}")
+    
+    def open_series(self, dataset: ImportedDataset) -> TimeSeriesStore:
+        """
+        Open a dataset's series store, memory-mapped from local files.
+
+        Blocks on storage, so call it off the event loop.
+        """
+        return self._open_store(dataset.series_path)
+    
+    def _open_store(self, series_path: str) -> TimeSeriesStore:
+        meta_path = storage.local_path(f"{series_path}/{META_FILE}")
+        with open(meta_path) as f:
+            files = [INDEX_FILE] + list(json.load(f)["variables"].values())
+        for name in files:
+            storage.local_path(f"{series_path}/{name}")
+        return TimeSeriesStore(os.path.dirname(meta_path))
+    
+    async def processed_series_store(
+        self,
+        dataset: ImportedDataset,
+        frequency: str = 'daily',
+        method: str = 'linear',
+        neighbour: Optional[ImportedDataset] = None
+    ) -> TimeSeriesStore:
+        """
+        Open a dataset's series regularized to a time step with gaps filled.
+
+        The processed store is built once per dataset, time step, fill method
+        and neighbour, then kept in storage beside the dataset's own store.
+        """
+        if not dataset.series_path:
+            await self._backfill_series(dataset)
+        if neighbour is not None and not neighbour.series_path:
+            await self._backfill_series(neighbour)
+        
+        neighbour_key = (neighbour.content_hash or str(neighbour.id))[:16] if neighbour is not None else None
+        key = derived_series_key(dataset.series_path, frequency, method, neighbour_key)
+        
+        if not await storage.exists(f"{key}/{META_FILE}"):
+            source = await asyncio.to_thread(self.open_series, dataset)
+            accumulated = [
+                col for col, target in (dataset.column_mapping or {}).items()
+                if target in ACCUMULATED_TARGETS
+            ]
+            
+            neighbour_directory = None
+            neighbour_variables = None
+            if neighbour is not None:
+                neighbour_directory = (await asyncio.to_thread(self.open_series, neighbour)).directory
+                neighbour_variables = self._match_variables(dataset, neighbour)
+            
+            directory = tempfile.mkdtemp(prefix=".derived-", dir=storage.staging_dir())
+            try:
+                await run_in_process(
+                    preprocess_series,
+                    source.directory,
+                    directory,
+                    frequency,
+                    method,
+                    accumulated,
+                    neighbour_directory,
+                    neighbour_variables
+                )
+                await self._store_series(directory, key)
+            finally:
+                shutil.rmtree(directory, ignore_errors=True)
+        
+        return await asyncio.to_thread(self._open_store, key)
+    
+    @staticmethod
+    def _match_variables(dataset: ImportedDataset, neighbour: ImportedDataset) -> Dict[str, str]:
+        """
+        Pair each column of a dataset with the neighbour column mapped to the
+        same model parameter, or else with the same name
+        """
+        by_target = {target: col for col, target in (neighbour.column_mapping or {}).items()}
+        neighbour_columns = (neighbour.data_summary or {}).get("columns") or list(neighbour.column_mapping or {})
+        
+        matches = {}
+        for col, target in (dataset.column_mapping or {}).items():
+            if target in by_target and target != col:
+                matches[col] = by_target[target]
+            elif col in neighbour_columns:
+                matches[col] = col
+        return matches
+    
+    async def get_processed_series(
+        self,
+        dataset_id: UUID,
+        user_id: UUID,
+        frequency: str = 'daily',
+        method: str = 'linear',
+        neighbour_id: Optional[UUID] = None,
+        variables: Optional[List[str]] = None,
+        start: Optional[datetime] = None,
+        end: Optional[datetime] = None
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Read a dataset's regularized, gap-filled series within a date range.
+
+        Raises ValueError for undated datasets, unknown variables and a
+        missing neighbour.
+        """
+        dataset = self.db.query(ImportedDataset).filter(
+            and_(
+                ImportedDataset.id == dataset_id,
+                ImportedDataset.owner_id == user_id
+            )
+        ).first()
+        
+        if not dataset:
+            return None
+        
+        neighbour = None
+        if neighbour_id:
+            neighbour = self.db.query(ImportedDataset).filter(
+                and_(
+                    ImportedDataset.id == neighbour_id,
+                    ImportedDataset.owner_id == user_id
+                )
+            ).first()
+            if not neighbour:
+                raise ValueError("Neighbouring dataset not found")
+        elif method == 'regression':
+            raise ValueError("Regression filling needs a neighbouring dataset")
+        
+        store = await self.processed_series_store(dataset, frequency, method, neighbour)
+        unknown = [variable for variable in variables or [] if variable not in store.variables]
+        if unknown:
+            raise ValueError(f"Unknown variables: {', '.join(unknown)}. Available: {', '.join(store.variables)}")
+        
+        data = await asyncio.to_thread(store.read, variables, start, end)
+        dates = data.pop("dates")
+        return {
+            "dataset_id": str(dataset.id),
+            "frequency": frequency,
+            "preprocessing": store.meta["preprocessing"],
+            "count": len(dates),
+            "dates": np.datetime_as_string(dates, unit=RESAMPLE_UNITS[frequency]).tolist(),
+            "series": data
+        }
+    
+    async def get_dataset_series(
+        self,
+        dataset_id: UUID,
+        user_id: UUID,
+        variables: Optional[List[str]] = None,
+        start: Optional[datetime] = None,
+        end: Optional[datetime] = None,
+        frequency: Optional[str] = None,
+        aggregation: str = 'mean'
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Read a dataset's series within a date range, optionally resampled.
+
+        Raises ValueError for undated datasets and unknown variables. The
+        series store of datasets imported before stores were kept is built on
+        first use.
+        """
+        dataset = self.db.query(ImportedDataset).filter(
+            and_(
+                ImportedDataset.id == dataset_id,
+                ImportedDataset.owner_id == user_id
+            )
+        ).first()
+        
+        if not dataset:
+            return None
+        
+        if not dataset.series_path:
+            await self._backfill_series(dataset)
+        
+        store = await asyncio.to_thread(self.open_series, dataset)
+        unknown = [variable for variable in variables or [] if variable not in store.variables]
+        if unknown:
+            raise ValueError(f"Unknown variables: {', '.join(unknown)}. Available: {', '.join(store.variables)}")
+        
+        if frequency:
+            data = await asyncio.to_thread(store.resample, frequency, aggregation, variables, start, end)
+        else:
+            data = await asyncio.to_thread(store.read, variables, start, end)
+        
+        dates = data.pop("dates")
+        return {
+            "dataset_id": str(dataset.id),
+            "frequency": frequency,
+            "aggregation": aggregation if frequency else None,
+            "count": len(dates),
+            "dates": np.datetime_as_string(dates).tolist(),
+            "series": data
+        }
+    
+    async def _backfill_series(self, dataset: ImportedDataset):
+        date_column = next(
+            (col for col, target in (dataset.column_mapping or {}).items() if target == 'date'),
+            None
+        )
+        if not date_column:
+            raise ValueError("Dataset has no date column")
+        
+        directory = tempfile.mkdtemp(prefix=".series-", dir=storage.staging_dir())
+        try:
+            path = await storage.fetch_local(dataset.file_path)
+            if not await run_in_process(build_series_store, path, date_column, directory):
+                raise ValueError("Dataset has no dated numeric values")
+            
+            series_path = f"{dataset.file_path}.series"
+            await self._store_series(directory, series_path)
+        finally:
+            shutil.rmtree(directory, ignore_errors=True)
+        
+        # Every dataset sharing the file shares the store; keep updated_at
+        self.db.query(ImportedDataset).filter(ImportedDataset.file_path == dataset.file_path).update(
+            {
+                ImportedDataset.series_path: series_path,
+                ImportedDataset.updated_at: ImportedDataset.updated_at
+            },
+            synchronize_session=False
+        )
+        self.db.commit()
+        dataset.series_path = series_path
+    
     async def delete_dataset(self, dataset_id: UUID, user_id: UUID) -> bool:
         """
         Delete a user's dataset
@@ -336,15 +900,28 @@ class DataImportService:
         if not dataset:
             return False
         
-        # Delete file from disk
-        try:
-            if os.path.exists(dataset.file_path):
-                os.remove(dataset.file_path)
-        except Exception as e:
-            logger.warning(f"Could not delete file {dataset.file_path}: {str(e)}")
+        # Delete stored files, unless another dataset shares them
+        shared = self.db.query(ImportedDataset.id).filter(
+            and_(
+                ImportedDataset.file_path == dataset.file_path,
+                ImportedDataset.id != dataset.id
+            )
+        ).first()
+        if not shared:
+            try:
+                for key in (dataset.file_path, dataset.columnar_path):
+                    if key:
+                        await storage.delete(key)
+                if dataset.series_path:
+                    await storage.delete_prefix(f"{dataset.series_path}/")
+                    await storage.delete_prefix(f"{dataset.series_path}.derived/")
+            except Exception as e:
+                logger.warning(f"Could not delete file {dataset.file_path}: {str(e)}")
         
-        # Delete database record
+        # Delete database record, counted in the same transaction
         self.db.delete(dataset)
+        self.db.flush()
+        ImportStatsStore(self.db).record(dataset, -1)
         self.db.commit()
         
         logger.info(f"Deleted dataset {dataset_id} for user {user_id}")
@@ -377,15 +954,16 @@ class DataImportService:
         if not dataset or not simulation:
             return False
         
-        # Update simulation configuration to include dataset reference
-        config = simulation.configuration or {}
-        if 'linked_datasets' not in config:
-            config['linked_datasets'] = {}
-        
-        config['linked_datasets'][dataset.file_type] = {
-            'dataset_id': str(dataset_id),
-            'filename': dataset.filename,
-            'linked_at': datetime.now().isoformat()
+        # Update simulation configuration to include dataset reference. A new
+        # dict is assigned: the JSON column does not track in-place changes
+        config = dict(simulation.configuration or {})
+        config['linked_datasets'] = {
+            **config.get('linked_datasets', {}),
+            dataset.file_type: {
+                'dataset_id': str(dataset_id),
+                'filename': dataset.filename,
+                'linked_at': datetime.now().isoformat()
+            }
         }
         
         simulation.configuration = config
@@ -400,26 +978,4 @@ class DataImportService:
         """
         Get user's data import statistics
         """
-        datasets = self.db.query(ImportedDataset).filter(ImportedDataset.owner_id == user_id).all()
-        
-        # Count by file type
-        type_counts = {}
-        for dataset in datasets:
-            type_counts[dataset.file_type] = type_counts.get(dataset.file_type, 0) + 1
-        
-        # Calculate total storage used
-        total_storage = sum(dataset.file_size for dataset in datasets)
-        
-        # Recent uploads (last 30 days)
-        recent_date = datetime.now() - pd.Timedelta(days=30)
-        recent_uploads = [d for d in datasets if d.created_at >= recent_date]
-        
-        return {
-            "total_datasets": len(datasets),
-            "datasets_by_type": type_counts,
-            "total_storage_bytes": total_storage,
-            "total_storage_mb": round(total_storage / (1024 * 1024), 2),
-            "recent_uploads_30_days": len(recent_uploads),
-            "active_datasets": len([d for d in datasets if d.is_active]),
-            "average_file_size_mb": round((total_storage / len(datasets)) / (1024 * 1024), 2) if datasets else 0
-        }
\ No newline at end of file
+        return ImportStatsStore(self.db).statistics(user_id)
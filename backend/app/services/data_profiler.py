@@ -0,0 +1,314 @@
+"""
+Single-pass profiling of tabular uploads.
+"""
+from typing import Any, Dict, List, Optional
+import numpy as np
+import pandas as pd
+
+# Smallest hashes kept per column for distinct-count estimates
+DISTINCT_SKETCH_SIZE = 4096
+
+# Leading rows kept for previews
+HEAD_ROWS = 20
+
+_HASH_MULTIPLIER = np.uint64(1000003)
+
+
+class DistinctSketch:
+    """
+    K-minimum-values sketch of the distinct hashes seen in a column.
+
+    Counts are exact up to ``k`` distinct values and estimated within a few
+    percent beyond that, using constant memory.
+    """
+
+    def __init__(self, k: int = DISTINCT_SKETCH_SIZE):
+        self.k = k
+        self.values = np.empty(0, dtype=np.uint64)
+
+    def update(self, hashes: np.ndarray):
+        if len(self.values) == self.k:
+            # Only hashes below the current k-th smallest can enter the sketch
+            hashes = hashes[hashes < self.values[-1]]
+        if len(hashes):
+            self.values = np.union1d(self.values, hashes)[:self.k]
+
+    def estimate(self) -> int:
+        if len(self.values) < self.k:
+            return len(self.values)
+        return int(round((self.k - 1) * 2.0 ** 64 / float(self.values[-1])))
+
+
+class DataProfiler:
+    """
+    Single-pass profile of tabular data fed chunk by chunk.
+
+    Each chunk is scanned once: one null mask, one numeric matrix, one date
+    parse and one hash per column, from which null counts, dtypes, numeric
+    ranges, distinct estimates, duplicate rows and the date range are all
+    accumulated. Validation, summaries, quality metrics and column mappings
+    are then derived from the profile without touching the data again.
+    """
+
+    def __init__(self):
+        self.columns: List[str] = []
+        self.dtypes: Dict[str, np.dtype] = {}
+        self.total_rows = 0
+        self.null_counts: Optional[np.ndarray] = None
+        self.numeric: Dict[str, Dict[str, float]] = {}
+        self.date_column: Optional[str] = None
+        self.date_min = None
+        self.date_max = None
+        self.head: Optional[pd.DataFrame] = None
+        self.sketches: Dict[str, DistinctSketch] = {}
+        self._row_hashes: List[np.ndarray] = []
+
+    def update(self, chunk: pd.DataFrame) -> Optional[pd.Series]:
+        """
+        Add a chunk to the profile, returning its parsed date column if any
+        """
+        if not self.columns:
+            self.columns = list(chunk.columns)
+            self.null_counts = np.zeros(len(self.columns), dtype=np.int64)
+            self.date_column = next((col for col in self.columns if 'date' in col.lower()), None)
+            self.sketches = {col: DistinctSketch() for col in self.columns}
+
+        if self.head is None or len(self.head) < HEAD_ROWS:
+            head = chunk.head(HEAD_ROWS)
+            self.head = head if self.head is None else pd.concat([self.head, head]).head(HEAD_ROWS)
+
+        self.total_rows += len(chunk)
+        null_mask = chunk.isna().to_numpy()
+        self.null_counts += null_mask.sum(axis=0)
+
+        for col, dtype in chunk.dtypes.items():
+            previous = self.dtypes.get(col)
+            if previous is None or previous == dtype:
+                self.dtypes[col] = dtype
+            elif previous.kind in 'iuf' and dtype.kind in 'iuf':
+                self.dtypes[col] = np.result_type(previous, dtype)
+            else:
+                self.dtypes[col] = np.dtype(object)
+
+        self._update_numeric(chunk)
+        dates = self._update_dates(chunk)
+
+        # One hash per cell serves distinct counts and, combined, duplicate rows
+        row_hash = np.zeros(len(chunk), dtype=np.uint64)
+        for i, col in enumerate(self.columns):
+            hashes = pd.util.hash_pandas_object(chunk[col], index=False).to_numpy()
+            row_hash = row_hash * _HASH_MULTIPLIER ^ hashes
+            self.sketches[col].update(np.unique(hashes[~null_mask[:, i]]))
+        self._row_hashes.append(row_hash)
+
+        return dates
+
+    def _update_numeric(self, chunk: pd.DataFrame):
+        numeric = chunk.select_dtypes(include=['number'])
+        if numeric.empty:
+            return
+
+        values = numeric.to_numpy(dtype=np.float64)
+        valid = ~np.isnan(values)
+        counts = valid.sum(axis=0)
+        sums = np.where(valid, values, 0.0).sum(axis=0)
+        minimums = np.where(valid, values, np.inf).min(axis=0)
+        maximums = np.where(valid, values, -np.inf).max(axis=0)
+
+        for i, col in enumerate(numeric.columns):
+            stats = self.numeric.setdefault(col, {"min": np.inf, "max": -np.inf, "sum": 0.0, "count": 0})
+            stats["min"] = min(stats["min"], float(minimums[i]))
+            stats["max"] = max(stats["max"], float(maximums[i]))
+            stats["sum"] += float(sums[i])
+            stats["count"] += int(counts[i])
+
+    def _update_dates(self, chunk: pd.DataFrame) -> Optional[pd.Series]:
+        if not self.date_column:
+            return None
+
+        dates = pd.to_datetime(chunk[self.date_column], errors='coerce')
+        if dates.notna().any():
+            self.date_min = dates.min() if self.date_min is None else min(self.date_min, dates.min())
+            self.date_max = dates.max() if self.date_max is None else max(self.date_max, dates.max())
+        return dates
+
+    def missing_values(self) -> Dict[str, int]:
+        if self.null_counts is None:
+            return {}
+        return {col: int(count) for col, count in zip(self.columns, self.null_counts)}
+
+    def data_types(self) -> Dict[str, str]:
+        return {col: str(self.dtypes[col]) for col in self.columns}
+
+    def numeric_columns(self) -> List[str]:
+        return [col for col in self.columns if self.dtypes[col].kind in 'iuf']
+
+    def duplicate_rows(self) -> int:
+        """
+        Count rows identical to an earlier row, from one 8-byte hash per row
+        """
+        if not self._row_hashes:
+            return 0
+        return int(self.total_rows - len(np.unique(np.concatenate(self._row_hashes))))
+
+    def distinct_values(self) -> Dict[str, int]:
+        return {col: sketch.estimate() for col, sketch in self.sketches.items()}
+
+    def missing_required(self, required_columns: List[str]) -> List[str]:
+        """
+        Get the required columns that no data column name contains
+        """
+        return [
+            col for col in required_columns
+            if not any(col.lower() in data_col.lower() for data_col in self.columns)
+        ]
+
+    def validate(self, file_type: str) -> Dict[str, Any]:
+        """
+        Validate the data based on file type
+        """
+        errors = []
+        warnings = []
+        columns = self.columns
+
+        # Basic validation
+        if self.total_rows == 0:
+            errors.append("File is empty")
+            return {"is_valid": False, "errors": errors, "warnings": warnings}
+
+        # File type specific validation
+        if file_type == 'meteorological':
+            if not any('date' in col.lower() for col in columns):
+                errors.append("Date column not found")
+            if not any('precip' in col.lower() for col in columns):
+                errors.append("Precipitation column not found")
+            if not any('temp' in col.lower() for col in columns):
+                warnings.append("Temperature column not found")
+
+        elif file_type == 'observed_flow':
+            if not any('date' in col.lower() for col in columns):
+                errors.append("Date column not found")
+            if not any('flow' in col.lower() or 'discharge' in col.lower() for col in columns):
+                errors.append("Flow/discharge column not found")
+
+        elif file_type == 'streamflow':
+            if not any('date' in col.lower() for col in columns):
+                errors.append("Date column not found")
+            if not any('discharge' in col.lower() or 'flow' in col.lower() for col in columns):
+                errors.append("Discharge column not found")
+
+        elif file_type == 'groundwater':
+            if not any('date' in col.lower() for col in columns):
+                errors.append("Date column not found")
+            if not any('level' in col.lower() or 'depth' in col.lower() for col in columns):
+                errors.append("Water level column not found")
+
+        elif file_type == 'gridded_climate':
+            if not self.numeric_columns():
+                errors.append("No gridded variables found")
+
+        elif file_type == 'basin_data':
+            if not any('parameter' in col.lower() for col in columns):
+                errors.append("Parameter column not found")
+            if not any('value' in col.lower() for col in columns):
+                errors.append("Value column not found")
+
+        # Check for missing values
+        missing_percent = float((self.null_counts / self.total_rows * 100).max())
+        if missing_percent > 50:
+            warnings.append(f"High percentage of missing values ({missing_percent:.1f}%)")
+        elif missing_percent > 20:
+            warnings.append(f"Moderate missing values ({missing_percent:.1f}%)")
+
+        return {
+            "is_valid": len(errors) == 0,
+            "errors": errors,
+            "warnings": warnings
+        }
+
+    def summary(self) -> Dict[str, Any]:
+        """
+        Summary of the data stored with a dataset
+        """
+        summary = {
+            "total_rows": self.total_rows,
+            "total_columns": len(self.columns),
+            "columns": self.columns,
+            "data_types": self.data_types(),
+            "date_range": None,
+            "numeric_summary": {}
+        }
+
+        # Date range of the first date column
+        if self.date_min is not None:
+            summary["date_range"] = {
+                "start": self.date_min.isoformat(),
+                "end": self.date_max.isoformat(),
+                "total_days": (self.date_max - self.date_min).days
+            }
+
+        # Get numeric column summary
+        for col in self.numeric_columns()[:5]:  # Limit to first 5 numeric columns
+            stats = self.numeric.get(col)
+            if not stats or not stats["count"]:
+                continue
+            summary["numeric_summary"][col] = {
+                "min": stats["min"],
+                "max": stats["max"],
+                "mean": stats["sum"] / stats["count"],
+                "count": stats["count"]
+            }
+
+        return summary
+
+    def quality_metrics(self) -> Dict[str, Any]:
+        """
+        Data quality metrics stored with a dataset
+        """
+        cells = self.total_rows * len(self.columns)
+        return {
+            "completeness": float((1 - self.null_counts.sum() / cells) * 100) if cells else 0.0,
+            "missing_values": self.missing_values(),
+            "duplicate_rows": self.duplicate_rows(),
+            "unique_values": self.distinct_values()
+        }
+
+    def data_quality(self) -> Dict[str, Any]:
+        """
+        Compact quality report returned by upload validation
+        """
+        return {
+            "total_rows": self.total_rows,
+            "total_columns": len(self.columns),
+            "missing_values": self.missing_values(),
+            "data_types": self.data_types()
+        }
+
+    def column_mapping(self) -> Dict[str, str]:
+        """
+        Mapping between data columns and model parameters
+        """
+        mapping = {}
+
+        for col in self.columns:
+            col_lower = col.lower()
+
+            # Common mappings
+            if 'date' in col_lower:
+                mapping[col] = 'date'
+            elif 'precip' in col_lower:
+                mapping[col] = 'precipitation'
+            elif 'temp' in col_lower:
+                mapping[col] = 'temperature'
+            elif 'flow' in col_lower or 'discharge' in col_lower:
+                mapping[col] = 'flow'
+            elif 'level' in col_lower:
+                mapping[col] = 'water_level'
+            elif 'humid' in col_lower:
+                mapping[col] = 'humidity'
+            elif 'wind' in col_lower:
+                mapping[col] = 'wind_speed'
+            else:
+                mapping[col] = col  # Keep original name
+
+        return mapping
@@ -0,0 +1,164 @@
+"""
+Flood and drought event detection on daily series.
+
+Events are runs of consecutive days above (floods) or below (droughts) a
+threshold, found with run-length encoding over a members x time array so
+every ensemble member is scanned in the same vectorized pass.
+"""
+from typing import Any, Dict, List, Optional
+import numpy as np
+
+from app.services.hydro_statistics import exceedance_flows
+
+# Default thresholds as flow exceedance probabilities (percent of time)
+FLOOD_EXCEEDANCE_PERCENT = 10
+DROUGHT_EXCEEDANCE_PERCENT = 90
+
+# Shorter runs are ignored; brief low-flow dips are not droughts
+MIN_FLOOD_DAYS = 1
+MIN_DROUGHT_DAYS = 5
+
+
+def find_runs(mask: np.ndarray) -> Dict[str, np.ndarray]:
+    """
+    Run-length encode the True runs of a members x time boolean array.
+
+    Returns the member, start index and exclusive end index of every run,
+    ordered by member and then by start.
+    """
+    mask = np.atleast_2d(np.asarray(mask, dtype=bool))
+    padded = np.zeros((mask.shape[0], mask.shape[1] + 2), dtype=np.int8)
+    padded[:, 1:-1] = mask
+
+    edges = np.diff(padded, axis=1)
+    members, starts = np.nonzero(edges == 1)
+    _, ends = np.nonzero(edges == -1)
+
+    return {"member": members, "start": starts, "end": ends}
+
+
+def detect_events(
+    values: Any,
+    threshold: Any,
+    above: bool = True,
+    min_duration: int = 1
+) -> Dict[str, np.ndarray]:
+    """
+    Extract threshold-crossing events from a series or members x time array.
+
+    ``threshold`` is a scalar or one value per member. Volume is the summed
+    excess over (or deficit below) the threshold; peak is the most extreme
+    value reached during the event. Missing values end an event.
+    """
+    values = np.atleast_2d(np.asarray(values, dtype=np.float64))
+    threshold = np.broadcast_to(np.asarray(threshold, dtype=np.float64).reshape(-1, 1), (values.shape[0], 1))
+
+    excess = values - threshold if above else threshold - values
+    mask = np.isfinite(excess) & (excess > 0)
+    runs = find_runs(mask)
+
+    duration = runs["end"] - runs["start"]
+    keep = duration >= min_duration
+    members, starts, ends, duration = runs["member"][keep], runs["start"][keep], runs["end"][keep], duration[keep]
+
+    # Event volumes from differences of the cumulative excess
+    cumulative = np.zeros((values.shape[0], values.shape[1] + 1))
+    np.cumsum(np.where(mask, excess, 0.0), axis=1, out=cumulative[:, 1:])
+    volume = cumulative[members, ends] - cumulative[members, starts]
+
+    # Event peaks with one reduceat over [start, end) pairs of the flattened excess
+    if len(starts):
+        flat = np.append(np.where(mask, excess, -np.inf).ravel(), -np.inf)
+        offsets = members * values.shape[1]
+        bounds = np.column_stack([offsets + starts, offsets + ends]).ravel()
+        peak_excess = np.maximum.reduceat(flat, bounds)[::2]
+    else:
+        peak_excess = np.zeros(0)
+    threshold_of_event = threshold[members, 0]
+    peak = threshold_of_event + peak_excess if above else threshold_of_event - peak_excess
+
+    return {
+        "member": members,
+        "start": starts,
+        "end": ends,
+        "duration": duration,
+        "volume": volume,
+        "peak": peak
+    }
+
+
+def _stack_members(members: List[Dict[str, Any]], variable: str, length: int) -> Optional[np.ndarray]:
+    """
+    Stack one variable of every member into a members x time array, padding with NaN
+    """
+    stacked = np.full((len(members), length), np.nan)
+    found = False
+    for i, member in enumerate(members):
+        series = member.get(variable)
+        if not isinstance(series, list) or not series:
+            continue
+        series = np.asarray([v if v is not None else np.nan for v in series[:length]], dtype=np.float64)
+        stacked[i, :len(series)] = series
+        found = True
+    return stacked if found else None
+
+
+def build_event_catalogue(
+    dates: List[str],
+    members: List[Dict[str, Any]],
+    variable: str = 'runoff',
+    flood_exceedance: float = FLOOD_EXCEEDANCE_PERCENT,
+    drought_exceedance: float = DROUGHT_EXCEEDANCE_PERCENT
+) -> Optional[Dict[str, Any]]:
+    """
+    Build the flood and drought event catalogue of a daily variable.
+
+    Thresholds are the member's own flows at the given exceedance
+    probabilities, so each ensemble member is judged against its climate.
+    Events are stored column-wise with ISO start and end dates; summary
+    counts are averaged over members.
+    """
+    values = _stack_members(members, variable, len(dates))
+    if values is None:
+        return None
+
+    flood_threshold, drought_threshold = np.moveaxis(
+        exceedance_flows(values, [flood_exceedance, drought_exceedance]), -1, 0
+    )
+    dates = np.asarray(dates)
+
+    catalogue = {
+        "variable": variable,
+        "ensemble": len(members) > 1,
+        "thresholds": {
+            "flood": flood_threshold.tolist(),
+            "drought": drought_threshold.tolist(),
+            "flood_exceedance_percent": flood_exceedance,
+            "drought_exceedance_percent": drought_exceedance
+        },
+        "summary": {}
+    }
+
+    for kind, threshold, above, min_duration in (
+        ("flood", flood_threshold, True, MIN_FLOOD_DAYS),
+        ("drought", drought_threshold, False, MIN_DROUGHT_DAYS)
+    ):
+        events = detect_events(values, threshold, above=above, min_duration=min_duration)
+        catalogue[kind] = {
+            "member": events["member"].tolist(),
+            "start": dates[events["start"]].tolist(),
+            "end": dates[events["end"] - 1].tolist(),
+            "duration": events["duration"].tolist(),
+            "volume": np.round(events["volume"], 3).tolist(),
+            "peak": np.round(events["peak"], 3).tolist()
+        }
+
+        n_members = values.shape[0]
+        catalogue["summary"].update({
+            f"{kind}_events": round(len(events["start"]) / n_members, 2),
+            f"{kind}_days": round(float(events["duration"].sum()) / n_members, 2),
+            f"max_{kind}_duration": int(events["duration"].max()) if len(events["duration"]) else 0,
+            f"max_{kind}_volume": round(float(events["volume"].max()), 3) if len(events["volume"]) else 0.0
+        })
+
+    return catalogue
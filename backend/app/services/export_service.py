@@ -0,0 +1,353 @@
+from sqlalchemy.orm import Session
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+from uuid import UUID
+from itertools import zip_longest
+from datetime import datetime
+import csv
+import io
+import os
+import logging
+import tempfile
+import numpy as np
+import pandas as pd
+from scipy.io import netcdf_file
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+    PYARROW_AVAILABLE = True
+except ImportError:
+    PYARROW_AVAILABLE = False
+    logging.warning("pyarrow not available - Parquet export will be disabled")
+
+from app.core.config import settings
+from app.core.storage import storage
+from app.models.models import SimulationResult, ResultBlob
+from app.services.result_store import payload_column
+
+logger = logging.getLogger(__name__)
+
+# Result types that are flattened into tabular exports
+TABULAR_RESULT_TYPES = ['daily_results', 'monthly_results', 'annual_results']
+
+# Key holding the time index of each series result type, and its NetCDF dimension
+SERIES_INDEX = {
+    'daily_results': ('dates', 'time'),
+    'monthly_results': ('months', 'month')
+}
+
+def split_members(data: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """
+    Get the ensemble members of a series payload.
+
+    Ensemble runs store one dict of series per member under ``members``, sharing
+    the payload's time index. Single runs are treated as a one-member ensemble.
+    """
+    members = data.get('members')
+    if isinstance(members, list) and members:
+        return [member for member in members if isinstance(member, dict)]
+    return [data]
+
+
+def _numeric_series(member: Dict[str, Any], index_key: Optional[str]) -> Dict[str, list]:
+    """
+    Get the numeric list-valued entries of a member, skipping the time index
+    """
+    series = {}
+    for name, values in member.items():
+        if name in (index_key, 'members') or not isinstance(values, list):
+            continue
+        sample = next((v for v in values if v is not None), None)
+        if sample is None or (isinstance(sample, (int, float)) and not isinstance(sample, bool)):
+            series[name] = values
+    return series
+
+
+def _parse_index(values: list) -> Any:
+    """
+    Parse a time index to datetime64, keeping the raw values if they are not dates
+    """
+    try:
+        return pd.to_datetime(values, format='ISO8601').values
+    except (ValueError, TypeError):
+        return values
+
+
+def latest_results(result_refs: List[Tuple[UUID, str]]) -> List[Tuple[UUID, str]]:
+    """
+    Keep the last (id, result_type) pair of each result type from pairs in
+    creation order, so a re-run's results replace the earlier run's
+    """
+    latest = {}
+    for result_id, result_type in result_refs:
+        latest.pop(result_type, None)
+        latest[result_type] = result_id
+    return [(result_id, result_type) for result_type, result_id in latest.items()]
+
+
+def export_key(simulation_id: UUID, etag: str, extension: str) -> str:
+    """
+    Storage key of a generated export file, unique to the results version
+    """
+    version = etag.strip('"')
+    return f"{settings.EXPORT_DIR}/{simulation_id}/{version}.{extension}"
+
+
+def export_prefix(simulation_id: UUID) -> str:
+    """
+    Storage key prefix of every export of a simulation
+    """
+    return f"{settings.EXPORT_DIR}/{simulation_id}/"
+
+
+class ResultsExporter:
+    """
+    Streams simulation results in export formats without materializing the whole file
+    """
+
+    def __init__(self, db: Session, chunk_rows: Optional[int] = None):
+        self.db = db
+        self.chunk_rows = chunk_rows or settings.EXPORT_CHUNK_ROWS
+
+    def list_results(self, simulation_id: UUID) -> List[Tuple[UUID, str]]:
+        """
+        Get (id, result_type) pairs for a simulation without loading the
+        payloads, the latest result of each type only
+        """
+        return latest_results(self.db.query(SimulationResult.id, SimulationResult.result_type).filter(
+            SimulationResult.simulation_id == simulation_id
+        ).order_by(SimulationResult.created_at, SimulationResult.id).all())
+
+    def load_result_data(self, result_id: UUID) -> Any:
+        """
+        Load a single result payload
+        """
+        return self.db.query(payload_column()).select_from(SimulationResult).outerjoin(
+            ResultBlob, SimulationResult.blob_hash == ResultBlob.content_hash
+        ).filter(
+            SimulationResult.id == result_id
+        ).scalar()
+
+    def iter_csv(self, result_refs: List[Tuple[UUID, str]]) -> Iterator[str]:
+        """
+        Yield CSV text one row block at a time, one section per tabular result type.
+
+        Only one result payload is held in memory at a time and rows are rendered
+        in blocks of ``chunk_rows``, so memory stays flat regardless of run length.
+        """
+        for result_id, result_type in result_refs:
+            if result_type not in TABULAR_RESULT_TYPES:
+                continue
+
+            data = self.load_result_data(result_id)
+            if not isinstance(data, dict) or not data:
+                continue
+
+            for chunk in self._iter_csv_rows(data):
+                yield chunk
+            yield "\n\n"
+
+    def _iter_csv_rows(self, data: Dict[str, Any]) -> Iterator[str]:
+        """
+        Render a column-oriented payload as CSV row blocks
+        """
+        columns = list(data.keys())
+        values = [
+            value if isinstance(value, (list, tuple)) else [value]
+            for value in data.values()
+        ]
+
+        buffer = io.StringIO()
+        writer = csv.writer(buffer, lineterminator="\n")
+
+        writer.writerow(columns)
+        rows = zip_longest(*values, fillvalue="")
+
+        while True:
+            block_written = 0
+            for row in rows:
+                writer.writerow(row)
+                block_written += 1
+                if block_written >= self.chunk_rows:
+                    break
+
+            chunk = buffer.getvalue()
+            if chunk:
+                yield chunk
+                buffer.seek(0)
+                buffer.truncate(0)
+
+            if block_written < self.chunk_rows:
+                break
+
+    def write_parquet(self, result_id: UUID, result_type: str) -> str:
+        """
+        Write one result type to a temporary Parquet file and return its path.
+
+        Row groups are built from ``chunk_rows`` slices of the stored lists, so no
+        intermediate DataFrame of the full run is created. Ensemble payloads get a
+        ``member`` column, and variables missing from some members are null there.
+        """
+        if not PYARROW_AVAILABLE:
+            raise RuntimeError("pyarrow is required for Parquet export")
+
+        data = self.load_result_data(result_id) or {}
+        index_key = SERIES_INDEX.get(result_type, (None, None))[0]
+        index_values = data.get(index_key, []) if index_key else []
+        members = split_members(data)
+
+        fd, path = tempfile.mkstemp(suffix=".parquet", dir=storage.staging_dir())
+        os.close(fd)
+
+        if index_key:
+            member_columns = [_numeric_series(member, index_key) for member in members]
+        else:
+            # Scalar payloads (annual totals) become a single row
+            member_columns = [
+                {
+                    name: [value] for name, value in member.items()
+                    if isinstance(value, (int, float)) and not isinstance(value, bool)
+                }
+                for member in members
+            ]
+        # Members may carry different variables, so every row group gets the
+        # union of their columns with nulls where a member lacks one
+        column_names = list(dict.fromkeys(name for columns in member_columns for name in columns))
+
+        writer = None
+        schema = None
+        try:
+            for member_number, columns in enumerate(member_columns):
+                n_rows = max([len(index_values)] + [len(values) for values in columns.values()])
+
+                for start in range(0, n_rows, self.chunk_rows):
+                    stop = min(start + self.chunk_rows, n_rows)
+                    block = {}
+                    if index_key:
+                        index_chunk = index_values[start:stop]
+                        index_chunk = index_chunk + [None] * (stop - start - len(index_chunk))
+                        block[index_key] = _parse_index(index_chunk)
+                    if len(members) > 1:
+                        block['member'] = np.full(stop - start, member_number, dtype=np.int32)
+                    for name in column_names:
+                        values = columns.get(name)
+                        if values is None:
+                            block[name] = pa.nulls(stop - start, pa.float64())
+                            continue
+                        chunk = values[start:stop]
+                        chunk = chunk + [None] * (stop - start - len(chunk))
+                        block[name] = np.asarray(chunk, dtype=np.float64)
+
+                    if writer is None:
+                        schema = pa.Table.from_pydict(block).schema
+                        writer = pq.ParquetWriter(path, schema, compression='zstd')
+                    writer.write_table(pa.Table.from_pydict(block, schema=schema))
+        except Exception:
+            if writer is not None:
+                writer.close()
+            os.remove(path)
+            raise
+
+        if writer is not None:
+            writer.close()
+
+        return path
+
+    def write_netcdf(self, simulation: Any, result_refs: List[Tuple[UUID, str]]) -> str:
+        """
+        Write the tabular results of a simulation to a temporary NetCDF file and return its path.
+
+        Daily series are laid out on a ``time`` dimension and monthly series on a
+        ``month`` dimension, both as days since the simulation start. Ensemble runs
+        add a leading ``member`` dimension. Annual totals become scalar variables.
+        Variables are filled slice by slice from the stored lists. Only the
+        last of repeated result types is written.
+        """
+        fd, path = tempfile.mkstemp(suffix=".nc", dir=storage.staging_dir())
+        os.close(fd)
+
+        reference = pd.Timestamp(simulation.start_date).normalize()
+        nc = netcdf_file(path, 'w', version=2)
+        try:
+            nc.title = f"MHIA simulation {simulation.name}"
+            nc.simulation_id = str(simulation.id)
+            nc.model_type = simulation.model_type.value
+            nc.history = f"Exported {datetime.utcnow().isoformat()}"
+
+            for result_id, result_type in latest_results(result_refs):
+                if result_type not in TABULAR_RESULT_TYPES:
+                    continue
+
+                data = self.load_result_data(result_id)
+                if not isinstance(data, dict) or not data:
+                    continue
+
+                if result_type == 'annual_results':
+                    self._write_netcdf_scalars(nc, data)
+                else:
+                    self._write_netcdf_series(nc, result_type, data, reference)
+        finally:
+            nc.close()
+
+        return path
+
+    def _write_netcdf_scalars(self, nc: netcdf_file, data: Dict[str, Any]):
+        """
+        Write annual totals as scalar variables
+        """
+        for name, value in data.items():
+            if isinstance(value, (int, float)) and not isinstance(value, bool):
+                var = nc.createVariable(f"annual_{name}", 'd', ())
+                var.assignValue(float(value))
+
+    def _write_netcdf_series(self, nc: netcdf_file, result_type: str, data: Dict[str, Any],
+                             reference: pd.Timestamp):
+        """
+        Write a series payload on its own time dimension
+        """
+        index_key, dim = SERIES_INDEX[result_type]
+        index_values = data.get(index_key) or []
+        if not index_values:
+            return
+
+        nc.createDimension(dim, len(index_values))
+        coordinate = nc.createVariable(dim, 'd', (dim,))
+        parsed = _parse_index(index_values)
+        if isinstance(parsed, np.ndarray):
+            coordinate[:] = (parsed - reference.to_datetime64()) / np.timedelta64(1, 'D')
+            coordinate.units = f"days since {reference.strftime('%Y-%m-%d')}"
+            coordinate.calendar = "gregorian"
+        else:
+            coordinate[:] = np.arange(len(index_values), dtype=np.float64)
+
+        members = split_members(data)
+        dims = (dim,)
+        if len(members) > 1:
+            if 'member' not in nc.dimensions:
+                nc.createDimension('member', len(members))
+                member_var = nc.createVariable('member', 'i', ('member',))
+                member_var[:] = np.arange(len(members), dtype=np.int32)
+            elif nc.dimensions['member'] != len(members):
+                raise ValueError(f"{result_type} has a different ensemble size than previous results")
+            dims = ('member', dim)
+
+        prefix = "" if result_type == 'daily_results' else "monthly_"
+        names = []
+        for member in members:
+            names.extend(name for name in _numeric_series(member, index_key) if name not in names)
+
+        n_steps = len(index_values)
+        for name in names:
+            var = nc.createVariable(f"{prefix}{name}", 'd', dims)
+            var._FillValue = np.nan
+            for member_number, member in enumerate(members):
+                values = member.get(name) or []
+                for start in range(0, n_steps, self.chunk_rows):
+                    stop = min(start + self.chunk_rows, n_steps)
+                    chunk = values[start:stop]
+                    chunk = chunk + [None] * (stop - start - len(chunk))
+                    block = np.asarray(chunk, dtype=np.float64)
+                    if len(dims) == 2:
+                        var[member_number, start:stop] = block
+                    else:
+                        var[start:stop] = block
@@ -0,0 +1,175 @@
+"""
+Meteorological forcing built from imported datasets.
+
+A simulation linked to a meteorological dataset is driven by its observed
+series instead of synthetic weather. Forcing is read from the dataset's
+daily, gap-filled series (see ``preprocessing``), sliced to the simulation
+window and renamed to the model's input columns. Built frames are kept in a
+small LRU so scenarios and ensemble members of the same window reuse them.
+"""
+from collections import OrderedDict
+from datetime import datetime
+from typing import Any, Dict, Optional, Tuple
+from uuid import UUID
+import asyncio
+import logging
+import threading
+import pandas as pd
+
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.models.models import ImportedDataset
+from app.services.data_import_service import DataImportService
+from app.services.timeseries_store import TimeSeriesStore
+
+logger = logging.getLogger(__name__)
+
+# Model input column for each target of a dataset's column mapping
+FORCING_COLUMNS = {
+    'precipitation': 'precipitation_mm',
+    'temperature': 'temperature_c',
+    'humidity': 'humidity_percent',
+    'wind_speed': 'wind_speed_ms',
+    'solar_radiation': 'solar_radiation'
+}
+
+# Inputs accumulated over a day; the others are averaged
+ACCUMULATED_COLUMNS = {'precipitation_mm'}
+
+_forcing_cache: "OrderedDict[Tuple[str, str, str, str], pd.DataFrame]" = OrderedDict()
+_cache_lock = threading.Lock()
+
+
+def linked_dataset_id(configuration: Dict[str, Any], file_type: str = 'meteorological') -> Optional[str]:
+    """
+    Get the id of the dataset of a type linked to a simulation configuration
+    """
+    link = (configuration or {}).get('linked_datasets', {}).get(file_type)
+    return link.get('dataset_id') if isinstance(link, dict) else None
+
+
+def _daily_frame(
+    dataset: ImportedDataset,
+    store: TimeSeriesStore,
+    start: Optional[pd.Timestamp] = None,
+    end: Optional[pd.Timestamp] = None
+) -> pd.DataFrame:
+    """
+    Read the mapped forcing variables of a dataset as daily values within
+    the window, or over the whole record
+    """
+    mapping = {
+        source: FORCING_COLUMNS[target]
+        for source, target in (dataset.column_mapping or {}).items()
+        if target in FORCING_COLUMNS and source in store.variables
+    }
+    window_end = end + pd.Timedelta(days=1) - pd.Timedelta(seconds=1) if end is not None else None
+
+    daily = {}
+    for source, column in mapping.items():
+        how = 'sum' if column in ACCUMULATED_COLUMNS else 'mean'
+        data = store.resample('daily', how, [source], start, window_end)
+        daily[column] = pd.Series(data[source], index=pd.DatetimeIndex(data["dates"]))
+    return pd.DataFrame(daily)
+
+
+def climatology(record: pd.Series, days: pd.DatetimeIndex) -> pd.Series:
+    """
+    Expected value of a daily series on each of ``days``: the mean of the
+    record on the same day of the year, else in the same month, else overall
+    """
+    record = record.dropna()
+    by_day = record.groupby(record.index.dayofyear).mean()
+    by_month = record.groupby(record.index.month).mean()
+
+    expected = pd.Series(by_day.reindex(days.dayofyear).to_numpy(), index=days)
+    expected = expected.fillna(pd.Series(by_month.reindex(days.month).to_numpy(), index=days))
+    return expected.fillna(record.mean())
+
+
+def build_forcing(
+    dataset: ImportedDataset,
+    store: TimeSeriesStore,
+    start: datetime,
+    end: datetime
+) -> Optional[pd.DataFrame]:
+    """
+    Build daily forcing for [start, end] from a meteorological dataset's series.
+
+    Days the series does not cover take the dataset's climatology for that
+    day (see ``climatology``), so a partial record is extended with typical
+    weather rather than a drought. Returns None when the dataset has no
+    mapped inputs or no values in the window.
+    """
+    start = pd.Timestamp(start).normalize()
+    end = pd.Timestamp(end).normalize()
+    days = pd.date_range(start, end, freq='D')
+
+    daily = _daily_frame(dataset, store, start, end)
+    if daily.empty or daily.notna().sum().sum() == 0:
+        return None
+
+    # Inputs with no values in the window are left to the synthetic generator
+    daily = daily.dropna(axis=1, how='all').reindex(days)
+    missing_days = int(daily.isna().any(axis=1).sum())
+    if missing_days:
+        logger.warning(
+            f"Dataset {dataset.id} covers {len(days) - missing_days} of {len(days)} simulated days; "
+            f"the others are filled from its climatology"
+        )
+        record = _daily_frame(dataset, store)
+        for col in daily.columns:
+            if daily[col].isna().any():
+                daily[col] = daily[col].fillna(climatology(record[col], days))
+
+    daily.index.name = 'date'
+    return daily.reset_index()
+
+
+async def load_linked_forcing(configuration: Dict[str, Any], start: datetime, end: datetime) -> Optional[pd.DataFrame]:
+    """
+    Get daily forcing from the meteorological dataset linked to a simulation.
+
+    Returns a private copy of the cached frame, or None when no usable
+    dataset is linked.
+    """
+    dataset_id = linked_dataset_id(configuration)
+    if not dataset_id:
+        return None
+    method = configuration['linked_datasets']['meteorological'].get('gap_fill', settings.FORCING_GAP_FILL)
+
+    db = SessionLocal()
+    try:
+        # Looked up even on a cache hit, so deleted datasets stop driving runs
+        dataset = db.query(ImportedDataset).filter(ImportedDataset.id == UUID(str(dataset_id))).first()
+        if not dataset:
+            logger.warning(f"Linked meteorological dataset {dataset_id} no longer exists")
+            return None
+
+        key = (str(dataset.id), method, pd.Timestamp(start).date().isoformat(), pd.Timestamp(end).date().isoformat())
+        with _cache_lock:
+            forcing = _forcing_cache.get(key)
+            if forcing is not None:
+                _forcing_cache.move_to_end(key)
+                return forcing.copy()
+
+        # The daily, gap-filled series is built once per dataset and shared
+        # by every simulation linking it
+        store = await DataImportService(db).processed_series_store(dataset, 'daily', method)
+        forcing = await asyncio.to_thread(build_forcing, dataset, store, start, end)
+    except (FileNotFoundError, ValueError, KeyError) as e:
+        # Missing or unreadable series; database errors fail the run instead
+        logger.error(f"Could not load forcing from dataset {dataset_id}, using synthetic weather: {str(e)}")
+        return None
+    finally:
+        db.close()
+
+    if forcing is None:
+        logger.warning(f"Linked dataset {dataset_id} has no meteorological values in the simulation window")
+        return None
+
+    with _cache_lock:
+        _forcing_cache[key] = forcing
+        while len(_forcing_cache) > settings.FORCING_CACHE_ENTRIES:
+            _forcing_cache.popitem(last=False)
+    return forcing.copy()
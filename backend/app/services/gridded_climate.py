@@ -0,0 +1,312 @@
+"""
+Basin averages of gridded climate data.
+
+Gridded forcing arrives as NetCDF variables on (time, lat, lon) grids. Files
+are opened memory-mapped with scipy's NetCDF 3 reader, and each variable is
+reduced to one basin-average series: cells are weighted by their area
+(proportional to the cosine of latitude on a regular grid) times a basin
+mask, and the grid is read a block of time steps at a time, cropped to the
+mask's bounding box. Only the series are kept, so memory is bounded by the
+block size however large the file.
+"""
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+import numpy as np
+import pandas as pd
+from scipy.io import netcdf_file
+
+from app.core.config import settings
+
+GRIDDED_FILE_TYPE = 'gridded_climate'
+
+TIME_NAMES = ('time', 't')
+LATITUDE_NAMES = ('lat', 'latitude', 'y')
+LONGITUDE_NAMES = ('lon', 'longitude', 'x')
+MASK_NAMES = ('basin_mask', 'mask')
+
+# Seconds per unit of CF time coordinates ("<unit> since <origin>")
+TIME_UNITS = {
+    'seconds': 1, 'second': 1, 's': 1,
+    'minutes': 60, 'minute': 60, 'min': 60,
+    'hours': 3600, 'hour': 3600, 'h': 3600,
+    'days': 86400, 'day': 86400, 'd': 86400
+}
+
+# Model parameter for CF standard names and common short variable names
+CF_TARGETS = {
+    'precipitation_flux': 'precipitation',
+    'precipitation_amount': 'precipitation',
+    'lwe_precipitation_rate': 'precipitation',
+    'pr': 'precipitation',
+    'air_temperature': 'temperature',
+    'tas': 'temperature',
+    'relative_humidity': 'humidity',
+    'hurs': 'humidity',
+    'wind_speed': 'wind_speed',
+    'sfcwind': 'wind_speed',
+    'surface_downwelling_shortwave_flux_in_air': 'solar_radiation',
+    'rsds': 'solar_radiation'
+}
+
+# (scale, offset, per) bringing a variable's units to the model's: mm per
+# time step, degrees Celsius, percent, m/s and W/m2. Rates given ``per``
+# seconds are scaled by the time step so precipitation sums to daily totals.
+MODEL_UNITS = {
+    'precipitation': {
+        'mm': (1.0, 0.0, None), 'kg m-2': (1.0, 0.0, None), 'm': (1000.0, 0.0, None),
+        'kg m-2 s-1': (1.0, 0.0, 1), 'mm s-1': (1.0, 0.0, 1),
+        'mm h-1': (1.0, 0.0, 3600), 'mm hr-1': (1.0, 0.0, 3600),
+        'mm d-1': (1.0, 0.0, 86400), 'mm day-1': (1.0, 0.0, 86400), 'm d-1': (1000.0, 0.0, 86400)
+    },
+    'temperature': {
+        'k': (1.0, -273.15, None), 'kelvin': (1.0, -273.15, None),
+        'degc': (1.0, 0.0, None), 'deg_c': (1.0, 0.0, None), 'celsius': (1.0, 0.0, None), '°c': (1.0, 0.0, None)
+    },
+    'humidity': {'%': (1.0, 0.0, None), 'percent': (1.0, 0.0, None), '1': (100.0, 0.0, None)},
+    'wind_speed': {'m s-1': (1.0, 0.0, None)},
+    'solar_radiation': {'w m-2': (1.0, 0.0, None)}
+}
+
+
+def _attribute(variable: Any, name: str, default: Any = None) -> Any:
+    value = getattr(variable, name, default)
+    return value.decode() if isinstance(value, bytes) else value
+
+
+def _find(names: Sequence[str], candidates: Sequence[str]) -> Optional[str]:
+    lowered = {candidate.lower(): candidate for candidate in candidates}
+    return next((lowered[name] for name in names if name in lowered), None)
+
+
+def _axes(nc: netcdf_file) -> Tuple[str, str, str]:
+    time_dim = _find(TIME_NAMES, list(nc.dimensions))
+    lat_dim = _find(LATITUDE_NAMES, list(nc.dimensions))
+    lon_dim = _find(LONGITUDE_NAMES, list(nc.dimensions))
+    if not (time_dim and lat_dim and lon_dim):
+        raise ValueError("Gridded file needs time, latitude and longitude dimensions")
+    for dim in (time_dim, lat_dim, lon_dim):
+        if dim not in nc.variables:
+            raise ValueError(f"Gridded file has no coordinate variable for dimension {dim}")
+    return time_dim, lat_dim, lon_dim
+
+
+def decode_times(variable: Any) -> np.ndarray:
+    """
+    Decode a CF time coordinate ("days since 1990-01-01" etc.) to datetime64
+    """
+    units = _attribute(variable, 'units', '')
+    unit, _, origin = units.partition(' since ')
+    seconds = TIME_UNITS.get(unit.strip().lower())
+    if seconds is None or not origin:
+        raise ValueError(f"Unsupported time units: {units!r}")
+    offsets = np.round(np.asarray(variable[:], dtype=np.float64) * seconds).astype('timedelta64[s]')
+    return np.datetime64(pd.Timestamp(origin.strip()).tz_localize(None), 's') + offsets
+
+
+def _cf_target(name: str, standard_name: Optional[str]) -> Optional[str]:
+    return CF_TARGETS.get((standard_name or '').lower()) or CF_TARGETS.get(name.lower())
+
+
+def _normalize_units(units: str) -> str:
+    # "kg m**-2 s**-1", "kg/m^2/s" and "kg m-2 s-1" compare equal
+    units = units.strip().lower().replace('**', '').replace('^', '')
+    if '/' in units:
+        numerator, *denominators = units.split('/')
+        units = ' '.join([numerator] + [
+            part[:-1] + '-' + part[-1] if part[-1:].isdigit() else part + '-1'
+            for part in denominators if part
+        ])
+    return ' '.join(units.split())
+
+
+def unit_conversion(target: str, units: Optional[str], step_seconds: float) -> Optional[Tuple[float, float]]:
+    """
+    Scale and offset converting a variable in ``units`` to the model's units
+    for ``target``, or None when the units are missing or not recognized
+    """
+    conversion = MODEL_UNITS.get(target, {}).get(_normalize_units(units or ''))
+    if conversion is None:
+        return None
+    scale, offset, per = conversion
+    return (scale * step_seconds / per if per else scale), offset
+
+
+def polygon_mask(lats: np.ndarray, lons: np.ndarray, polygon: List[List[float]]) -> np.ndarray:
+    """
+    Cells of a lat/lon grid whose centres fall inside a polygon of
+    [lon, lat] vertices, by the even-odd rule over all cells per edge
+    """
+    vertices = np.asarray(polygon, dtype=np.float64)
+    if vertices.ndim != 2 or vertices.shape[1] != 2 or len(vertices) < 3:
+        raise ValueError("Basin polygon needs at least three [lon, lat] vertices")
+    if lons.max() > 180:
+        # Match a 0-360 grid
+        vertices[:, 0] %= 360
+
+    x, y = np.meshgrid(lons, lats)
+    inside = np.zeros(x.shape, dtype=bool)
+    for (x1, y1), (x2, y2) in zip(vertices, np.roll(vertices, -1, axis=0)):
+        crosses = (y1 > y) != (y2 > y)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            at = x1 + (y - y1) * (x2 - x1) / (y2 - y1)
+        inside ^= crosses & (x < at)
+    return inside
+
+
+def _grid_variables(nc: netcdf_file, time_dim: str, lat_dim: str, lon_dim: str) -> List[str]:
+    return [
+        name for name, variable in nc.variables.items()
+        if variable.dimensions in ((time_dim, lat_dim, lon_dim), (time_dim, lon_dim, lat_dim))
+    ]
+
+
+def _open(path: str) -> netcdf_file:
+    try:
+        return netcdf_file(path, 'r', mmap=True, maskandscale=False)
+    except TypeError:
+        # scipy's reader raises TypeError for files that are not NetCDF 3
+        raise ValueError("File is not a NetCDF 3 (classic or 64-bit offset) file")
+
+
+def describe_grid(path: str) -> Dict[str, Any]:
+    """
+    Describe a gridded file's axes and variables without reading the grids
+    """
+    nc = _open(path)
+    try:
+        time_dim, lat_dim, lon_dim = _axes(nc)
+        dates = decode_times(nc.variables[time_dim])
+        names = _grid_variables(nc, time_dim, lat_dim, lon_dim)
+        return {
+            "variables": names,
+            "time_steps": int(len(dates)),
+            "grid_shape": [int(nc.variables[lat_dim].shape[0]), int(nc.variables[lon_dim].shape[0])],
+            "date_range": {"start": str(dates[0]), "end": str(dates[-1])} if len(dates) else None,
+            "has_mask": _find(MASK_NAMES, list(nc.variables)) is not None,
+            "units": {name: _attribute(nc.variables[name], 'units') for name in names}
+        }
+    finally:
+        nc.close()
+
+
+def basin_average(
+    path: str,
+    csv_path: str,
+    polygon: Optional[List[List[float]]] = None,
+    progress: Optional[Callable[[float], None]] = None
+) -> Dict[str, Any]:
+    """
+    Reduce every (time, lat, lon) variable of a NetCDF file to its
+    area-weighted basin average and write the series to ``csv_path``.
+
+    The basin is the polygon when given, else a ``basin_mask`` variable in
+    the file, else the whole grid. ``progress`` is called with the fraction
+    of the grid read after each block. Variables recognized as model
+    parameters are converted to the model's units when their ``units`` are
+    known. Returns a description of the grid and the variables for the
+    dataset summary.
+    """
+    nc = _open(path)
+    try:
+        time_dim, lat_dim, lon_dim = _axes(nc)
+        dates = decode_times(nc.variables[time_dim])
+        lats = np.asarray(nc.variables[lat_dim][:], dtype=np.float64)
+        lons = np.asarray(nc.variables[lon_dim][:], dtype=np.float64)
+
+        mask_name = _find(MASK_NAMES, list(nc.variables))
+        if polygon:
+            mask, mask_source = polygon_mask(lats, lons, polygon), 'polygon'
+        elif mask_name and nc.variables[mask_name].dimensions == (lat_dim, lon_dim):
+            mask, mask_source = np.asarray(nc.variables[mask_name][:]) > 0, 'file'
+        else:
+            mask, mask_source = np.ones((len(lats), len(lons)), dtype=bool), 'grid'
+        if not mask.any():
+            raise ValueError("Basin mask covers no grid cells")
+
+        # Only the mask's bounding box is read
+        rows = np.flatnonzero(mask.any(axis=1))
+        cols = np.flatnonzero(mask.any(axis=0))
+        row_box = slice(rows[0], rows[-1] + 1)
+        col_box = slice(cols[0], cols[-1] + 1)
+        weights = (np.cos(np.radians(lats))[:, None] * mask)[row_box, col_box]
+
+        names = _grid_variables(nc, time_dim, lat_dim, lon_dim)
+        if not names:
+            raise ValueError("No (time, lat, lon) variables found")
+
+        # Typical time step, which turns precipitation rates into amounts
+        step_seconds = float(np.median(np.diff(dates).astype(np.float64))) if len(dates) > 1 else 86400.0
+
+        steps = max(1, settings.GRIDDED_CHUNK_BYTES // (weights.size * 8))
+        series = {}
+        variables = {}
+        for i, name in enumerate(names):
+            variable = nc.variables[name]
+            cell_weights = weights if variable.dimensions[1] == lat_dim else weights.T
+            box = (row_box, col_box) if variable.dimensions[1] == lat_dim else (col_box, row_box)
+            fill_values = [
+                value for value in (_attribute(variable, '_FillValue'), _attribute(variable, 'missing_value'))
+                if value is not None
+            ]
+            scale = _attribute(variable, 'scale_factor', 1.0)
+            offset = _attribute(variable, 'add_offset', 0.0)
+
+            averages = np.empty(len(dates))
+            for start in range(0, len(dates), steps):
+                block = np.array(variable.data[(slice(start, start + steps),) + box], dtype=np.float64)
+                for fill_value in fill_values:
+                    block[block == fill_value] = np.nan
+                block = block * scale + offset
+
+                valid = ~np.isnan(block)
+                totals = np.tensordot(np.where(valid, block, 0.0), cell_weights, axes=2)
+                coverage = np.tensordot(valid, cell_weights, axes=2)
+                with np.errstate(divide='ignore', invalid='ignore'):
+                    averages[start:start + len(block)] = np.where(coverage > 0, totals / coverage, np.nan)
+                del block
+                if progress:
+                    progress((i + min(start + steps, len(dates)) / len(dates)) / len(names))
+
+            units = _attribute(variable, 'units')
+            standard_name = _attribute(variable, 'standard_name')
+            target = _cf_target(name, standard_name)
+            conversion = unit_conversion(target, units, step_seconds) if target else None
+            if conversion:
+                averages = averages * conversion[0] + conversion[1]
+
+            series[name] = averages
+            variables[name] = {
+                "units": units,
+                "standard_name": standard_name,
+                "long_name": _attribute(variable, 'long_name'),
+                "model_units": conversion is not None
+            }
+            del variable
+
+        grid = {
+            "time_steps": int(len(dates)),
+            "grid_shape": [int(len(lats)), int(len(lons))],
+            "basin_cells": int(mask.sum()),
+            "mask_source": mask_source,
+            "variables": variables
+        }
+    finally:
+        nc.close()
+
+    frame = pd.DataFrame({'date': np.datetime_as_string(dates, unit='s'), **series})
+    frame.to_csv(csv_path, index=False)
+    return grid
+
+
+def cf_column_mapping(variables: Dict[str, Dict[str, Any]]) -> Dict[str, str]:
+    """
+    Map gridded variables to model parameters by standard name or short name.
+
+    Only variables that basin_average converted to the model's units are
+    mapped; the rest are left for the user to map.
+    """
+    mapping = {}
+    for name, attributes in variables.items():
+        target = _cf_target(name, attributes.get('standard_name'))
+        if target and attributes.get('model_units'):
+            mapping[name] = target
+    return mapping
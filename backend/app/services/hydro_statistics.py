@@ -0,0 +1,101 @@
+"""
+Vectorized hydrological statistics over daily series.
+
+Functions accept a 1-D series or a 2-D array of ensemble members x time and
+reduce along the last axis. Missing values (NaN) are ignored.
+"""
+from typing import Any, Dict, List, Sequence
+import warnings
+import numpy as np
+import pandas as pd
+
+DEFAULT_EXCEEDANCE = [1, 5, 10, 20, 30, 40, 50, 60, 70, 80, 90, 95, 99]
+
+
+def _as_array(values: Any) -> np.ndarray:
+    return np.asarray(values, dtype=np.float64)
+
+
+def exceedance_flows(values: Any, exceedance_percent: Sequence[float]) -> np.ndarray:
+    """
+    Flow equalled or exceeded the given percentage of the time.
+
+    Q10 (exceeded 10% of the time) is the 90th percentile of the series.
+    """
+    percentiles = 100 - np.asarray(exceedance_percent, dtype=np.float64)
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", RuntimeWarning)
+        return np.moveaxis(np.nanpercentile(_as_array(values), percentiles, axis=-1), 0, -1)
+
+
+def flow_duration_curve(values: Any, exceedance_percent: Sequence[float] = DEFAULT_EXCEEDANCE) -> Dict[str, Any]:
+    """
+    Flow-duration curve at the requested exceedance probabilities
+    """
+    exceedance_percent = sorted(float(p) for p in exceedance_percent)
+    return {
+        "exceedance_percent": exceedance_percent,
+        "flow": exceedance_flows(values, exceedance_percent)
+    }
+
+
+def flow_indices(values: Any) -> Dict[str, Any]:
+    """
+    Standard high- and low-flow indices
+    """
+    values = _as_array(values)
+    q10, q50, q90, q95 = np.moveaxis(exceedance_flows(values, [10, 50, 90, 95]), -1, 0)
+    valid = np.isfinite(values)
+
+    with np.errstate(divide='ignore', invalid='ignore'), warnings.catch_warnings():
+        warnings.simplefilter("ignore", RuntimeWarning)
+        mean = np.nanmean(values, axis=-1)
+        return {
+            "mean": mean,
+            "q10": q10,
+            "q50": q50,
+            "q90": q90,
+            "q95": q95,
+            "q90_q50_ratio": q90 / q50,  # low-flow variability, higher means more sustained baseflow
+            "q10_q50_ratio": q10 / q50,  # flashiness of high flows
+            "high_flow_days": np.sum(valid & (values > q10[..., None]), axis=-1),
+            "low_flow_days": np.sum(valid & (values < q90[..., None]), axis=-1),
+            "valid_days": np.sum(valid, axis=-1)
+        }
+
+
+def monthly_climatology(dates: Sequence[str], values: Any) -> Dict[str, Any]:
+    """
+    Mean, minimum, maximum and standard deviation of the series per calendar month
+    """
+    values = _as_array(values)
+    months = pd.to_datetime(list(dates), format='ISO8601').month.to_numpy() - 1
+    n = min(len(months), values.shape[-1])
+    months, values = months[:n], values[..., :n]
+
+    # One column per calendar month, NaN where the day falls in another month
+    in_month = months[:, None] == np.arange(12)[None, :]
+    stacked = np.where(in_month, values[..., :, None], np.nan)
+
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", RuntimeWarning)
+        return {
+            "month": list(range(1, 13)),
+            "mean": np.nanmean(stacked, axis=-2),
+            "min": np.nanmin(stacked, axis=-2),
+            "max": np.nanmax(stacked, axis=-2),
+            "std": np.nanstd(stacked, axis=-2),
+            "count": np.sum(np.isfinite(stacked), axis=-2)
+        }
+
+
+def series_statistics(dates: Sequence[str], values: Any,
+                      exceedance_percent: Sequence[float] = DEFAULT_EXCEEDANCE) -> Dict[str, Any]:
+    """
+    Flow-duration curve, flow indices and monthly climatology of a series
+    """
+    return {
+        "flow_duration_curve": flow_duration_curve(values, exceedance_percent),
+        "flow_indices": flow_indices(values),
+        "monthly_climatology": monthly_climatology(dates, values)
+    }
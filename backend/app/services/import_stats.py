@@ -0,0 +1,152 @@
+from sqlalchemy.orm import Session
+from sqlalchemy import and_, case, func
+from sqlalchemy.dialects import postgresql, sqlite
+from typing import Any, Dict, Optional
+from uuid import UUID
+from datetime import datetime, timedelta
+import logging
+
+from app.models.models import ImportedDataset, User, UserImportStats
+
+logger = logging.getLogger(__name__)
+
+# Window counted as recent uploads
+RECENT_UPLOAD_DAYS = 30
+
+
+class ImportStatsStore:
+    """
+    Per-user import counters, kept in step with imported_datasets.
+
+    Counts, active counts and bytes per file type are adjusted in the same
+    transaction as each insert or delete, so statistics read a handful of
+    counter rows instead of every dataset. Adjustments are atomic upserts of
+    increments, so concurrent imports never overwrite each other's counts.
+    A user's counters are built from one aggregate query the first time they
+    are needed, which also covers datasets imported before counters were
+    kept; the user's row is locked meanwhile so no import is counted twice
+    or missed.
+    """
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def record(self, dataset: ImportedDataset, sign: int):
+        """
+        Count a dataset in (+1) or out (-1) of its owner's counters.
+
+        Call after the insert or delete is flushed; does not commit.
+        """
+        if not self._initialized(dataset.owner_id) and self._initialize(dataset.owner_id):
+            # The flushed row was counted by the aggregate
+            return
+
+        self._increment(
+            dataset.owner_id,
+            dataset.file_type,
+            dataset_count=sign,
+            active_count=sign if dataset.is_active else 0,
+            total_bytes=sign * dataset.file_size
+        )
+
+    def statistics(self, user_id: UUID) -> Dict[str, Any]:
+        """
+        Get a user's import statistics from their counters
+        """
+        recent_date = datetime.now() - timedelta(days=RECENT_UPLOAD_DAYS)
+        rows = self.db.query(
+            UserImportStats.file_type,
+            UserImportStats.dataset_count,
+            UserImportStats.active_count,
+            UserImportStats.total_bytes
+        ).filter(UserImportStats.owner_id == user_id).all()
+
+        if rows:
+            # A range scan of the (owner, created_at) index
+            recent_uploads = self.db.query(func.count(ImportedDataset.id)).filter(
+                and_(
+                    ImportedDataset.owner_id == user_id,
+                    ImportedDataset.created_at >= recent_date
+                )
+            ).scalar()
+        else:
+            rows, recent_uploads = self._aggregate(user_id, recent_date=recent_date)
+            if rows and self._initialize(user_id):
+                self.db.commit()
+
+        total_datasets = sum(row.dataset_count for row in rows)
+        total_storage = sum(row.total_bytes for row in rows)
+
+        return {
+            "total_datasets": total_datasets,
+            "datasets_by_type": {row.file_type: row.dataset_count for row in rows if row.dataset_count},
+            "total_storage_bytes": total_storage,
+            "total_storage_mb": round(total_storage / (1024 * 1024), 2),
+            "recent_uploads_30_days": recent_uploads or 0,
+            "active_datasets": sum(row.active_count for row in rows),
+            "average_file_size_mb": round((total_storage / total_datasets) / (1024 * 1024), 2) if total_datasets else 0
+        }
+
+    def _initialized(self, user_id: UUID) -> bool:
+        return self.db.query(UserImportStats.owner_id).filter(UserImportStats.owner_id == user_id).first() is not None
+
+    def _aggregate(self, user_id: UUID, file_type: Optional[str] = None, recent_date: Optional[datetime] = None):
+        """
+        Count a user's datasets per file type in one GROUP BY query over the
+        counted columns only, with the recent upload total when asked for
+        """
+        columns = [
+            ImportedDataset.file_type,
+            func.count(ImportedDataset.id).label("dataset_count"),
+            func.sum(case((ImportedDataset.is_active.is_(True), 1), else_=0)).label("active_count"),
+            func.coalesce(func.sum(ImportedDataset.file_size), 0).label("total_bytes")
+        ]
+        if recent_date is not None:
+            columns.append(func.sum(case((ImportedDataset.created_at >= recent_date, 1), else_=0)).label("recent"))
+
+        query = self.db.query(*columns).filter(ImportedDataset.owner_id == user_id)
+        if file_type is not None:
+            query = query.filter(ImportedDataset.file_type == file_type)
+        rows = query.group_by(ImportedDataset.file_type).all()
+
+        recent = sum(row.recent for row in rows) if recent_date is not None else None
+        return rows, recent
+
+    def _initialize(self, user_id: UUID) -> bool:
+        """
+        Build a user's counters from their datasets unless another
+        transaction already has; returns whether they were built here
+        """
+        # Imports of the same user wait here until the counters exist, then
+        # only increment them
+        self.db.query(User.id).filter(User.id == user_id).with_for_update().first()
+        if self._initialized(user_id):
+            return False
+
+        rows, _ = self._aggregate(user_id)
+        for row in rows:
+            self._increment(
+                user_id,
+                row.file_type,
+                dataset_count=row.dataset_count,
+                active_count=int(row.active_count or 0),
+                total_bytes=int(row.total_bytes)
+            )
+        logger.info(f"Built import counters for user {user_id}")
+        return True
+
+    def _increment(self, user_id: UUID, file_type: str, **deltas: int):
+        """
+        Add to a user's counters for a file type, creating the row when it
+        does not exist yet, in one statement
+        """
+        dialect = postgresql if self.db.get_bind().dialect.name == "postgresql" else sqlite
+        statement = dialect.insert(UserImportStats).values(owner_id=user_id, file_type=file_type, **deltas)
+        statement = statement.on_conflict_do_update(
+            index_elements=[UserImportStats.owner_id, UserImportStats.file_type],
+            set_={
+                **{name: getattr(UserImportStats, name) + getattr(statement.excluded, name) for name in deltas},
+                "updated_at": func.now()
+            }
+        )
+        self.db.execute(statement)
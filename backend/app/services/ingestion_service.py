@@ -0,0 +1,287 @@
+from sqlalchemy.orm import Session
+from sqlalchemy import and_, or_
+from typing import Any, Dict, List, Optional
+from uuid import UUID
+from datetime import datetime, timedelta
+import asyncio
+import logging
+import os
+
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.models.models import IngestionJob, IngestionStatus
+from app.services.data_import_service import DataImportService
+
+logger = logging.getLogger(__name__)
+
+# Stages of an ingestion job, in order. The upload is spooled before the
+# job is created; processing parses, profiles and indexes the file on the
+# worker pool, storing moves the results to storage and recording creates
+# the dataset.
+INGESTION_STAGES = ['upload', 'processing', 'storing', 'recording']
+
+INTERRUPTED_ERROR = "Ingestion was interrupted by a server restart; upload the file again"
+
+# Jobs this process has accepted and not finished. Their leases are renewed
+# by maintain_ingestion_jobs; other processes sharing the database renew
+# their own, so a job whose lease lapses has lost the process running it.
+_active_jobs = set()
+
+
+class IngestionJobService:
+    """
+    Service layer for background ingestion jobs
+    """
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    async def create_job(
+        self,
+        user_id: UUID,
+        filename: str,
+        file_type: str,
+        file_size: int,
+        spool_path: Optional[str] = None
+    ) -> IngestionJob:
+        """
+        Create a queued job for an upload that has been spooled to ``spool_path``
+        """
+        stages = {name: {"status": "pending", "progress": 0.0} for name in INGESTION_STAGES}
+        stages['upload'] = {"status": "completed", "progress": 1.0}
+
+        job = IngestionJob(
+            filename=filename,
+            file_type=file_type,
+            file_size=file_size,
+            status=IngestionStatus.QUEUED,
+            stages=stages,
+            progress=100.0 / len(INGESTION_STAGES),
+            spool_path=spool_path,
+            heartbeat_at=datetime.utcnow(),
+            owner_id=user_id
+        )
+        self.db.add(job)
+        self.db.commit()
+        self.db.refresh(job)
+        _active_jobs.add(job.id)
+        return job
+
+    async def get_job(self, job_id: UUID, user_id: UUID) -> Optional[Dict[str, Any]]:
+        """
+        Get the status of a user's job
+        """
+        job = self.db.query(IngestionJob).filter(
+            and_(
+                IngestionJob.id == job_id,
+                IngestionJob.owner_id == user_id
+            )
+        ).first()
+        return self.job_summary(job) if job else None
+
+    async def get_user_jobs(self, user_id: UUID, limit: int = 20) -> List[Dict[str, Any]]:
+        """
+        Get a user's most recent jobs
+        """
+        jobs = self.db.query(IngestionJob).filter(
+            IngestionJob.owner_id == user_id
+        ).order_by(IngestionJob.created_at.desc()).limit(limit).all()
+        return [self.job_summary(job) for job in jobs]
+
+    async def update_stage(self, job_id: UUID, stage: str, fraction: float = 0.0):
+        """
+        Record progress through a stage; earlier stages count as completed
+        """
+        job = self.db.query(IngestionJob).filter(IngestionJob.id == job_id).first()
+        if not job:
+            return
+
+        position = INGESTION_STAGES.index(stage)
+        stages = {name: dict(state) for name, state in (job.stages or {}).items()}
+        for name in INGESTION_STAGES[:position]:
+            stages[name] = {**stages.get(name, {}), "status": "completed", "progress": 1.0}
+        for name in INGESTION_STAGES[position + 1:]:
+            stages.setdefault(name, {"status": "pending", "progress": 0.0})
+
+        now = datetime.utcnow().isoformat()
+        current = stages.get(stage, {})
+        stages[stage] = {
+            **current,
+            "status": "running",
+            "progress": round(fraction, 3),
+            "started_at": current.get("started_at") or now
+        }
+
+        job.stages = stages
+        job.stage = stage
+        job.status = IngestionStatus.RUNNING
+        job.progress = round((position + fraction) / len(INGESTION_STAGES) * 100, 1)
+        job.updated_at = datetime.utcnow()
+        job.heartbeat_at = job.updated_at
+        self.db.commit()
+
+    async def finish_job(self, job_id: UUID, result: Dict[str, Any]):
+        """
+        Record the outcome of a job from its import result
+        """
+        job = self.db.query(IngestionJob).filter(IngestionJob.id == job_id).first()
+        if not job:
+            return
+
+        succeeded = result.get("status") == "success"
+        stages = {name: dict(state) for name, state in (job.stages or {}).items()}
+        for name in INGESTION_STAGES:
+            state = stages.get(name, {})
+            if state.get("status") == "running":
+                stages[name] = {**state, "status": "completed" if succeeded else "failed"}
+                if succeeded:
+                    stages[name]["progress"] = 1.0
+            elif state.get("status") == "pending":
+                # Deduplicated uploads skip processing and storing
+                stages[name] = {**state, "status": "skipped" if succeeded else "pending"}
+
+        job.stages = stages
+        job.status = IngestionStatus.COMPLETED if succeeded else IngestionStatus.FAILED
+        job.result = result
+        job.error_message = None if succeeded else result.get("error")
+        job.dataset_id = UUID(result["dataset_id"]) if succeeded else None
+        job.progress = 100.0 if succeeded else job.progress
+        job.completed_at = datetime.utcnow()
+        job.updated_at = datetime.utcnow()
+        self.db.commit()
+
+    async def renew_leases(self, job_ids: List[UUID]):
+        """
+        Record that the jobs are still being run by this process
+        """
+        if job_ids:
+            self.db.query(IngestionJob).filter(
+                IngestionJob.id.in_(job_ids)
+            ).update({IngestionJob.heartbeat_at: datetime.utcnow()}, synchronize_session=False)
+            self.db.commit()
+
+    async def fail_orphaned_jobs(self) -> int:
+        """
+        Fail the queued or running jobs whose lease has lapsed, because the
+        process running them stopped, and remove their spooled uploads when
+        they are on this host.
+
+        Jobs of any process that is still alive, including other replicas
+        and workers sharing the database, keep renewing their leases and are
+        left alone. Returns the number of jobs failed.
+        """
+        cutoff = datetime.utcnow() - timedelta(seconds=settings.INGEST_LEASE_SECONDS)
+        orphaned = self.db.query(IngestionJob).filter(
+            and_(
+                IngestionJob.status.in_([IngestionStatus.QUEUED, IngestionStatus.RUNNING]),
+                or_(
+                    IngestionJob.heartbeat_at < cutoff,
+                    and_(IngestionJob.heartbeat_at.is_(None), IngestionJob.created_at < cutoff)
+                )
+            )
+        ).all()
+        orphaned = [job for job in orphaned if job.id not in _active_jobs]
+        for job in orphaned:
+            if job.spool_path and os.path.exists(job.spool_path):
+                os.remove(job.spool_path)
+            await self.finish_job(job.id, {"filename": job.filename, "status": "error", "error": INTERRUPTED_ERROR})
+
+        if orphaned:
+            logger.warning(f"Failed {len(orphaned)} ingestion jobs whose process stopped")
+        return len(orphaned)
+
+    @staticmethod
+    def job_summary(job: IngestionJob) -> Dict[str, Any]:
+        return {
+            "job_id": str(job.id),
+            "filename": job.filename,
+            "file_type": job.file_type,
+            "file_size": job.file_size,
+            "status": job.status.value,
+            "stage": job.stage,
+            "stages": [
+                {"name": name, **(job.stages or {}).get(name, {"status": "pending", "progress": 0.0})}
+                for name in INGESTION_STAGES
+            ],
+            "progress": job.progress,
+            "dataset_id": str(job.dataset_id) if job.dataset_id else None,
+            "error_message": job.error_message,
+            "result": job.result,
+            "created_at": job.created_at.isoformat() if job.created_at else None,
+            "updated_at": job.updated_at.isoformat() if job.updated_at else None,
+            "completed_at": job.completed_at.isoformat() if job.completed_at else None
+        }
+
+
+async def run_ingestion_job(
+    job_id: UUID,
+    user_id: UUID,
+    filename: str,
+    file_type: str,
+    spool_path: str,
+    file_size: int,
+    description: Optional[str] = None,
+    content_hash: Optional[str] = None,
+    basin_polygon: Optional[List[List[float]]] = None
+):
+    """
+    Background task to ingest a spooled upload, recording each stage on its job
+    """
+    db = SessionLocal()
+    try:
+        jobs = IngestionJobService(db)
+
+        async def report(stage: str, fraction: float):
+            await jobs.update_stage(job_id, stage, fraction)
+
+        try:
+            result = await DataImportService(db).process_uploaded_file(
+                filename=filename,
+                file_type=file_type,
+                spool_path=spool_path,
+                file_size=file_size,
+                user_id=user_id,
+                description=description,
+                content_hash=content_hash,
+                basin_polygon=basin_polygon,
+                report=report
+            )
+        except Exception as e:
+            logger.error(f"Ingestion job {job_id} failed: {str(e)}")
+            db.rollback()
+            result = {"filename": filename, "status": "error", "error": f"Processing failed: {str(e)}"}
+
+        await jobs.finish_job(job_id, result)
+        logger.info(f"Ingestion job {job_id} {result['status']}")
+    finally:
+        _active_jobs.discard(job_id)
+        if os.path.exists(spool_path):
+            os.remove(spool_path)
+        db.close()
+
+
+async def run_ingestion_jobs(jobs: List[Dict[str, Any]]):
+    """
+    Background task to run the jobs of one upload concurrently; the worker
+    pool bounds how many files are parsed at a time
+    """
+    await asyncio.gather(*(run_ingestion_job(**job) for job in jobs))
+
+
+async def maintain_ingestion_jobs():
+    """
+    Background loop, for the lifetime of the server, renewing the leases of
+    this process's jobs and failing jobs orphaned by processes that stopped
+    """
+    while True:
+        db = SessionLocal()
+        try:
+            jobs = IngestionJobService(db)
+            await jobs.renew_leases(list(_active_jobs))
+            await jobs.fail_orphaned_jobs()
+        except Exception as e:
+            logger.error(f"Could not maintain ingestion jobs: {str(e)}")
+            db.rollback()
+        finally:
+            db.close()
+        await asyncio.sleep(settings.INGEST_HEARTBEAT_SECONDS)
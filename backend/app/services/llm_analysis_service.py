@@ -64,6 +64,7 @@ class LLMAnalysisService:
         # Extract key metrics
         daily_results = next((r for r in results_data if r.get('result_type') == 'daily_results'), {}).get('data', {})
         annual_results = next((r for r in results_data if r.get('result_type') == 'annual_results'), {}).get('data', {})
+        events = next((r for r in results_data if r.get('result_type') == 'events'), {}).get('data', {})
         
         # Physical configuration
         physical_config = simulation_data.get('physical_config', {}) if isinstance(simulation_data.get('physical_config'), dict) else json.loads(simulation_data.get('physical_config', '{}'))
@@ -107,6 +108,11 @@ class LLMAnalysisService:
                 "runoff_coefficient": annual_results.get('runoff_coefficient', 0),
                 "water_balance_error_percent": annual_results.get('water_balance_error', 0)
             },
+            "hydrological_events": {
+                **events.get('summary', {}),
+                "flood_thresholds_mm": events.get('thresholds', {}).get('flood', []),
+                "drought_thresholds_mm": events.get('thresholds', {}).get('drought', [])
+            },
             "time_series_sample": {
                 "precipitation_first_30_days": daily_results.get('precipitation', [])[:30],
                 "runoff_first_30_days": daily_results.get('runoff', [])[:30],
@@ -206,6 +212,10 @@ Analise os seguintes dados de uma simulação hidrológica integrada e forneça
 - Coeficiente de escoamento: {context['hydrological_results']['runoff_coefficient']:.3f}
 - Erro do balanço hídrico: {context['hydrological_results']['water_balance_error_percent']:.2f}%
 
+**EVENTOS EXTREMOS:**
+- Eventos de cheia: {context['hydrological_events'].get('flood_events', 0)} ({context['hydrological_events'].get('flood_days', 0)} dias, duração máxima {context['hydrological_events'].get('max_flood_duration', 0)} dias)
+- Eventos de seca: {context['hydrological_events'].get('drought_events', 0)} ({context['hydrological_events'].get('drought_days', 0)} dias, duração máxima {context['hydrological_events'].get('max_drought_duration', 0)} dias)
+
 Forneça um parecer técnico estruturado em formato JSON com as seguintes seções:
 
 {{
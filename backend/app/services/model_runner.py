@@ -17,6 +17,10 @@ from anthropocene_model import AnthropoceneModel
 from artificial_aquifer_model import ArtificialAquiferModel
 from mhia_model import IntegratedMHIAModel
 
+from app.core.config import settings
+from app.services.forcing import load_linked_forcing
+from app.services.water_balance import SOIL_MOISTURE_FRACTION, compute_water_balance
+
 logger = logging.getLogger(__name__)
 
 class ModelRunner:
@@ -137,10 +141,11 @@ class ModelRunner:
         logger.info(f"Model configured with output directory: {output_dir}")
         model.is_configured = True
     
-    async def _configure_physical_model(self, model: PhysicalHydrologicalModel, config: Dict[str, Any], full_config: Dict[str, Any]):
+    async def _configure_physical_model(self, model: PhysicalHydrologicalModel, config: Dict[str, Any], full_config: Optional[Dict[str, Any]] = None):
         """
         Configure physical model parameters
         """
+        full_config = full_config or config
         model.basin_data = {
             'basin_area': config.get('basin_area', 100),
             'mean_elevation': config.get('mean_elevation', 500),
@@ -154,17 +159,27 @@ class ModelRunner:
             'water_percent': config.get('water_percent', 10)
         }
         
-        # Generate synthetic meteorological data
-        start_date = datetime.fromisoformat(config.get('start_date', '2023-01-01'))
-        end_date = datetime.fromisoformat(config.get('end_date', '2023-12-31'))
+        # The simulation window is set at the top level of the configuration
+        start_date = pd.Timestamp(full_config.get('start_date', config.get('start_date', '2023-01-01'))).normalize().to_pydatetime()
+        end_date = pd.Timestamp(full_config.get('end_date', config.get('end_date', '2023-12-31'))).normalize().to_pydatetime()
         
-        model.meteorological_data = await self._generate_synthetic_weather(
+        weather = await self._generate_synthetic_weather(
             start_date, 
             end_date,
             config.get('annual_precipitation', 1200),
             config.get('mean_temperature', 18)
         )
         
+        # Observed inputs from a linked meteorological dataset replace their
+        # synthetic counterparts; inputs the dataset lacks stay synthetic
+        forcing = await load_linked_forcing(full_config, start_date, end_date)
+        if forcing is not None:
+            observed = [col for col in forcing.columns if col != 'date']
+            weather = weather.assign(**{col: forcing[col].to_numpy() for col in observed})
+            logger.info(f"Physical model driven by linked dataset inputs: {', '.join(observed)}")
+        
+        model.meteorological_data = weather
+        
         model.is_configured = True
     
     async def _configure_socio_model(self, model: SociohydrologicalModel, config: Dict[str, Any]):
@@ -275,7 +290,9 @@ class ModelRunner:
                     'model_version': '1.0.0',
                     'run_timestamp': datetime.now().isoformat(),
                     'configuration': config,
-                    'processing_time': results.get('processing_time', 0)
+                    'processing_time': results.get('processing_time', 0),
+                    # The model writes volumetric soil moisture
+                    'units': {'soil_moisture': SOIL_MOISTURE_FRACTION}
                 }
             }
             
@@ -426,7 +443,7 @@ class ModelRunner:
                 'monthly_results': monthly_results,
                 'annual_results': annual_results,
                 'indicators': indicators,
-                'water_balance': self._calculate_water_balance(annual_results),
+                'water_balance': self._calculate_water_balance(daily_results, model),
                 'performance_metrics': self._calculate_performance_metrics(daily_results, annual_results)
             }
             
@@ -442,17 +459,22 @@ class ModelRunner:
                 'performance_metrics': self._generate_mock_performance()
             }
     
-    def _calculate_water_balance(self, annual_results: Dict) -> Dict[str, Any]:
-        """Calculate water balance from annual results"""
-        return {
-            'input_precipitation': annual_results.get('total_precipitation', 0),
-            'output_evapotranspiration': annual_results.get('total_evapotranspiration', 0),
-            'output_runoff': annual_results.get('total_runoff', 0),
-            'change_soil_storage': 0,  # Would need storage data
-            'change_groundwater_storage': 0,  # Would need groundwater data
-            'balance_error': annual_results.get('water_balance_error', 0),
-            'balance_error_percent': annual_results.get('water_balance_error', 0)
-        }
+    def _calculate_water_balance(self, daily_results: Dict, model: IntegratedMHIAModel) -> Dict[str, Any]:
+        """Account the water balance from the daily storage and flux series"""
+        physical_model = getattr(model, 'physical_model', None)
+        soil_depth = (getattr(physical_model, 'basin_data', None) or {}).get('soil_depth')
+        
+        water_balance = None
+        if daily_results.get('dates'):
+            water_balance = compute_water_balance(
+                daily_results['dates'],
+                [daily_results],
+                soil_depth_m=soil_depth,
+                tolerance_percent=settings.WATER_BALANCE_TOLERANCE_PERCENT,
+                soil_moisture_unit=SOIL_MOISTURE_FRACTION
+            )
+        
+        return water_balance or {}
     
     def _calculate_performance_metrics(self, daily_results: Dict, annual_results: Dict) -> Dict[str, Any]:
         """Calculate performance metrics from results"""
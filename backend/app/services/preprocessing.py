@@ -0,0 +1,214 @@
+"""
+Regularization and gap filling of imported series.
+
+A dataset's series store is aggregated onto a regular grid at the model time
+step, so missing periods become explicit gaps, and the gaps are then filled
+by one of three methods:
+
+- ``linear``: interpolation between the nearest observed periods
+- ``climatology``: the mean of the same period of the year (day, month or
+  hour of the day) over the other years
+- ``regression``: a least-squares fit against the same variable at a
+  neighbouring station
+
+Every method works on whole arrays; gaps a method cannot fill (no neighbour
+value, no observation of that period of the year) fall back to linear
+interpolation. The result is written as a new series store, which is cached
+as a derivative of the dataset keyed by ``PREPROCESSING_VERSION``.
+"""
+from typing import Any, Dict, List, Optional, Tuple
+import numpy as np
+
+from app.services.timeseries_store import RESAMPLE_UNITS, TimeSeriesStore, write_series_store
+
+# Bump when regularization or filling changes, so cached derivatives are rebuilt
+PREPROCESSING_VERSION = 1
+
+FILL_METHODS = ['linear', 'climatology', 'regression']
+
+# Column mapping targets accumulated over a period; the others are averaged
+ACCUMULATED_TARGETS = {'precipitation'}
+
+# Fewest periods observed at both stations for a regression fill
+MIN_REGRESSION_OVERLAP = 10
+
+
+def derived_series_key(series_path: str, frequency: str, method: str, neighbour_key: Optional[str] = None) -> str:
+    """
+    Key prefix of a dataset's preprocessed series store
+    """
+    name = f"{frequency}-{method}" + (f"-{neighbour_key}" if neighbour_key else "")
+    return f"{series_path}.derived/{name}-v{PREPROCESSING_VERSION}"
+
+
+def regularize(
+    store: TimeSeriesStore,
+    frequency: str,
+    accumulated: List[str]
+) -> Tuple[np.ndarray, Dict[str, np.ndarray]]:
+    """
+    Aggregate every variable onto a regular grid of periods from the first
+    to the last observation; periods without values are NaN
+    """
+    grid = None
+    values = {}
+    for how in ('sum', 'mean'):
+        variables = [var for var in store.variables if (var in accumulated) == (how == 'sum')]
+        if not variables:
+            continue
+        data = store.resample(frequency, how, variables)
+        dates = data.pop("dates")
+        if grid is None:
+            grid = np.arange(dates[0], dates[-1] + 1)
+        # Periods are sorted, so each lands at its offset from the first
+        positions = (dates - grid[0]).astype(np.int64)
+        for variable, column in data.items():
+            full = np.full(len(grid), np.nan)
+            full[positions] = column
+            values[variable] = full
+    return grid, values
+
+
+def season_keys(grid: np.ndarray, frequency: str) -> np.ndarray:
+    """
+    Period of the year of each grid period, used to group climatologies
+    """
+    if frequency == 'annual':
+        return np.zeros(len(grid), dtype=np.int64)
+    if frequency == 'monthly':
+        return grid.astype('datetime64[M]').astype(np.int64) % 12
+
+    days = grid.astype('datetime64[D]')
+    day_of_year = (days - days.astype('datetime64[Y]')).astype(np.int64)
+    if frequency == 'hourly':
+        hour = (grid.astype('datetime64[h]') - days).astype(np.int64)
+        return day_of_year * 24 + hour
+    return day_of_year
+
+
+def fill_linear(values: np.ndarray) -> np.ndarray:
+    """
+    Interpolate gaps linearly; leading and trailing gaps take the nearest value
+    """
+    valid = np.flatnonzero(~np.isnan(values))
+    if not len(valid) or len(valid) == len(values):
+        return values
+    return np.interp(np.arange(len(values)), valid, values[valid])
+
+
+def fill_climatology(values: np.ndarray, keys: np.ndarray) -> np.ndarray:
+    """
+    Fill gaps with the mean of the observed values sharing their season key
+    """
+    valid = ~np.isnan(values)
+    sums = np.bincount(keys[valid], weights=values[valid], minlength=keys.max() + 1)
+    counts = np.bincount(keys[valid], minlength=keys.max() + 1)
+    means = np.divide(sums, counts, out=np.full(len(sums), np.nan), where=counts > 0)
+    return np.where(valid, values, means[keys])
+
+
+def fill_regression(values: np.ndarray, neighbour: np.ndarray) -> Tuple[np.ndarray, Optional[float]]:
+    """
+    Fill gaps from a neighbour series aligned on the same grid, by a
+    least-squares line fitted over the periods both observed.
+
+    Returns the filled values and the fit's r², or the values unchanged and
+    None when the series overlap too little to fit.
+    """
+    both = ~np.isnan(values) & ~np.isnan(neighbour)
+    if both.sum() < MIN_REGRESSION_OVERLAP:
+        return values, None
+
+    x = neighbour[both]
+    y = values[both]
+    x_mean, y_mean = x.mean(), y.mean()
+    variance = ((x - x_mean) ** 2).sum()
+    slope = ((x - x_mean) * (y - y_mean)).sum() / variance if variance > 0 else 0.0
+    intercept = y_mean - slope * x_mean
+
+    residual = ((y - (intercept + slope * x)) ** 2).sum()
+    total = ((y - y_mean) ** 2).sum()
+    r2 = float(1 - residual / total) if total > 0 else 1.0
+
+    return np.where(np.isnan(values), intercept + slope * neighbour, values), r2
+
+
+def align(grid: np.ndarray, other_grid: np.ndarray, values: np.ndarray) -> np.ndarray:
+    """
+    Place values on another grid of the same frequency onto ``grid``
+    """
+    aligned = np.full(len(grid), np.nan)
+    offset = int((other_grid[0] - grid[0]).astype(np.int64))
+    lower, upper = max(offset, 0), min(offset + len(other_grid), len(grid))
+    if lower < upper:
+        aligned[lower:upper] = values[lower - offset:upper - offset]
+    return aligned
+
+
+def preprocess_series(
+    directory: str,
+    output_directory: str,
+    frequency: str,
+    method: str,
+    accumulated: List[str],
+    neighbour_directory: Optional[str] = None,
+    neighbour_variables: Optional[Dict[str, str]] = None
+) -> Dict[str, Any]:
+    """
+    Regularize a series store and fill its gaps into a new store.
+
+    ``neighbour_variables`` maps variables to their counterpart in the
+    neighbour store for regression fills. Runs in a worker process; returns
+    the new store's metadata.
+    """
+    if frequency not in RESAMPLE_UNITS:
+        raise ValueError(f"Unsupported frequency: {frequency}")
+    if method not in FILL_METHODS:
+        raise ValueError(f"Unsupported fill method: {method}")
+
+    grid, values = regularize(TimeSeriesStore(directory), frequency, accumulated)
+
+    neighbour_grid, neighbour_values = None, {}
+    if method == 'regression':
+        if not neighbour_directory:
+            raise ValueError("Regression filling needs a neighbouring station")
+        # Counterparts are aggregated like the variables they fill
+        neighbour_variables = neighbour_variables or {}
+        neighbour_grid, neighbour_values = regularize(
+            TimeSeriesStore(neighbour_directory),
+            frequency,
+            [neighbour_variables[var] for var in accumulated if var in neighbour_variables]
+        )
+
+    keys = season_keys(grid, frequency) if method == 'climatology' else None
+    filled: Dict[str, int] = {}
+    fits: Dict[str, Optional[float]] = {}
+
+    for variable, column in values.items():
+        gaps = np.isnan(column)
+        if method == 'climatology':
+            column = fill_climatology(column, keys)
+        elif method == 'regression':
+            counterpart = neighbour_variables.get(variable)
+            if counterpart in neighbour_values:
+                column, fits[variable] = fill_regression(
+                    column, align(grid, neighbour_grid, neighbour_values[counterpart])
+                )
+            else:
+                fits[variable] = None
+            if variable in accumulated:
+                # A fitted line can go below zero where the neighbour is dry
+                column = np.where(gaps, np.maximum(column, 0.0), column)
+
+        values[variable] = fill_linear(column)
+        filled[variable] = int((gaps & ~np.isnan(values[variable])).sum())
+
+    preprocessing = {
+        "version": PREPROCESSING_VERSION,
+        "frequency": frequency,
+        "method": method,
+        "filled": filled
+    }
+    if method == 'regression':
+        preprocessing["r2"] = fits
+    return write_series_store(output_directory, grid, values, preprocessing=preprocessing)
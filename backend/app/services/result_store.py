@@ -0,0 +1,107 @@
+from sqlalchemy.orm import Session
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy import func, JSON
+from typing import Any, Iterable
+import hashlib
+import json
+import logging
+
+from app.models.models import ResultBlob, SimulationResult
+
+logger = logging.getLogger(__name__)
+
+
+def canonical_json(data: Any) -> bytes:
+    """
+    Serialize a payload deterministically so equal payloads hash equally
+    """
+    return json.dumps(data, sort_keys=True, separators=(',', ':'), default=str).encode('utf-8')
+
+
+def payload_column():
+    """
+    Column expression for a result's payload, whether blob-backed or inline.
+
+    Queries using it must outer join ResultBlob on SimulationResult.blob_hash.
+    """
+    return func.coalesce(ResultBlob.data, SimulationResult.data, type_=JSON)
+
+
+def payload_field(key: str):
+    """
+    Column expression for a single top-level entry of a result's payload
+    """
+    return payload_column()[key]
+
+
+class ResultBlobStore:
+    """
+    Content-addressed, reference-counted storage for result payloads.
+
+    Identical payloads from re-runs, clones and unchanged scenarios are stored once
+    and shared by every SimulationResult that references them.
+    """
+    
+    def __init__(self, db: Session):
+        self.db = db
+    
+    def put(self, data: Any) -> str:
+        """
+        Store a payload (or add a reference to an identical one) and return its hash.
+
+        Does not commit; the reference is part of the caller's transaction.
+        """
+        encoded = canonical_json(data)
+        content_hash = hashlib.sha256(encoded).hexdigest()
+        
+        if self._add_reference(content_hash):
+            return content_hash
+        
+        try:
+            with self.db.begin_nested():
+                self.db.add(ResultBlob(
+                    content_hash=content_hash,
+                    data=data,
+                    size_bytes=len(encoded),
+                    ref_count=1
+                ))
+        except IntegrityError:
+            # Another transaction stored the same payload first
+            self._add_reference(content_hash)
+        
+        return content_hash
+    
+    def release(self, content_hashes: Iterable[str]):
+        """
+        Drop one reference per hash and delete blobs nobody references any more.
+
+        Does not commit; the release is part of the caller's transaction.
+        """
+        content_hashes = [content_hash for content_hash in content_hashes if content_hash]
+        if not content_hashes:
+            return
+        
+        for content_hash in content_hashes:
+            self.db.query(ResultBlob).filter(
+                ResultBlob.content_hash == content_hash
+            ).update(
+                {ResultBlob.ref_count: ResultBlob.ref_count - 1},
+                synchronize_session=False
+            )
+        
+        deleted = self.db.query(ResultBlob).filter(
+            ResultBlob.content_hash.in_(set(content_hashes)),
+            ResultBlob.ref_count <= 0
+        ).delete(synchronize_session=False)
+        
+        if deleted:
+            logger.info(f"Deleted {deleted} unreferenced result blobs")
+    
+    def _add_reference(self, content_hash: str) -> bool:
+        updated = self.db.query(ResultBlob).filter(
+            ResultBlob.content_hash == content_hash
+        ).update(
+            {ResultBlob.ref_count: ResultBlob.ref_count + 1},
+            synchronize_session=False
+        )
+        return updated > 0
@@ -1,11 +1,21 @@
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Session, joinedload
 from sqlalchemy import and_, or_, func
 from typing import List, Optional, Dict, Any
 from uuid import UUID
+import json
 import logging
 from datetime import datetime
 
-from app.models.models import Simulation, SimulationResult, User, SimulationStatus
+from app.core.cache import results_cache, cache_key
+from app.core.config import settings
+from app.core.serialization import dumps
+from app.core.storage import storage
+from app.models.models import Simulation, SimulationResult, ResultBlob, User, SimulationStatus
+from app.services.result_store import ResultBlobStore, payload_column, payload_field
+from app.services.hydro_statistics import series_statistics
+from app.services.event_detection import build_event_catalogue
+from app.services.water_balance import compute_water_balance
+from app.services.export_service import split_members, export_prefix, latest_results
 from app.schemas.simulation import (
     SimulationCreate, 
     SimulationUpdate, 
@@ -15,6 +25,48 @@ from app.schemas.simulation import (
 
 logger = logging.getLogger(__name__)
 
+# Closure figures surfaced in simulation summaries
+WATER_BALANCE_KEY_METRICS = [
+    'balance_error_percent',
+    'tolerance_percent',
+    'within_tolerance',
+    'storage_source'
+]
+
+# Annual totals surfaced in simulation summaries
+ANNUAL_KEY_METRICS = [
+    'total_precipitation',
+    'total_evapotranspiration',
+    'total_runoff',
+    'water_balance_error'
+]
+
+# Key-metric sections of a simulation summary by result type
+SUMMARY_SECTIONS = {
+    'annual_results': 'annual',
+    'indicators': 'indicators',
+    'events': 'events',
+    'water_balance': 'water_balance'
+}
+
+def extract_key_metrics(result_type: str, data: Any) -> Optional[Dict[str, Any]]:
+    """
+    Extract the compact metrics a summary needs from a result payload
+    """
+    if not isinstance(data, dict):
+        return None
+    
+    if result_type == 'annual_results':
+        return {name: data.get(name) for name in ANNUAL_KEY_METRICS}
+    elif result_type == 'indicators':
+        return data
+    elif result_type == 'events':
+        return data.get('summary')
+    elif result_type == 'water_balance':
+        return {name: data.get(name) for name in WATER_BALANCE_KEY_METRICS}
+    
+    return None
+
 class SimulationService:
     """
     Service layer for simulation management
@@ -153,6 +205,7 @@ class SimulationService:
             
             self.db.commit()
             self.db.refresh(simulation)
+            results_cache.invalidate(simulation_id)
             
             logger.info(f"Updated simulation {simulation_id}")
             
@@ -180,13 +233,23 @@ class SimulationService:
                 return False
             
             # Delete associated results first (cascade should handle this, but explicit is better)
+            blob_hashes = [
+                row.blob_hash for row in self.db.query(SimulationResult.blob_hash).filter(
+                    SimulationResult.simulation_id == simulation_id
+                ).all()
+            ]
             self.db.query(SimulationResult).filter(
                 SimulationResult.simulation_id == simulation_id
             ).delete()
             
+            # Shared payloads are only dropped once no other result references them
+            ResultBlobStore(self.db).release(blob_hashes)
+            
             # Delete the simulation
             self.db.delete(simulation)
             self.db.commit()
+            results_cache.invalidate(simulation_id)
+            await self._drop_exports(simulation_id)
             
             logger.info(f"Deleted simulation {simulation_id}")
             
@@ -230,6 +293,7 @@ class SimulationService:
                 simulation.error_message = None
             
             self.db.commit()
+            results_cache.invalidate(simulation_id)
             
             logger.info(f"Updated simulation {simulation_id} status to {status.value}")
             
@@ -250,19 +314,65 @@ class SimulationService:
         """
         try:
             # Save different types of results as separate records
-            result_types = ['daily_results', 'monthly_results', 'annual_results', 'indicators']
+            result_types = [
+                'daily_results', 'monthly_results', 'annual_results', 'indicators', 'events', 'water_balance'
+            ]
+            blob_store = ResultBlobStore(self.db)
+            
+            run_results = dict(results.get('results', {}))
+            daily_results = run_results.get('daily_results')
+            if isinstance(daily_results, dict) and daily_results.get('dates'):
+                members = split_members(daily_results)
+                
+                # Catalogue events once so readers never rescan the daily arrays
+                if 'events' not in run_results:
+                    events = build_event_catalogue(daily_results['dates'], members)
+                    if events:
+                        run_results['events'] = events
+                
+                # Balances without closure figures (e.g. mock fallbacks) are recomputed
+                if 'within_tolerance' not in (run_results.get('water_balance') or {}):
+                    units = (results.get('metadata') or {}).get('units') or {}
+                    water_balance = compute_water_balance(
+                        daily_results['dates'],
+                        members,
+                        soil_depth_m=self._get_soil_depth(simulation_id),
+                        tolerance_percent=settings.WATER_BALANCE_TOLERANCE_PERCENT,
+                        soil_moisture_unit=units.get('soil_moisture')
+                    )
+                    if water_balance:
+                        run_results['water_balance'] = water_balance
+            
+            water_balance = run_results.get('water_balance')
+            if isinstance(water_balance, dict) and 'within_tolerance' in water_balance:
+                # The annual closure error always reflects the accounted series
+                if isinstance(run_results.get('annual_results'), dict):
+                    run_results['annual_results'] = {
+                        **run_results['annual_results'],
+                        'water_balance_error': water_balance['balance_error_percent']
+                    }
+                if not water_balance['within_tolerance']:
+                    logger.warning(
+                        f"Simulation {simulation_id} water balance does not close: "
+                        f"error {water_balance['balance_error_percent']}% exceeds "
+                        f"{water_balance['tolerance_percent']}%"
+                    )
             
             for result_type in result_types:
-                if result_type in results.get('results', {}):
+                if result_type in run_results:
+                    data = run_results[result_type]
                     db_result = SimulationResult(
                         simulation_id=simulation_id,
                         result_type=result_type,
-                        data=results['results'][result_type],
-                        result_metadata=results.get('metadata', {})
+                        blob_hash=blob_store.put(data),
+                        result_metadata=results.get('metadata', {}),
+                        key_metrics=extract_key_metrics(result_type, data)
                     )
                     self.db.add(db_result)
             
             self.db.commit()
+            results_cache.invalidate(simulation_id)
+            await self._drop_exports(simulation_id)
             
             logger.info(f"Saved results for simulation {simulation_id}")
             
@@ -273,6 +383,26 @@ class SimulationService:
             logger.error(f"Error saving simulation results: {str(e)}")
             raise
     
+    async def _drop_exports(self, simulation_id: UUID):
+        """
+        Delete stored export files of earlier results versions
+        """
+        try:
+            await storage.delete_prefix(export_prefix(simulation_id))
+        except Exception as e:
+            logger.warning(f"Could not delete exports of simulation {simulation_id}: {str(e)}")
+    
+    def _get_soil_depth(self, simulation_id: UUID) -> Optional[float]:
+        """
+        Get the configured soil depth in metres of a simulation
+        """
+        configuration = self.db.query(Simulation.configuration).filter(
+            Simulation.id == simulation_id
+        ).scalar() or {}
+        physical_config = configuration.get('physical_config') or {}
+        
+        return physical_config.get('soil_depth')
+    
     async def get_simulation_results(
         self, 
         simulation_id: UUID, 
@@ -280,14 +410,21 @@ class SimulationService:
         result_type: Optional[str] = None
     ) -> List[Dict[str, Any]]:
         """
-        Get simulation results
+        Get simulation results, served from the results cache when possible
         """
         # First verify user owns the simulation
         simulation = await self.get_simulation(simulation_id, user_id)
         if not simulation:
             return []
         
-        query = self.db.query(SimulationResult).filter(
+        key = cache_key("results", simulation_id, result_type)
+        cached = results_cache.get(key)
+        if cached is not None:
+            return cached
+        
+        query = self.db.query(SimulationResult).options(
+            joinedload(SimulationResult.blob)
+        ).filter(
             SimulationResult.simulation_id == simulation_id
         )
         
@@ -296,16 +433,187 @@ class SimulationService:
         
         results = query.all()
         
-        return [
+        formatted_results = [
             {
                 'id': str(result.id),
                 'result_type': result.result_type,
-                'data': result.data,
+                'data': result.payload,
                 'metadata': result.result_metadata,
                 'created_at': result.created_at.isoformat()
             }
             for result in results
         ]
+        
+        if formatted_results:
+            results_cache.set(key, formatted_results, simulation_id)
+        
+        return formatted_results
+    
+    async def get_simulation_summary(self, simulation_id: UUID, user_id: UUID) -> Optional[Dict[str, Any]]:
+        """
+        Get a summary of simulation results, served from the results cache when possible
+        """
+        simulation = self.db.query(Simulation).filter(
+            and_(
+                Simulation.id == simulation_id,
+                Simulation.owner_id == user_id
+            )
+        ).first()
+        
+        if not simulation:
+            return None
+        
+        key = cache_key("summary", simulation_id)
+        cached = results_cache.get(key)
+        if cached is not None:
+            return cached
+        
+        # Only the compact metrics column is read, never the result payloads
+        rows = self.db.query(
+            SimulationResult.id,
+            SimulationResult.result_type,
+            SimulationResult.key_metrics
+        ).filter(
+            SimulationResult.simulation_id == simulation_id
+        ).order_by(SimulationResult.created_at, SimulationResult.id).all()
+        
+        if not rows:
+            return None
+        
+        # A re-run's rows replace the earlier run's
+        by_id = {row.id: row for row in rows}
+        results = [by_id[result_id] for result_id, _ in latest_results([(row.id, row.result_type) for row in rows])]
+        
+        summary = {
+            "simulation_id": str(simulation_id),
+            "simulation_name": simulation.name,
+            "status": simulation.status.value,
+            "model_type": simulation.model_type.value,
+            "time_period": {
+                "start": simulation.start_date.isoformat(),
+                "end": simulation.end_date.isoformat()
+            },
+            "results_available": [result.result_type for result in results],
+            "key_metrics": {}
+        }
+        
+        for result in results:
+            if result.result_type not in SUMMARY_SECTIONS:
+                continue
+            
+            metrics = result.key_metrics
+            if metrics is None:
+                # Rows saved before key metrics were materialized
+                data = self.db.query(payload_column()).select_from(SimulationResult).outerjoin(
+                    ResultBlob, SimulationResult.blob_hash == ResultBlob.content_hash
+                ).filter(
+                    SimulationResult.id == result.id
+                ).scalar()
+                metrics = extract_key_metrics(result.result_type, data)
+            
+            if metrics is not None:
+                summary["key_metrics"][SUMMARY_SECTIONS[result.result_type]] = metrics
+        
+        results_cache.set(key, summary, simulation_id)
+        
+        return summary
+    
+    async def get_simulation_statistics(
+        self,
+        simulation_id: UUID,
+        user_id: UUID,
+        variables: List[str],
+        exceedance_percent: List[float]
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Get flow-duration curves, flow indices and monthly climatology of daily
+        result series, served from the results cache when possible
+        """
+        simulation = await self.get_simulation(simulation_id, user_id)
+        if not simulation:
+            return None
+        
+        key = cache_key(
+            "statistics",
+            simulation_id,
+            ",".join(variables),
+            ",".join(f"{p:g}" for p in sorted(exceedance_percent))
+        )
+        cached = results_cache.get(key)
+        if cached is not None:
+            return cached
+        
+        # Only the dates and requested series are read from the payload
+        row = self.db.query(
+            payload_field("dates"),
+            *[payload_field(variable) for variable in variables]
+        ).select_from(SimulationResult).outerjoin(
+            ResultBlob, SimulationResult.blob_hash == ResultBlob.content_hash
+        ).filter(
+            and_(
+                SimulationResult.simulation_id == simulation_id,
+                SimulationResult.result_type == 'daily_results'
+            )
+        ).order_by(SimulationResult.created_at.desc()).first()
+        
+        if not row or not row[0]:
+            return None
+        
+        dates = row[0]
+        statistics = {
+            "simulation_id": str(simulation_id),
+            "result_type": "daily_results",
+            "period": {"start": dates[0], "end": dates[-1], "days": len(dates)},
+            "variables": {},
+            "missing_variables": []
+        }
+        
+        for variable, values in zip(variables, row[1:]):
+            if not values:
+                statistics["missing_variables"].append(variable)
+                continue
+            values = [value if value is not None else float("nan") for value in values]
+            statistics["variables"][variable] = series_statistics(dates, values, exceedance_percent)
+        
+        # Cache plain JSON types; NaN statistics of empty months become null
+        statistics = json.loads(dumps(statistics))
+        results_cache.set(key, statistics, simulation_id)
+        
+        return statistics
+    
+    async def get_results_version(self, simulation_id: UUID, user_id: UUID) -> Optional[Dict[str, Any]]:
+        """
+        Get a version identifier for a simulation's results without loading them.
+
+        The version changes whenever the simulation record or its set of result
+        rows changes, so it can back an ETag.
+        """
+        simulation = self.db.query(
+            Simulation.status,
+            Simulation.completed_at,
+            Simulation.updated_at
+        ).filter(
+            and_(
+                Simulation.id == simulation_id,
+                Simulation.owner_id == user_id
+            )
+        ).first()
+        
+        if not simulation:
+            return None
+        
+        result_ids = self.db.query(SimulationResult.id).filter(
+            SimulationResult.simulation_id == simulation_id
+        ).order_by(SimulationResult.id).all()
+        
+        version = ":".join([
+            simulation.status.value,
+            simulation.completed_at.isoformat() if simulation.completed_at else "",
+            simulation.updated_at.isoformat() if simulation.updated_at else "",
+            ",".join(str(row.id) for row in result_ids)
+        ])
+        
+        return {"version": version}
     
     async def get_user_simulation_stats(self, user_id: UUID) -> Dict[str, Any]:
         """
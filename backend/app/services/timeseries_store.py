@@ -0,0 +1,184 @@
+"""
+Date-indexed storage for imported observation series.
+
+A dataset's series are kept as one ``.npy`` array per numeric variable plus a
+sorted ``datetime64`` index, all of the same length. Arrays are opened
+memory-mapped, so a date-range read is two binary searches on the index and
+a slice of each requested variable; only the pages in the range are read.
+"""
+from typing import Any, Dict, List, Optional
+import json
+import os
+import numpy as np
+import pandas as pd
+
+INDEX_FILE = "index.npy"
+META_FILE = "meta.json"
+
+# Resampling frequencies and the datetime64 unit each period is truncated to
+RESAMPLE_UNITS = {
+    'hourly': 'h',
+    'daily': 'D',
+    'monthly': 'M',
+    'annual': 'Y'
+}
+
+AGGREGATIONS = ['mean', 'sum', 'min', 'max']
+
+
+class SeriesBuilder:
+    """
+    Collects the dated numeric columns of parsed chunks and writes them as a
+    sorted series store. Rows without a valid date are dropped.
+    """
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        self.variables: Optional[List[str]] = None
+        self._dates: List[np.ndarray] = []
+        self._values: Dict[str, List[np.ndarray]] = {}
+
+    def append(self, chunk: pd.DataFrame, date_column: str, dates: pd.Series):
+        if self.variables is None:
+            self.variables = [
+                col for col in chunk.select_dtypes(include=['number']).columns if col != date_column
+            ]
+            self._values = {variable: [] for variable in self.variables}
+
+        valid = dates.notna().to_numpy()
+        self._dates.append(dates.to_numpy(dtype='datetime64[s]')[valid])
+        for variable in self.variables:
+            values = pd.to_numeric(chunk[variable], errors='coerce').to_numpy(dtype=np.float64)
+            self._values[variable].append(values[valid])
+
+    def close(self) -> Optional[Dict[str, Any]]:
+        """
+        Write the store, returning its metadata, or None when no dated rows
+        or numeric variables were seen
+        """
+        if not self.variables or not self._dates:
+            return None
+        index = np.concatenate(self._dates)
+        if not len(index):
+            return None
+
+        # A stable sort keeps rows sharing a date in file order
+        order = np.argsort(index, kind='stable')
+        if not np.all(order == np.arange(len(order))):
+            index = index[order]
+        else:
+            order = None
+
+        values = {}
+        for variable in self.variables:
+            column = np.concatenate(self._values.pop(variable))
+            values[variable] = column if order is None else column[order]
+        return write_series_store(self.directory, index, values)
+
+
+def write_series_store(directory: str, index: np.ndarray, values: Dict[str, np.ndarray], **extra: Any) -> Dict[str, Any]:
+    """
+    Write a sorted index and its variables as a series store, returning its
+    metadata. ``extra`` entries are recorded in the metadata as-is.
+    """
+    os.makedirs(directory, exist_ok=True)
+    index = index.astype('datetime64[s]')
+    np.save(os.path.join(directory, INDEX_FILE), index)
+
+    files = {}
+    for i, (variable, column) in enumerate(values.items()):
+        files[variable] = f"var_{i}.npy"
+        np.save(os.path.join(directory, files[variable]), column)
+
+    meta = {
+        "variables": files,
+        "length": int(len(index)),
+        "start": str(index[0]),
+        "end": str(index[-1]),
+        **extra
+    }
+    with open(os.path.join(directory, META_FILE), 'w') as f:
+        json.dump(meta, f)
+    return meta
+
+
+class TimeSeriesStore:
+    """
+    Read access to a series store written by ``SeriesBuilder``
+    """
+
+    def __init__(self, directory: str):
+        with open(os.path.join(directory, META_FILE)) as f:
+            self.meta = json.load(f)
+        self.directory = directory
+        self.index = np.load(os.path.join(directory, INDEX_FILE), mmap_mode='r')
+
+    @property
+    def variables(self) -> List[str]:
+        return list(self.meta["variables"])
+
+    def values(self, variable: str) -> np.ndarray:
+        return np.load(os.path.join(self.directory, self.meta["variables"][variable]), mmap_mode='r')
+
+    def locate(self, start: Optional[Any] = None, end: Optional[Any] = None) -> slice:
+        """
+        Positions of the rows dated within [start, end], by binary search
+        """
+        lower = 0 if start is None else int(np.searchsorted(self.index, np.datetime64(pd.Timestamp(start), 's'), side='left'))
+        upper = len(self.index) if end is None else int(np.searchsorted(self.index, np.datetime64(pd.Timestamp(end), 's'), side='right'))
+        return slice(lower, max(lower, upper))
+
+    def read(
+        self,
+        variables: Optional[List[str]] = None,
+        start: Optional[Any] = None,
+        end: Optional[Any] = None
+    ) -> Dict[str, np.ndarray]:
+        """
+        Read variables dated within [start, end] as ``dates`` plus one array per variable
+        """
+        variables = variables or self.variables
+        rows = self.locate(start, end)
+        return {
+            "dates": np.asarray(self.index[rows]),
+            **{variable: np.asarray(self.values(variable)[rows]) for variable in variables}
+        }
+
+    def resample(
+        self,
+        frequency: str,
+        aggregation: str = 'mean',
+        variables: Optional[List[str]] = None,
+        start: Optional[Any] = None,
+        end: Optional[Any] = None
+    ) -> Dict[str, np.ndarray]:
+        """
+        Aggregate variables over hourly, daily, monthly or annual periods.
+
+        The index is sorted, so periods are contiguous runs and each variable
+        is reduced with one ``reduceat`` pass. Missing values are ignored and
+        periods with no values are NaN.
+        """
+        data = self.read(variables, start, end)
+        dates = data.pop("dates")
+        if not len(dates):
+            return {"dates": dates, **data}
+
+        periods = dates.astype(f"datetime64[{RESAMPLE_UNITS[frequency]}]")
+        starts = np.flatnonzero(np.r_[True, periods[1:] != periods[:-1]])
+        resampled = {"dates": periods[starts]}
+
+        for variable, values in data.items():
+            valid = ~np.isnan(values)
+            counts = np.add.reduceat(valid.astype(np.int64), starts)
+            if aggregation in ('mean', 'sum'):
+                totals = np.add.reduceat(np.where(valid, values, 0.0), starts)
+                result = totals / np.where(counts, counts, 1) if aggregation == 'mean' else totals
+            elif aggregation == 'min':
+                result = np.minimum.reduceat(np.where(valid, values, np.inf), starts)
+            else:
+                result = np.maximum.reduceat(np.where(valid, values, -np.inf), starts)
+            resampled[variable] = np.where(counts > 0, result, np.nan)
+
+        return resampled
+
@@ -0,0 +1,361 @@
+from sqlalchemy.orm import Session
+from sqlalchemy import and_
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
+from uuid import UUID
+from datetime import datetime, timedelta
+import asyncio
+import hashlib
+import logging
+import os
+import re
+import tempfile
+import uuid
+
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.core.storage import storage
+from app.models.models import UploadSession, UploadSessionStatus
+from app.services.ingestion_service import IngestionJobService
+
+logger = logging.getLogger(__name__)
+
+CONTENT_RANGE = re.compile(r"^bytes (\d+)-(\d+)/(\d+|\*)$")
+
+
+class UploadOffsetMismatch(ValueError):
+    """
+    A chunk does not start where the upload left off
+    """
+
+    def __init__(self, offset: int):
+        super().__init__(f"Upload continues at byte {offset}")
+        self.offset = offset
+
+
+def parse_content_range(header: Optional[str], total_size: int) -> Tuple[int, int]:
+    """
+    Parse a ``bytes <first>-<last>/<total>`` Content-Range into the chunk's
+    start and end (exclusive) offsets
+    """
+    match = CONTENT_RANGE.match((header or "").strip())
+    if not match:
+        raise ValueError("Content-Range must be 'bytes <first>-<last>/<total>'")
+
+    first, last, total = match.groups()
+    start, end = int(first), int(last) + 1
+    if total != "*" and int(total) != total_size:
+        raise ValueError(f"Content-Range total does not match the upload size of {total_size} bytes")
+    if end <= start or end > total_size:
+        raise ValueError("Content-Range is outside the upload")
+    if end - start > settings.UPLOAD_SESSION_MAX_CHUNK_BYTES:
+        raise ValueError(f"Chunks are limited to {settings.UPLOAD_SESSION_MAX_CHUNK_BYTES // (1024 * 1024)}MB")
+    return start, end
+
+
+def parts_prefix(session_id: UUID) -> str:
+    """
+    Storage key prefix of the received chunks of an upload
+    """
+    return f"{settings.UPLOAD_DIR}/.parts/{session_id}/"
+
+
+def part_key(session_id: UUID, start: int) -> str:
+    # Keyed by start offset; completion follows each part to the next
+    return f"{parts_prefix(session_id)}{start:020d}"
+
+
+def _write(path: str, data: bytes, mode: str = "ab"):
+    with open(path, mode) as f:
+        f.write(data)
+
+
+class UploadSessionService:
+    """
+    Resumable uploads, sent as byte ranges stored as parts of the upload.
+
+    A session's ``received_bytes`` is the committed offset. Each chunk is
+    spooled to its own file, verified for length and checksum and stored
+    under its start offset in the storage backend before the offset moves
+    past it, so a chunk cut off by a dropped connection or a restart is
+    simply resent, and chunks may reach any replica sharing the storage.
+    Only the offset update is serialized by a row lock on the session.
+    Completing the upload assembles the parts into a local spool file for
+    its ingestion job.
+    """
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    async def create_session(
+        self,
+        user_id: UUID,
+        filename: str,
+        file_type: str,
+        total_size: int,
+        sha256: Optional[str] = None,
+        description: Optional[str] = None,
+        basin_polygon: Optional[List[List[float]]] = None
+    ) -> UploadSession:
+        """
+        Start an upload with no parts received
+        """
+        await self.remove_expired()
+
+        session_id = uuid.uuid4()
+        session = UploadSession(
+            id=session_id,
+            filename=filename,
+            file_type=file_type,
+            total_size=total_size,
+            received_bytes=0,
+            sha256=sha256.lower() if sha256 else None,
+            spool_path=os.path.join(storage.staging_dir() or tempfile.gettempdir(), f".resumable-{session_id}"),
+            description=description,
+            basin_polygon=basin_polygon,
+            status=UploadSessionStatus.UPLOADING,
+            expires_at=self._expiry(),
+            owner_id=user_id
+        )
+        self.db.add(session)
+        self.db.commit()
+        self.db.refresh(session)
+        return session
+
+    async def get_session(self, session_id: UUID, user_id: UUID) -> Optional[UploadSession]:
+        """
+        Get a user's upload session
+        """
+        return self.db.query(UploadSession).filter(
+            and_(
+                UploadSession.id == session_id,
+                UploadSession.owner_id == user_id
+            )
+        ).first()
+
+    async def append_chunk(
+        self,
+        session_id: UUID,
+        user_id: UUID,
+        start: int,
+        end: int,
+        chunks: AsyncIterator[bytes],
+        chunk_sha256: Optional[str] = None
+    ) -> Optional[UploadSession]:
+        """
+        Append the bytes ``start`` to ``end`` of an upload, read from
+        ``chunks``, verifying their length and SHA-256 when given.
+
+        Raises UploadOffsetMismatch when ``start`` is not the committed
+        offset and ValueError when the chunk is rejected; either way the
+        committed offset is unchanged.
+        """
+        session = self.db.query(UploadSession).filter(
+            and_(
+                UploadSession.id == session_id,
+                UploadSession.owner_id == user_id
+            )
+        ).populate_existing().first()
+        if not session:
+            return None
+        self._check_offset(session, start)
+        # Nothing is locked while the chunk streams in
+        self.db.rollback()
+
+        part = tempfile.NamedTemporaryFile(
+            dir=storage.staging_dir(), prefix=f".resumable-{session_id}-", delete=False
+        )
+        part.close()
+        try:
+            digest = hashlib.sha256()
+            size = 0
+            buffer = bytearray()
+            async for chunk in chunks:
+                size += len(chunk)
+                if size > end - start:
+                    raise ValueError("Chunk is longer than its Content-Range")
+                digest.update(chunk)
+                buffer += chunk
+                if len(buffer) >= settings.UPLOAD_SPOOL_CHUNK_BYTES:
+                    await asyncio.to_thread(_write, part.name, bytes(buffer))
+                    buffer.clear()
+            await asyncio.to_thread(_write, part.name, bytes(buffer))
+            if size != end - start:
+                raise ValueError(f"Chunk has {size} bytes, Content-Range declares {end - start}")
+            if chunk_sha256 and digest.hexdigest() != chunk_sha256.lower():
+                raise ValueError("Chunk checksum does not match; resend it")
+
+            # A resent chunk replaces the part of an attempt that was stored
+            # but never committed
+            await storage.put_file(part.name, part_key(session_id, start))
+        finally:
+            if os.path.exists(part.name):
+                os.remove(part.name)
+
+        session = self.db.query(UploadSession).filter(
+            UploadSession.id == session_id
+        ).with_for_update().populate_existing().first()
+        if not session:
+            return None
+        try:
+            self._check_offset(session, start)
+        except ValueError:
+            self.db.rollback()
+            raise
+
+        session.received_bytes = end
+        session.expires_at = self._expiry()
+        self.db.commit()
+        self.db.refresh(session)
+        return session
+
+    async def complete(self, session_id: UUID, user_id: UUID) -> Tuple[Optional[UploadSession], Optional[Dict[str, Any]]]:
+        """
+        Verify a fully received upload and create its ingestion job.
+
+        Returns the session and the parameters of the job to run, or no
+        parameters when the upload was already completed. Raises ValueError
+        when bytes are missing or the file does not match its declared
+        SHA-256, in which case the upload starts over.
+        """
+        session = self.db.query(UploadSession).filter(
+            and_(
+                UploadSession.id == session_id,
+                UploadSession.owner_id == user_id
+            )
+        ).with_for_update().populate_existing().first()
+        if not session:
+            return None, None
+        if session.status == UploadSessionStatus.COMPLETED:
+            self.db.rollback()
+            return session, None
+        if session.received_bytes != session.total_size:
+            self.db.rollback()
+            raise ValueError(f"Upload is incomplete: {session.received_bytes} of {session.total_size} bytes received")
+
+        try:
+            content_hash = await self._assemble(session)
+        except FileNotFoundError:
+            content_hash = None
+        if content_hash is None or (session.sha256 and content_hash != session.sha256):
+            if os.path.exists(session.spool_path):
+                os.remove(session.spool_path)
+            await storage.delete_prefix(parts_prefix(session.id))
+            session.received_bytes = 0
+            self.db.commit()
+            if content_hash is None:
+                raise ValueError("Received chunks are missing; the upload must be restarted")
+            raise ValueError("File checksum does not match; the upload must be restarted")
+        await storage.delete_prefix(parts_prefix(session.id))
+
+        session.status = UploadSessionStatus.COMPLETED
+        job = await IngestionJobService(self.db).create_job(
+            user_id, session.filename, session.file_type, session.total_size, session.spool_path
+        )
+        session.job_id = job.id
+        self.db.commit()
+        self.db.refresh(session)
+
+        return session, {
+            "job_id": job.id,
+            "user_id": user_id,
+            "filename": session.filename,
+            "file_type": session.file_type,
+            "spool_path": session.spool_path,
+            "file_size": session.total_size,
+            "description": session.description,
+            "content_hash": content_hash,
+            "basin_polygon": session.basin_polygon
+        }
+
+    async def cancel(self, session_id: UUID, user_id: UUID) -> bool:
+        """
+        Abandon an upload and remove what was received
+        """
+        session = await self.get_session(session_id, user_id)
+        if not session:
+            return False
+
+        await self._discard(session)
+        self.db.commit()
+        return True
+
+    async def remove_expired(self) -> int:
+        """
+        Discard the expired uploads of every user along with their parts.
+        Sessions locked by a concurrent sweep are left to it.
+        """
+        expired = self.db.query(UploadSession).filter(
+            UploadSession.expires_at < datetime.utcnow()
+        ).with_for_update(skip_locked=True).all()
+        for session in expired:
+            await self._discard(session)
+        if expired:
+            self.db.commit()
+            logger.info(f"Removed {len(expired)} expired uploads")
+        return len(expired)
+
+    async def _assemble(self, session: UploadSession) -> Optional[str]:
+        """
+        Join the parts of a received upload into its spool file, returning
+        the file's SHA-256, or None when the parts do not add up to the
+        upload. Raises FileNotFoundError when a part is missing.
+        """
+        await asyncio.to_thread(_write, session.spool_path, b"", "wb")
+        digest = hashlib.sha256()
+        offset = 0
+        while offset < session.total_size:
+            start = offset
+            async for block in storage.iter_chunks(part_key(session.id, start), settings.UPLOAD_SPOOL_CHUNK_BYTES):
+                digest.update(block)
+                offset += len(block)
+                await asyncio.to_thread(_write, session.spool_path, block)
+            if offset == start:
+                return None
+        return digest.hexdigest() if offset == session.total_size else None
+
+    async def _discard(self, session: UploadSession):
+        # A completed upload's spool file belongs to its ingestion job
+        if session.status == UploadSessionStatus.UPLOADING:
+            await storage.delete_prefix(parts_prefix(session.id))
+            if os.path.exists(session.spool_path):
+                os.remove(session.spool_path)
+        self.db.delete(session)
+
+    @staticmethod
+    def _check_offset(session: UploadSession, start: int):
+        if session.status != UploadSessionStatus.UPLOADING:
+            raise ValueError("Upload is already complete")
+        if start != session.received_bytes:
+            raise UploadOffsetMismatch(session.received_bytes)
+
+    @staticmethod
+    def _expiry() -> datetime:
+        return datetime.utcnow() + timedelta(hours=settings.UPLOAD_SESSION_TTL_HOURS)
+
+    @staticmethod
+    def session_summary(session: UploadSession) -> Dict[str, Any]:
+        return {
+            "upload_id": str(session.id),
+            "filename": session.filename,
+            "file_type": session.file_type,
+            "total_size": session.total_size,
+            "offset": session.received_bytes,
+            "status": session.status.value,
+            "job_id": str(session.job_id) if session.job_id else None,
+            "chunk_size": settings.UPLOAD_SESSION_CHUNK_BYTES,
+            "expires_at": session.expires_at.isoformat() if session.expires_at else None
+        }
+
+
+async def remove_expired_uploads():
+    """
+    Discard uploads that expired while the server was down
+    """
+    db = SessionLocal()
+    try:
+        await UploadSessionService(db).remove_expired()
+    except Exception as e:
+        logger.error(f"Could not remove expired uploads: {str(e)}")
+        db.rollback()
+    finally:
+        db.close()
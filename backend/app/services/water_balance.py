@@ -0,0 +1,194 @@
+"""
+Water-balance accounting for daily simulation results.
+
+Closure residual per day is P - ET - Q - dS, where dS is the change in soil and
+groundwater storage. Residuals are aggregated per month and year and the run is
+checked against a closure tolerance. Every array is members x time so
+ensemble runs are accounted in one pass.
+"""
+from typing import Any, Dict, List, Optional, Tuple
+import numpy as np
+import pandas as pd
+
+# Units of ``soil_moisture``, declared under ``units`` in the result metadata
+SOIL_MOISTURE_FRACTION = 'fraction'
+SOIL_MOISTURE_MM = 'mm'
+
+
+def _stack(members: List[Dict[str, Any]], variable: str, length: int) -> Optional[np.ndarray]:
+    """
+    Stack a variable of every member into a members x time array, or None when absent
+    """
+    if not all(isinstance(member.get(variable), list) and member.get(variable) for member in members):
+        return None
+    stacked = np.full((len(members), length), np.nan)
+    for i, member in enumerate(members):
+        series = np.asarray([v if v is not None else np.nan for v in member[variable][:length]], dtype=np.float64)
+        stacked[i, :len(series)] = series
+    return stacked
+
+
+def _storage_change(storage: np.ndarray) -> np.ndarray:
+    """
+    Day-to-day change of a storage series; the first day has no change
+    """
+    change = np.zeros_like(storage)
+    change[:, 1:] = np.diff(storage, axis=1)
+    return change
+
+
+def soil_storage_mm(
+    soil_moisture: np.ndarray,
+    unit: Optional[str],
+    soil_depth_m: Optional[float]
+) -> Optional[np.ndarray]:
+    """
+    Convert soil moisture in its declared unit to stored water depth in mm.
+
+    Volumetric fractions need the soil depth. Series without a known unit, or
+    fractions without a depth, cannot be converted and None is returned.
+    """
+    if unit == SOIL_MOISTURE_MM:
+        return soil_moisture
+    if unit == SOIL_MOISTURE_FRACTION and soil_depth_m:
+        return soil_moisture * soil_depth_m * 1000.0
+    return None
+
+
+def soil_bucket(
+    infiltration: np.ndarray,
+    potential_evapotranspiration: np.ndarray,
+    initial_storage_mm: float = 100.0
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Route daily infiltration through a single soil store.
+
+    Evapotranspiration is limited to the water in the store, so the returned
+    actual evapotranspiration and end-of-day storage (mm) close the balance
+    with the inputs.
+    """
+    evapotranspiration = np.empty_like(infiltration, dtype=np.float64)
+    storage = np.empty_like(infiltration, dtype=np.float64)
+    stored = initial_storage_mm
+    for day, (inflow, demand) in enumerate(zip(infiltration, potential_evapotranspiration)):
+        stored += inflow
+        evapotranspiration[day] = min(demand, stored)
+        stored -= evapotranspiration[day]
+        storage[day] = stored
+    return evapotranspiration, storage
+
+
+def _aggregate(periods: np.ndarray, arrays: Dict[str, np.ndarray]) -> Dict[str, Any]:
+    """
+    Sum each members x time array over consecutive runs of equal period labels
+    """
+    starts = np.flatnonzero(np.r_[True, periods[1:] != periods[:-1]])
+    aggregated = {name: np.add.reduceat(np.nan_to_num(values), starts, axis=1) for name, values in arrays.items()}
+    aggregated["period"] = periods[starts]
+    return aggregated
+
+
+def _error_percent(residual: np.ndarray, precipitation: np.ndarray) -> np.ndarray:
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return np.where(precipitation > 0, 100.0 * residual / precipitation, 0.0)
+
+
+def compute_water_balance(
+    dates: List[str],
+    members: List[Dict[str, Any]],
+    soil_depth_m: Optional[float] = None,
+    tolerance_percent: float = 5.0,
+    soil_moisture_unit: Optional[str] = None
+) -> Optional[Dict[str, Any]]:
+    """
+    Account the water balance of daily results.
+
+    Storage change comes from ``soil_moisture`` in ``soil_moisture_unit``
+    (fractions are converted with the soil depth) and ``groundwater_storage``
+    when present. Runs without a storage series use
+    ``infiltration`` as the flux into storage. The run is within tolerance when
+    the closure error of the whole run, as a percentage of precipitation, does
+    not exceed ``tolerance_percent`` for any member.
+    """
+    length = len(dates)
+    precipitation = _stack(members, 'precipitation', length)
+    if precipitation is None or length == 0:
+        return None
+
+    zeros = np.zeros_like(precipitation)
+    evapotranspiration = _stack(members, 'evapotranspiration', length)
+    runoff = _stack(members, 'runoff', length)
+    evapotranspiration = zeros if evapotranspiration is None else evapotranspiration
+    runoff = zeros if runoff is None else runoff
+
+    soil_moisture = _stack(members, 'soil_moisture', length)
+    soil_storage = soil_storage_mm(soil_moisture, soil_moisture_unit, soil_depth_m) if soil_moisture is not None else None
+    infiltration = _stack(members, 'infiltration', length)
+    if soil_storage is not None:
+        storage_source = 'soil_moisture'
+        soil_change = _storage_change(soil_storage)
+    elif infiltration is not None:
+        storage_source = 'infiltration'
+        soil_change = infiltration
+    else:
+        storage_source = None
+        soil_change = zeros
+
+    groundwater_storage = _stack(members, 'groundwater_storage', length)
+    groundwater_change = zeros if groundwater_storage is None else _storage_change(groundwater_storage)
+
+    storage_change = np.nan_to_num(soil_change) + np.nan_to_num(groundwater_change)
+    residual = np.nan_to_num(precipitation) - np.nan_to_num(evapotranspiration) - np.nan_to_num(runoff) - storage_change
+
+    components = {
+        "precipitation": precipitation,
+        "evapotranspiration": evapotranspiration,
+        "runoff": runoff,
+        "storage_change": storage_change,
+        "residual": residual
+    }
+    index = pd.to_datetime(list(dates), format='ISO8601')
+    monthly = _aggregate(index.strftime('%Y-%m').to_numpy(), components)
+    annual = _aggregate(index.year.to_numpy(), components)
+    totals = {name: np.nansum(values, axis=1) for name, values in components.items()}
+
+    run_error = _error_percent(totals["residual"], totals["precipitation"])
+    monthly_error = _error_percent(monthly["residual"], monthly["precipitation"])
+    annual_error = _error_percent(annual["residual"], annual["precipitation"])
+
+    ensemble = len(members) > 1
+
+    def squeeze(values: np.ndarray, decimals: int = 3) -> Any:
+        values = np.round(values, decimals)
+        return values.tolist() if ensemble else values[0].tolist()
+
+    return {
+        "storage_source": storage_source,
+        "ensemble": ensemble,
+        "input_precipitation": squeeze(totals["precipitation"], 2),
+        "output_evapotranspiration": squeeze(totals["evapotranspiration"], 2),
+        "output_runoff": squeeze(totals["runoff"], 2),
+        "change_soil_storage": squeeze(np.nansum(np.nan_to_num(soil_change), axis=1), 2),
+        "change_groundwater_storage": squeeze(np.nansum(groundwater_change, axis=1), 2),
+        "balance_error": squeeze(totals["residual"], 2),
+        "balance_error_percent": squeeze(run_error, 3),
+        "tolerance_percent": tolerance_percent,
+        "within_tolerance": bool(np.all(np.abs(run_error) <= tolerance_percent)),
+        "months_over_tolerance": int(np.any(np.abs(monthly_error) > tolerance_percent, axis=0).sum()),
+        "years_over_tolerance": int(np.any(np.abs(annual_error) > tolerance_percent, axis=0).sum()),
+        "daily": {
+            "dates": list(dates),
+            "storage_change": squeeze(storage_change),
+            "residual": squeeze(residual)
+        },
+        "monthly": {
+            "months": monthly["period"].tolist(),
+            **{name: squeeze(monthly[name]) for name in components},
+            "error_percent": squeeze(monthly_error)
+        },
+        "annual": {
+            "years": annual["period"].tolist(),
+            **{name: squeeze(annual[name]) for name in components},
+            "error_percent": squeeze(annual_error)
+        }
+    }
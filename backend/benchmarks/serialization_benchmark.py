@@ -0,0 +1,66 @@
+"""
+Benchmark JSON serialization of a 10-year daily results payload.
+
+Compares FastAPI's default path (jsonable_encoder + json.dumps over Python
+lists) with the NumPy-native encoder used by FastJSONResponse.
+
+Run from the backend directory:
+    python -m benchmarks.serialization_benchmark
+"""
+import json
+import timeit
+
+import numpy as np
+import pandas as pd
+from fastapi.encoders import jsonable_encoder
+
+from app.core.serialization import dumps, round_floats, ORJSON_AVAILABLE
+
+YEARS = 10
+VARIABLES = ["precipitation", "runoff", "evapotranspiration", "infiltration", "temperature", "soil_moisture"]
+REPEAT = 5
+NUMBER = 3
+
+
+def build_payload():
+    dates = pd.date_range("2015-01-01", periods=365 * YEARS, freq="D")
+    rng = np.random.default_rng(42)
+    data = {"dates": dates.strftime("%Y-%m-%d").tolist()}
+    for variable in VARIABLES:
+        data[variable] = rng.gamma(2, 3, len(dates)).tolist()
+    return [{"id": "benchmark", "result_type": "daily_results", "data": data, "metadata": {}}]
+
+
+def default_path(payload, precision):
+    # Per-element rounding followed by FastAPI's encoder, as before FastJSONResponse
+    rounded = [
+        {**result, "data": {
+            key: [round(v, precision) for v in values] if key != "dates" else values
+            for key, values in result["data"].items()
+        }}
+        for result in payload
+    ]
+    return json.dumps(jsonable_encoder(rounded)).encode("utf-8")
+
+
+def fast_path(payload, precision):
+    return dumps(payload, precision=precision)
+
+
+def main():
+    payload = build_payload()
+    precision = 4
+
+    print(f"Payload: {YEARS} years x {len(VARIABLES)} variables, orjson available: {ORJSON_AVAILABLE}")
+    for name, func in [("jsonable_encoder + json", default_path), ("numpy-native dumps", fast_path)]:
+        timings = timeit.repeat(lambda: func(payload, precision), repeat=REPEAT, number=NUMBER)
+        size = len(func(payload, precision))
+        print(f"{name:>26}: {min(timings) / NUMBER * 1000:8.1f} ms  ({size / 1024:.0f} KiB)")
+
+    rounded = round_floats(payload, precision)
+    timings = timeit.repeat(lambda: dumps(rounded), repeat=REPEAT, number=NUMBER)
+    print(f"{'encode pre-rounded arrays':>26}: {min(timings) / NUMBER * 1000:8.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,6 +1,8 @@
 import pytest
 from fastapi.testclient import TestClient
 from sqlalchemy import create_engine
+from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.ext.compiler import compiles
 from sqlalchemy.orm import sessionmaker
 from sqlalchemy.pool import StaticPool
 
@@ -20,6 +22,12 @@ engine = create_engine(
 TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
 
+@compiles(UUID, "sqlite")
+def _compile_uuid_for_sqlite(type_, compiler, **kw):
+    # The models use PostgreSQL UUID columns; SQLite stores them as text
+    return "CHAR(36)"
+
+
 def override_get_db():
     try:
         db = TestingSessionLocal()
@@ -37,6 +45,24 @@ def client():
     Base.metadata.drop_all(bind=engine)
 
 
+@pytest.fixture
+def db():
+    """A session on a fresh test database, for service-level tests"""
+    User.metadata.create_all(bind=engine)
+    session = TestingSessionLocal()
+    yield session
+    session.close()
+    User.metadata.drop_all(bind=engine)
+
+
+@pytest.fixture
+def user(db):
+    user = User(email="owner@example.com", username="owner", hashed_password="x")
+    db.add(user)
+    db.commit()
+    return user
+
+
 @pytest.fixture
 def test_user():
     return {
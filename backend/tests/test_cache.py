@@ -0,0 +1,88 @@
+from uuid import uuid4
+
+import fakeredis
+
+from app.core.cache import ResultsCache, cache_key
+
+
+def test_lru_evicts_oldest_entries_past_byte_budget():
+    """Test the in-process tier stays within its byte budget"""
+    cache = ResultsCache(max_bytes=100)
+    simulation_id = uuid4()
+    
+    cache.set(cache_key("results", simulation_id, "a"), "x" * 40, simulation_id)
+    cache.set(cache_key("results", simulation_id, "b"), "y" * 40, simulation_id)
+    cache.set(cache_key("results", simulation_id, "c"), "z" * 40, simulation_id)
+    
+    stats = cache.stats()
+    assert stats["bytes"] <= 100
+    assert stats["evictions"] == 1
+    assert cache.get(cache_key("results", simulation_id, "a")) is None
+    assert cache.get(cache_key("results", simulation_id, "c")) == "z" * 40
+
+
+def test_invalidate_drops_all_entries_for_simulation():
+    """Test invalidation only affects the given simulation"""
+    cache = ResultsCache(max_bytes=1024)
+    first, second = uuid4(), uuid4()
+    
+    cache.set(cache_key("results", first, None), [1, 2, 3], first)
+    cache.set(cache_key("summary", first), {"name": "first"}, first)
+    cache.set(cache_key("summary", second), {"name": "second"}, second)
+    
+    cache.invalidate(first)
+    
+    assert cache.get(cache_key("results", first, None)) is None
+    assert cache.get(cache_key("summary", first)) is None
+    assert cache.get(cache_key("summary", second)) == {"name": "second"}
+
+
+def test_redis_tier_is_shared_between_instances():
+    """Test a second process can read and invalidate entries through Redis"""
+    server = fakeredis.FakeServer()
+    writer = ResultsCache(max_bytes=1024, redis_client=fakeredis.FakeRedis(server=server))
+    reader = ResultsCache(max_bytes=1024, redis_client=fakeredis.FakeRedis(server=server))
+    simulation_id = uuid4()
+    key = cache_key("summary", simulation_id)
+    
+    writer.set(key, {"total_runoff": 175}, simulation_id)
+    
+    assert reader.get(key) == {"total_runoff": 175}
+    assert reader.stats()["redis_hits"] == 1
+    
+    # The reader's in-process copy is dropped once the writer invalidates
+    assert reader.get(key) == {"total_runoff": 175}
+    assert reader.stats()["memory_hits"] == 1
+    writer.invalidate(simulation_id)
+    assert reader.get(key) is None
+    assert reader.stats()["stale_drops"] == 1
+    
+    writer.set(key, {"total_runoff": 180}, simulation_id)
+    assert reader.get(key) == {"total_runoff": 180}
+
+
+def test_in_process_entries_expire():
+    """Test in-process entries are not served past their TTL"""
+    cache = ResultsCache(max_bytes=1024, ttl=0)
+    simulation_id = uuid4()
+    key = cache_key("summary", simulation_id)
+    
+    cache.set(key, {"ok": True}, simulation_id)
+    assert cache.get(key) is None
+    assert cache.stats()["entries"] == 0
+
+
+def test_hit_rate_metrics():
+    """Test hit rate accounts for hits and misses"""
+    cache = ResultsCache(max_bytes=1024)
+    simulation_id = uuid4()
+    key = cache_key("summary", simulation_id)
+    
+    assert cache.get(key) is None
+    cache.set(key, {"ok": True}, simulation_id)
+    assert cache.get(key) == {"ok": True}
+    
+    stats = cache.stats()
+    assert stats["memory_hits"] == 1
+    assert stats["misses"] == 1
+    assert stats["hit_rate"] == 0.5
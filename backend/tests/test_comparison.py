@@ -0,0 +1,104 @@
+from uuid import uuid4
+
+import numpy as np
+import pytest
+
+from app.services.comparison_service import ResultsComparisonService
+
+
+def _runs():
+    baseline, scenario = uuid4(), uuid4()
+    series = {
+        baseline: {
+            "dates": ["2023-01-01", "2023-01-02", "2023-01-03", "2023-01-04"],
+            "runoff": [1.0, 2.0, 3.0, 4.0]
+        },
+        scenario: {
+            # Starts a day later, misses a value and repeats a date
+            "dates": ["2023-01-02", "2023-01-03", "2023-01-04", "2023-01-05", "2023-01-05"],
+            "runoff": [3.0, None, 6.0, 7.0, 8.0]
+        }
+    }
+    names = {baseline: "Baseline", scenario: "Scenario"}
+    return baseline, scenario, series, names
+
+
+def test_compare_aligns_on_common_dates():
+    """Test an inner join keeps dates both runs cover, ordered with the baseline first"""
+    baseline, scenario, series, names = _runs()
+    comparison = ResultsComparisonService(db=None).compare(
+        names, series, [scenario, baseline], ["runoff"], "daily_results", baseline
+    )
+    
+    assert [run["name"] for run in comparison["simulations"]] == ["Baseline", "Scenario"]
+    assert comparison["dates"] == ["2023-01-02", "2023-01-03", "2023-01-04"]
+    
+    runoff = comparison["variables"]["runoff"]
+    np.testing.assert_array_equal(runoff["values"][str(scenario)], [3.0, np.nan, 6.0])
+    np.testing.assert_array_equal(runoff["difference"][str(scenario)], [1.0, np.nan, 2.0])
+    np.testing.assert_array_equal(runoff["ratio"][str(scenario)], [1.5, np.nan, 1.5])
+
+
+def test_compare_outer_join_keeps_last_of_repeated_dates():
+    """Test an outer join covers every date and repeated dates keep the last value"""
+    baseline, scenario, series, names = _runs()
+    comparison = ResultsComparisonService(db=None).compare(
+        names, series, [baseline, scenario], ["runoff"], "daily_results", baseline, join="outer"
+    )
+    
+    assert comparison["dates"][0] == "2023-01-01" and comparison["dates"][-1] == "2023-01-05"
+    values = comparison["variables"]["runoff"]["values"]
+    np.testing.assert_array_equal(values[str(baseline)], [1.0, 2.0, 3.0, 4.0, np.nan])
+    np.testing.assert_array_equal(values[str(scenario)], [np.nan, 3.0, np.nan, 6.0, 8.0])
+
+
+def test_compare_statistics_use_paired_dates():
+    """Test summary statistics skip gaps and error metrics pair runs by date"""
+    baseline, scenario, series, names = _runs()
+    comparison = ResultsComparisonService(db=None).compare(
+        names, series, [baseline, scenario], ["runoff"], "daily_results", baseline
+    )
+    statistics = comparison["variables"]["runoff"]["statistics"]
+    
+    base = statistics[str(baseline)]
+    assert base["count"] == 3
+    assert base["mean"] == pytest.approx(3.0)
+    assert base["rmse"] == 0.0
+    assert base["correlation"] == pytest.approx(1.0)
+    
+    run = statistics[str(scenario)]
+    assert run["count"] == 2
+    assert run["total"] == pytest.approx(9.0)
+    assert (run["min"], run["max"]) == (3.0, 6.0)
+    # Paired on 2023-01-02 and 2023-01-04: errors of 1 and 2 against 2 and 4
+    assert run["bias"] == pytest.approx(1.5)
+    assert run["rmse"] == pytest.approx(np.sqrt(2.5))
+    assert run["percent_bias"] == pytest.approx(50.0)
+    assert run["correlation"] == pytest.approx(1.0)
+
+
+def test_compare_statistics_without_overlap_are_null():
+    """Test runs sharing no dates get no error metrics instead of NaN"""
+    baseline, scenario = uuid4(), uuid4()
+    series = {
+        baseline: {"dates": ["2023-01-01"], "runoff": [1.0]},
+        scenario: {"dates": ["2023-01-02"], "runoff": [2.0]}
+    }
+    comparison = ResultsComparisonService(db=None).compare(
+        {}, series, [baseline, scenario], ["runoff"], "daily_results", baseline, join="outer"
+    )
+    run = comparison["variables"]["runoff"]["statistics"][str(scenario)]
+    
+    assert run["mean"] == 2.0
+    assert run["bias"] is None and run["rmse"] is None and run["correlation"] is None
+
+
+def test_compare_ignores_repeated_variables():
+    """Test a variable asked for twice is compared once"""
+    baseline, scenario, series, names = _runs()
+    comparison = ResultsComparisonService(db=None).compare(
+        names, series, [baseline, scenario], ["runoff", "runoff"], "daily_results", baseline
+    )
+    
+    assert list(comparison["variables"]) == ["runoff"]
+    np.testing.assert_array_equal(comparison["variables"]["runoff"]["difference"][str(scenario)], [1.0, np.nan, 2.0])
@@ -0,0 +1,188 @@
+from datetime import datetime
+import asyncio
+import hashlib
+import io
+import os
+
+import pandas as pd
+import pytest
+from fastapi import UploadFile
+from sqlalchemy.orm import sessionmaker
+
+from app.core.config import settings
+from app.core.storage import LocalStorageBackend
+from app.models.models import ImportedDataset
+from app.services import data_import_service, ingestion_service
+from app.services.ingestion_service import IngestionJobService, run_ingestion_jobs
+from app.services.data_import_service import (
+    DataImportService,
+    _ColumnarWriter,
+    iter_csv_chunks,
+    spool_to_file
+)
+from app.services.data_profiler import DataProfiler
+
+
+def test_csv_chunks_widen_integer_columns(tmp_path, monkeypatch):
+    """Test decimals after an all-integer first block still parse"""
+    monkeypatch.setattr(settings, "IMPORT_CHUNK_BYTES", 256)
+    monkeypatch.setattr(settings, "IMPORT_CHUNK_ROWS", 20)
+    path = tmp_path / "met.csv"
+    rows = [f"2023-01-{day % 28 + 1:02d},{day}" for day in range(100)] + ["2023-02-01,2.5", "2023-02-02,"]
+    path.write_text("date,precipitation_mm\n" + "\n".join(rows) + "\n")
+    
+    chunks = list(iter_csv_chunks(str(path)))
+    data = pd.concat(chunks)
+    
+    assert len(chunks) > 1
+    assert len(data) == 102
+    assert data["precipitation_mm"].iloc[-2] == 2.5
+    assert data["precipitation_mm"].isna().sum() == 1
+
+
+def test_csv_chunks_read_late_text_values(tmp_path, monkeypatch):
+    """Test a text marker after a numeric first block does not fail the file"""
+    monkeypatch.setattr(settings, "IMPORT_CHUNK_BYTES", 256)
+    path = tmp_path / "met.csv"
+    rows = [f"2023-01-{day % 28 + 1:02d},{day}.5,{day}" for day in range(101)] + ["2023-02-01,missing,7"]
+    path.write_text("date,precipitation_mm,temperature_c\n" + "\n".join(rows) + "\n")
+    
+    chunks = list(iter_csv_chunks(str(path)))
+    data = pd.concat(chunks)
+    
+    assert len(chunks) > 1
+    assert len(data) == 102
+    assert data["precipitation_mm"].iloc[0] == 0.5
+    assert data["precipitation_mm"].iloc[-1] == "missing"
+    assert data["temperature_c"].iloc[-1] == 7
+
+
+def test_csv_chunks_reject_non_utf8(tmp_path):
+    """Test undecodable files raise the same error as with pandas"""
+    path = tmp_path / "met.csv"
+    path.write_bytes("date,station\n2023-01-01,São Paulo\n".encode("latin-1"))
+    
+    with pytest.raises(UnicodeDecodeError):
+        list(iter_csv_chunks(str(path)))
+
+
+def test_dataset_frame_reads_columnar_copy_by_date_range(tmp_path, monkeypatch):
+    """Test range reads come from the Parquet copy with parsed dates"""
+    monkeypatch.chdir(tmp_path)
+    csv_path = tmp_path / "met.csv"
+    pd.DataFrame({
+        "date": pd.date_range("2020-01-01", periods=60).strftime("%Y-%m-%d"),
+        "precipitation_mm": range(60)
+    }).to_csv(csv_path, index=False)
+    
+    profile = DataProfiler()
+    writer = _ColumnarWriter(f"{csv_path}.parquet")
+    for chunk in iter_csv_chunks(str(csv_path)):
+        writer.write(chunk, "date", profile.update(chunk))
+    assert writer.close()
+    
+    dataset = ImportedDataset(
+        file_path=str(csv_path),
+        columnar_path=f"{csv_path}.parquet",
+        column_mapping={"date": "date", "precipitation_mm": "precipitation"}
+    )
+    frame = DataImportService(db=None).load_dataset_frame(
+        dataset,
+        columns=["precipitation_mm"],
+        start=datetime(2020, 2, 1),
+        end=datetime(2020, 2, 5)
+    )
+    
+    assert pd.api.types.is_datetime64_any_dtype(frame["date"])
+    assert frame["precipitation_mm"].tolist() == [31, 32, 33, 34, 35]
+
+
+def test_spool_hashes_upload_while_streaming(tmp_path, monkeypatch):
+    """Test the spool digest matches the uploaded bytes and oversize uploads are removed"""
+    monkeypatch.setattr(settings, "UPLOAD_SPOOL_CHUNK_BYTES", 1000)
+    content = ("date,precipitation_mm\n" + "2023-01-01,1.5\n" * 500).encode()
+    
+    path, size, content_hash = asyncio.run(
+        spool_to_file(UploadFile(file=io.BytesIO(content)), str(tmp_path), max_bytes=len(content))
+    )
+    
+    assert size == len(content)
+    assert content_hash == hashlib.sha256(content).hexdigest()
+    with open(path, "rb") as spooled:
+        assert spooled.read() == content
+    
+    os.remove(path)
+    with pytest.raises(ValueError):
+        asyncio.run(spool_to_file(UploadFile(file=io.BytesIO(content)), str(tmp_path), max_bytes=100))
+    assert os.listdir(tmp_path) == []
+
+
+def test_concurrent_uploads_of_one_name_keep_their_own_files(db, user, tmp_path, monkeypatch):
+    """Test files of one upload sharing a name are ingested in parallel to distinct files"""
+    storage = LocalStorageBackend(str(tmp_path / "storage"))
+    monkeypatch.setattr(data_import_service, "storage", storage)
+    monkeypatch.setattr(ingestion_service, "SessionLocal", sessionmaker(bind=db.get_bind()))
+
+    contents = [
+        ("date,precipitation\n" + "".join(f"2020-01-{day:02d},{station}.5\n" for day in range(1, 11))).encode()
+        for station in range(3)
+    ]
+    jobs = []
+    for content in contents:
+        spool_path, size, content_hash = asyncio.run(
+            spool_to_file(UploadFile(file=io.BytesIO(content)), storage.staging_dir(), len(content))
+        )
+        job = asyncio.run(IngestionJobService(db).create_job(user.id, "met.csv", "meteorological", size, spool_path))
+        jobs.append({
+            "job_id": job.id,
+            "user_id": user.id,
+            "filename": "met.csv",
+            "file_type": "meteorological",
+            "spool_path": spool_path,
+            "file_size": size,
+            "content_hash": content_hash
+        })
+
+    asyncio.run(run_ingestion_jobs(jobs))
+
+    db.expire_all()
+    datasets = db.query(ImportedDataset).filter(ImportedDataset.owner_id == user.id).all()
+    assert len(datasets) == 3
+    assert len({dataset.file_path for dataset in datasets}) == 3
+    assert {asyncio.run(storage.get_bytes(dataset.file_path)) for dataset in datasets} == set(contents)
+
+
+def test_missing_preview_is_backfilled_once(db, user, tmp_path, monkeypatch):
+    """Test a dataset stored without a preview reads it once and keeps it"""
+    storage = LocalStorageBackend(str(tmp_path / "storage"))
+    monkeypatch.setattr(data_import_service, "storage", storage)
+    rows = pd.DataFrame({
+        "date": pd.date_range("2020-01-01", periods=30).strftime("%Y-%m-%d"),
+        "precipitation_mm": range(30)
+    })
+    asyncio.run(storage.put_bytes("uploads/met.csv", rows.to_csv(index=False).encode()))
+    
+    updated_at = datetime(2023, 6, 1)
+    dataset = ImportedDataset(
+        filename="met.csv", original_filename="met.csv", file_type="meteorological",
+        file_path="uploads/met.csv", file_size=100, owner_id=user.id,
+        column_mapping={"date": "date"}, preview_data=None, updated_at=updated_at
+    )
+    db.add(dataset)
+    db.commit()
+    
+    service = DataImportService(db)
+    reads = []
+    load_dataset_frame = service.load_dataset_frame
+    monkeypatch.setattr(service, "load_dataset_frame", lambda *a, **kw: reads.append(kw) or load_dataset_frame(*a, **kw))
+    
+    first = asyncio.run(service.get_dataset_details(dataset.id, user.id))
+    second = asyncio.run(service.get_dataset_details(dataset.id, user.id))
+    
+    assert reads == [{"limit": data_import_service.PREVIEW_ROWS}]
+    assert first["preview_data"] == second["preview_data"]
+    assert len(first["preview_data"]) == data_import_service.PREVIEW_ROWS
+    assert [row["precipitation_mm"] for row in first["preview_data"]] == list(range(data_import_service.PREVIEW_ROWS))
+    db.refresh(dataset)
+    assert dataset.preview_data == first["preview_data"]
+    assert dataset.updated_at == updated_at
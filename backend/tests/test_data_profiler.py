@@ -0,0 +1,72 @@
+import numpy as np
+import pandas as pd
+
+from app.services.data_profiler import DataProfiler, DistinctSketch
+
+
+def _frame(rows: int = 400) -> pd.DataFrame:
+    rng = np.random.default_rng(7)
+    precipitation = rng.gamma(0.8, 4.0, rows).round(1)
+    precipitation[::10] = np.nan
+    return pd.DataFrame({
+        "date": pd.date_range("2020-01-01", periods=rows).strftime("%Y-%m-%d"),
+        "precipitation_mm": precipitation,
+        "station": np.where(np.arange(rows) % 2, "A", "B")
+    })
+
+
+def _profile(df: pd.DataFrame, chunk_rows: int) -> DataProfiler:
+    profile = DataProfiler()
+    for start in range(0, len(df), chunk_rows):
+        profile.update(df.iloc[start:start + chunk_rows])
+    return profile
+
+
+def test_chunked_profile_matches_whole_frame():
+    """Test statistics accumulated over chunks equal those of the full frame"""
+    df = pd.concat([_frame(), _frame().iloc[:25]], ignore_index=True)
+    profile = _profile(df, chunk_rows=64)
+    
+    summary = profile.summary()
+    precipitation = summary["numeric_summary"]["precipitation_mm"]
+    assert summary["total_rows"] == len(df)
+    assert summary["date_range"]["start"].startswith("2020-01-01")
+    assert summary["date_range"]["total_days"] == 399
+    assert precipitation["count"] == df["precipitation_mm"].count()
+    assert np.isclose(precipitation["mean"], df["precipitation_mm"].mean())
+    assert precipitation["max"] == df["precipitation_mm"].max()
+    
+    quality = profile.quality_metrics()
+    assert quality["missing_values"] == df.isna().sum().to_dict()
+    assert quality["duplicate_rows"] == int(df.duplicated().sum())
+    assert quality["unique_values"] == df.nunique().to_dict()
+    assert len(profile.head) == 20
+
+
+def test_distinct_sketch_estimates_large_cardinality():
+    """Test the sketch is exact for small columns and close for large ones"""
+    hashes = pd.util.hash_pandas_object(pd.Series(np.arange(200000)), index=False).to_numpy()
+    
+    small = DistinctSketch(k=1024)
+    small.update(np.unique(hashes[:500]))
+    assert small.estimate() == 500
+    
+    large = DistinctSketch(k=1024)
+    for start in range(0, len(hashes), 25000):
+        large.update(np.unique(hashes[start:start + 25000]))
+    assert abs(large.estimate() - 200000) / 200000 < 0.1
+
+
+def test_validation_and_required_columns():
+    """Test file type rules and required columns come from the profile"""
+    profile = _profile(_frame(), chunk_rows=100)
+    
+    assert profile.validate("meteorological") == {
+        "is_valid": True,
+        "errors": [],
+        "warnings": ["Temperature column not found"]
+    }
+    assert profile.validate("observed_flow")["errors"] == ["Flow/discharge column not found"]
+    assert profile.missing_required(["date", "precipitation_mm", "temperature_c"]) == ["temperature_c"]
+    assert profile.column_mapping()["precipitation_mm"] == "precipitation"
+    assert profile.data_quality()["data_types"]["precipitation_mm"] == "float64"
@@ -0,0 +1,50 @@
+import numpy as np
+
+from app.services.event_detection import build_event_catalogue, detect_events, find_runs
+
+
+def test_find_runs_encodes_runs_per_member():
+    """Test runs never span members and touch both series ends"""
+    mask = np.array([
+        [True, True, False, True],
+        [False, True, True, True]
+    ])
+    
+    runs = find_runs(mask)
+    
+    assert runs["member"].tolist() == [0, 0, 1]
+    assert runs["start"].tolist() == [0, 3, 1]
+    assert runs["end"].tolist() == [2, 4, 4]
+
+
+def test_detect_events_reports_duration_volume_and_peak():
+    """Test flood events above a threshold and droughts below it"""
+    flows = np.array([0, 5, 6, 0, 0, 7, np.nan, 8, 1, 1, 1, 0])
+    
+    floods = detect_events(flows, 2)
+    assert floods["start"].tolist() == [1, 5, 7]
+    assert floods["duration"].tolist() == [2, 1, 1]
+    assert floods["volume"].tolist() == [7.0, 5.0, 6.0]
+    assert floods["peak"].tolist() == [6.0, 7.0, 8.0]
+    
+    droughts = detect_events(flows, 2, above=False, min_duration=3)
+    assert droughts["start"].tolist() == [8]
+    assert droughts["duration"].tolist() == [4]
+    assert droughts["peak"].tolist() == [0.0]
+
+
+def test_event_catalogue_batches_ensemble_members():
+    """Test every member is scanned against its own thresholds"""
+    flows = np.sin(np.linspace(0, 8 * np.pi, 365)) + 2
+    dates = [f"day-{i}" for i in range(365)]
+    members = [{"runoff": flows.tolist()}, {"runoff": (flows * 3).tolist()}]
+    
+    catalogue = build_event_catalogue(dates, members)
+    
+    floods = catalogue["flood"]
+    first = [i for i, member in enumerate(floods["member"]) if member == 0]
+    second = [i for i, member in enumerate(floods["member"]) if member == 1]
+    assert catalogue["ensemble"] is True
+    assert len(first) == len(second) == 4
+    assert [floods["start"][i] for i in first] == [floods["start"][i] for i in second]
+    assert catalogue["summary"]["flood_events"] == 4
@@ -0,0 +1,99 @@
+from datetime import datetime
+from types import SimpleNamespace
+import asyncio
+
+import numpy as np
+import pandas as pd
+from sqlalchemy.orm import sessionmaker
+
+from app.models.models import ImportedDataset, Simulation
+from app.services import forcing as forcing_module
+from app.services.data_import_service import DataImportService
+from app.services.forcing import build_forcing, climatology, linked_dataset_id, load_linked_forcing
+from app.services.timeseries_store import SeriesBuilder, TimeSeriesStore
+
+
+def test_build_forcing_from_series_store(tmp_path):
+    """Test hourly observations become daily model inputs over the window"""
+    hours = pd.date_range("2020-01-01", "2020-01-05 23:00", freq="h")
+    df = pd.DataFrame({
+        "date": hours.strftime("%Y-%m-%d %H:%M"),
+        "precip": 0.5,
+        "temp": np.repeat([10.0, 12.0, np.nan, 16.0, 18.0], 24)
+    })
+    builder = SeriesBuilder(str(tmp_path / "series"))
+    builder.append(df, "date", pd.to_datetime(df["date"]))
+    builder.close()
+
+    dataset = SimpleNamespace(
+        id="dataset",
+        column_mapping={"date": "date", "precip": "precipitation", "temp": "temperature"}
+    )
+    store = TimeSeriesStore(str(tmp_path / "series"))
+    forcing = build_forcing(dataset, store, pd.Timestamp("2020-01-02"), pd.Timestamp("2020-01-07"))
+
+    assert forcing["date"].dt.strftime("%Y-%m-%d").tolist()[0] == "2020-01-02"
+    assert len(forcing) == 6
+    # Accumulated inputs sum over the day
+    assert forcing["precipitation_mm"].tolist()[:4] == [12.0, 12.0, 12.0, 12.0]
+    # Days without data take the record's mean for their month, not a drought
+    assert forcing["precipitation_mm"].tolist()[4:] == [12.0, 12.0]
+    assert forcing["temperature_c"].tolist() == [12.0, 14.0, 16.0, 18.0, 14.0, 14.0]
+
+
+def test_climatology_prefers_same_day_of_year():
+    """Test expected values fall back from day of year to month to the whole record"""
+    days = pd.DatetimeIndex(["2020-01-01", "2020-01-02", "2020-02-01", "2020-06-01"])
+    record = pd.Series(
+        [1.0, 3.0, 10.0, 20.0],
+        index=pd.DatetimeIndex(["2018-01-01", "2019-01-01", "2019-01-20", "2019-02-10"])
+    )
+    
+    expected = climatology(record, days)
+    
+    # Same day of year, then the month's mean, then the overall mean
+    assert expected.tolist() == [2.0, 14.0 / 3, 20.0, 8.5]
+
+
+def test_linked_dataset_id():
+    """Test the linked meteorological dataset is read from a configuration"""
+    configuration = {"linked_datasets": {"meteorological": {"dataset_id": "abc"}}}
+    assert linked_dataset_id(configuration) == "abc"
+    assert linked_dataset_id(configuration, "observed_flow") is None
+    assert linked_dataset_id({}) is None
+
+
+def test_linked_dataset_drives_forcing(db, user, tmp_path, monkeypatch):
+    """Test a linked dataset is saved on the simulation and supplies its forcing"""
+    days = pd.date_range("2020-01-01", "2020-01-03", freq="D")
+    df = pd.DataFrame({"date": days.strftime("%Y-%m-%d"), "precip": [1.0, 2.0, 3.0]})
+    builder = SeriesBuilder(str(tmp_path / "series"))
+    builder.append(df, "date", pd.to_datetime(df["date"]))
+    builder.close()
+
+    dataset = ImportedDataset(
+        filename="met.csv", original_filename="met.csv", file_type="meteorological",
+        file_path="uploads/met.csv", series_path="series", file_size=100,
+        column_mapping={"date": "date", "precip": "precipitation"}, owner_id=user.id
+    )
+    simulation = Simulation(
+        name="linked", start_date=datetime(2020, 1, 1), end_date=datetime(2020, 1, 3),
+        configuration={"physical_config": {}}, owner_id=user.id
+    )
+    db.add_all([dataset, simulation])
+    db.commit()
+
+    assert asyncio.run(DataImportService(db).link_dataset_to_simulation(dataset.id, simulation.id, user.id))
+    db.expire_all()
+    configuration = db.get(Simulation, simulation.id).configuration
+    assert configuration["physical_config"] == {}
+    assert linked_dataset_id(configuration) == str(dataset.id)
+
+    async def processed_series_store(self, dataset, frequency="daily", method="linear", neighbour=None):
+        return TimeSeriesStore(str(tmp_path / "series"))
+
+    monkeypatch.setattr(forcing_module, "SessionLocal", sessionmaker(bind=db.get_bind()))
+    monkeypatch.setattr(DataImportService, "processed_series_store", processed_series_store)
+    forcing = asyncio.run(load_linked_forcing(configuration, datetime(2020, 1, 1), datetime(2020, 1, 3)))
+
+    assert forcing["precipitation_mm"].tolist() == [1.0, 2.0, 3.0]
@@ -0,0 +1,85 @@
+import numpy as np
+import pandas as pd
+from scipy.io import netcdf_file
+
+from app.core.config import settings
+from app.services.gridded_climate import basin_average, cf_column_mapping, polygon_mask
+
+
+def _write_grid(path, values, lats, lons, mask=None, units=None, extra=None):
+    nc = netcdf_file(str(path), "w", version=2)
+    nc.createDimension("time", None)
+    nc.createDimension("lat", len(lats))
+    nc.createDimension("lon", len(lons))
+    time = nc.createVariable("time", "d", ("time",))
+    time.units = "hours since 2000-01-01 00:00:00"
+    time[:] = np.arange(len(values)) * 24
+    nc.createVariable("lat", "d", ("lat",))[:] = lats
+    nc.createVariable("lon", "d", ("lon",))[:] = lons
+    pr = nc.createVariable("pr", "f", ("time", "lat", "lon"))
+    pr._FillValue = np.float32(-1)
+    pr[:] = values
+    if units:
+        pr.units = units
+    for name, (variable_units, variable_values) in (extra or {}).items():
+        variable = nc.createVariable(name, "f", ("time", "lat", "lon"))
+        variable.units = variable_units
+        variable[:] = variable_values
+    if mask is not None:
+        nc.createVariable("basin_mask", "b", ("lat", "lon"))[:] = mask
+    nc.close()
+
+
+def test_basin_average_weights_cells_by_area(tmp_path, monkeypatch):
+    """Test averages are cos(lat)-weighted over the mask, in time blocks"""
+    monkeypatch.setattr(settings, "GRIDDED_CHUNK_BYTES", 64)
+    lats = np.array([0.0, 60.0, 80.0])
+    lons = np.array([10.0, 11.0])
+    values = np.ones((5, 3, 2), dtype=np.float32)
+    values[:, 1, :] = 3.0
+    values[:, 2, :] = 100.0
+    values[2, 0, :] = -1
+    mask = np.array([[1, 1], [1, 1], [0, 0]])
+    _write_grid(tmp_path / "grid.nc", values, lats, lons, mask)
+
+    grid = basin_average(str(tmp_path / "grid.nc"), str(tmp_path / "series.csv"))
+    series = pd.read_csv(tmp_path / "series.csv")
+
+    assert grid["basin_cells"] == 4 and grid["mask_source"] == "file"
+    assert series["date"].tolist()[:2] == ["2000-01-01T00:00:00", "2000-01-02T00:00:00"]
+    # cos(0) = 1 and cos(60) = 0.5, so the 3.0 row counts half as much
+    np.testing.assert_allclose(series["pr"][0], (1.0 + 0.5 * 3.0) / 1.5)
+    # Missing cells drop out of the average
+    np.testing.assert_allclose(series["pr"][2], 3.0)
+
+
+def test_basin_average_converts_to_model_units(tmp_path):
+    """Test CF units are converted and only convertible variables are mapped"""
+    lats = np.array([0.0])
+    lons = np.array([10.0])
+    flux = np.full((3, 1, 1), 1e-4, dtype=np.float32)
+    _write_grid(
+        tmp_path / "grid.nc", flux, lats, lons, units="kg m-2 s-1",
+        extra={
+            "tas": ("K", np.full((3, 1, 1), 283.15, dtype=np.float32)),
+            "hurs": ("furlongs", np.full((3, 1, 1), 50.0, dtype=np.float32))
+        }
+    )
+
+    grid = basin_average(str(tmp_path / "grid.nc"), str(tmp_path / "series.csv"))
+    series = pd.read_csv(tmp_path / "series.csv")
+
+    # A daily flux becomes mm per day and kelvin becomes Celsius
+    np.testing.assert_allclose(series["pr"], 8.64, rtol=1e-5)
+    np.testing.assert_allclose(series["tas"], 10.0, atol=1e-4)
+    # Unknown units are left as they are and not mapped
+    np.testing.assert_allclose(series["hurs"], 50.0)
+    assert cf_column_mapping(grid["variables"]) == {"pr": "precipitation", "tas": "temperature"}
+
+
+def test_polygon_mask_on_0_360_grid():
+    """Test polygon vertices in -180..180 select cells of a 0..360 grid"""
+    lats = np.array([0.0, 5.0, 10.0])
+    lons = np.array([285.0, 290.0, 295.0])
+    mask = polygon_mask(lats, lons, [[-72, 2], [-68, 2], [-68, 8], [-72, 8]])
+    assert mask.tolist() == [[False, False, False], [False, True, False], [False, False, False]]
@@ -0,0 +1,39 @@
+import numpy as np
+import pandas as pd
+
+from app.services.hydro_statistics import flow_duration_curve, flow_indices, monthly_climatology
+
+
+def test_flow_duration_curve_matches_exceedance_percentiles():
+    """Test flows are the percentiles complementary to their exceedance probability"""
+    flows = np.arange(1, 101, dtype=float)
+    
+    curve = flow_duration_curve(flows, [90, 10, 50])
+    
+    assert curve["exceedance_percent"] == [10.0, 50.0, 90.0]
+    np.testing.assert_allclose(curve["flow"], np.percentile(flows, [90, 50, 10]))
+    assert np.all(np.diff(curve["flow"]) <= 0)
+
+
+def test_flow_indices_ignore_missing_values_and_batch_members():
+    """Test indices skip NaN days and reduce each ensemble member separately"""
+    flows = np.arange(1, 101, dtype=float)
+    flows[0] = np.nan
+    
+    indices = flow_indices(np.vstack([flows, flows * 2]))
+    
+    np.testing.assert_array_equal(indices["valid_days"], [99, 99])
+    np.testing.assert_allclose(indices["q50"][1], 2 * indices["q50"][0])
+    assert indices["q10"][0] > indices["q50"][0] > indices["q90"][0]
+
+
+def test_monthly_climatology_groups_by_calendar_month():
+    """Test statistics are computed per calendar month across years"""
+    dates = pd.date_range("2021-01-01", "2022-12-31", freq="D")
+    flows = dates.month.to_numpy().astype(float)
+    
+    climatology = monthly_climatology(dates.strftime("%Y-%m-%d").tolist(), flows)
+    
+    np.testing.assert_allclose(climatology["mean"], np.arange(1, 13))
+    np.testing.assert_allclose(climatology["std"], 0)
+    assert climatology["count"][1] == 56
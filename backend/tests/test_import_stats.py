@@ -0,0 +1,110 @@
+from datetime import datetime, timedelta
+
+from app.models.models import ImportedDataset, UserImportStats
+from app.services.import_stats import ImportStatsStore
+
+
+def _dataset(user, file_type="meteorological", size=1000, is_active=True, created_at=None):
+    return ImportedDataset(
+        filename="met.csv",
+        original_filename="met.csv",
+        file_type=file_type,
+        file_path="uploads/met.csv",
+        file_size=size,
+        is_active=is_active,
+        created_at=created_at or datetime.now(),
+        owner_id=user.id
+    )
+
+
+def _insert(db, dataset):
+    db.add(dataset)
+    db.flush()
+    ImportStatsStore(db).record(dataset, +1)
+    db.commit()
+    return dataset
+
+
+def _delete(db, dataset):
+    db.delete(dataset)
+    db.flush()
+    ImportStatsStore(db).record(dataset, -1)
+    db.commit()
+
+
+def _counters(db, user):
+    rows = db.query(UserImportStats).filter(UserImportStats.owner_id == user.id).all()
+    return {row.file_type: (row.dataset_count, row.active_count, row.total_bytes) for row in rows}
+
+
+def test_statistics_rebuild_counters_for_existing_datasets(db, user):
+    """Test datasets imported before counters existed are counted on first read"""
+    db.add_all([
+        _dataset(user, size=1000),
+        _dataset(user, size=3000, is_active=False, created_at=datetime.now() - timedelta(days=90)),
+        _dataset(user, file_type="observed_flow", size=2 * 1024 * 1024)
+    ])
+    db.commit()
+    
+    statistics = ImportStatsStore(db).statistics(user.id)
+    
+    assert statistics["total_datasets"] == 3
+    assert statistics["datasets_by_type"] == {"meteorological": 2, "observed_flow": 1}
+    assert statistics["active_datasets"] == 2
+    assert statistics["recent_uploads_30_days"] == 2
+    assert statistics["total_storage_bytes"] == 4000 + 2 * 1024 * 1024
+    assert _counters(db, user) == {
+        "meteorological": (2, 1, 4000),
+        "observed_flow": (1, 1, 2 * 1024 * 1024)
+    }
+
+
+def test_record_increments_and_decrements_counters(db, user):
+    """Test inserts and deletes adjust the counters of their file type"""
+    first = _insert(db, _dataset(user, size=1000))
+    assert _counters(db, user) == {"meteorological": (1, 1, 1000)}
+    
+    _insert(db, _dataset(user, size=500, is_active=False))
+    flow = _insert(db, _dataset(user, file_type="observed_flow", size=200))
+    assert _counters(db, user) == {
+        "meteorological": (2, 1, 1500),
+        "observed_flow": (1, 1, 200)
+    }
+    
+    _delete(db, first)
+    _delete(db, flow)
+    assert _counters(db, user) == {
+        "meteorological": (1, 0, 500),
+        "observed_flow": (0, 0, 0)
+    }
+    
+    statistics = ImportStatsStore(db).statistics(user.id)
+    assert statistics["datasets_by_type"] == {"meteorological": 1}
+    assert statistics["total_storage_bytes"] == 500
+
+
+def test_first_record_counts_earlier_datasets(db, user):
+    """Test the first recorded insert builds counters that include older datasets"""
+    db.add(_dataset(user, size=700))
+    db.commit()
+    
+    _insert(db, _dataset(user, size=300))
+    
+    assert _counters(db, user) == {"meteorological": (2, 2, 1000)}
+
+
+def test_record_adds_to_counts_of_other_transactions(db, user):
+    """Test a recorded dataset is added to its counter row, never overwriting it"""
+    _insert(db, _dataset(user, size=100))
+    # Datasets another transaction imported and counted, not visible here
+    db.add(UserImportStats(owner_id=user.id, file_type="observed_flow", dataset_count=3, active_count=3, total_bytes=300))
+    db.commit()
+
+    _insert(db, _dataset(user, file_type="observed_flow", size=50))
+    _insert(db, _dataset(user, file_type="groundwater", size=10))
+
+    assert _counters(db, user) == {
+        "meteorological": (1, 1, 100),
+        "observed_flow": (4, 4, 350),
+        "groundwater": (1, 1, 10)
+    }
@@ -0,0 +1,85 @@
+from datetime import datetime, timedelta
+import asyncio
+
+from app.core.config import settings
+from app.models.models import IngestionJob, IngestionStatus
+from app.services import ingestion_service
+from app.services.ingestion_service import INTERRUPTED_ERROR, IngestionJobService
+
+
+def _stage_statuses(summary):
+    return {stage["name"]: stage["status"] for stage in summary["stages"]}
+
+
+def test_job_runs_through_its_stages(db, user):
+    """Test a job goes from queued through each stage to completed"""
+    jobs = IngestionJobService(db)
+    job = asyncio.run(jobs.create_job(user.id, "met.csv", "meteorological", 100))
+    assert job.status == IngestionStatus.QUEUED
+    assert _stage_statuses(jobs.job_summary(job))["upload"] == "completed"
+
+    asyncio.run(jobs.update_stage(job.id, "storing", 0.5))
+    db.refresh(job)
+    summary = jobs.job_summary(job)
+    assert job.status == IngestionStatus.RUNNING and job.stage == "storing"
+    assert _stage_statuses(summary) == {
+        "upload": "completed", "processing": "completed", "storing": "running", "recording": "pending"
+    }
+    assert job.progress == 62.5
+
+    asyncio.run(jobs.finish_job(job.id, {"status": "success", "dataset_id": str(user.id)}))
+    db.refresh(job)
+    assert job.status == IngestionStatus.COMPLETED and job.progress == 100.0
+    # Recording never ran, so it is skipped rather than left pending
+    assert _stage_statuses(jobs.job_summary(job)) == {
+        "upload": "completed", "processing": "completed", "storing": "completed", "recording": "skipped"
+    }
+
+
+def test_failed_job_keeps_its_progress(db, user):
+    """Test a failure marks the running stage failed and records the error"""
+    jobs = IngestionJobService(db)
+    job = asyncio.run(jobs.create_job(user.id, "met.csv", "meteorological", 100))
+    asyncio.run(jobs.update_stage(job.id, "processing", 0.2))
+    asyncio.run(jobs.finish_job(job.id, {"status": "error", "error": "Bad header"}))
+
+    db.refresh(job)
+    assert job.status == IngestionStatus.FAILED and job.error_message == "Bad header"
+    assert job.dataset_id is None and job.progress == 30.0
+    assert _stage_statuses(jobs.job_summary(job))["processing"] == "failed"
+
+
+def test_jobs_with_lapsed_leases_fail_and_lose_their_spools(db, user, tmp_path):
+    """Test only jobs whose process stopped renewing their lease are failed"""
+    jobs = IngestionJobService(db)
+    spools = [tmp_path / name for name in ("lapsed", "other_process", "this_process", "done")]
+    for spool in spools:
+        spool.write_bytes(b"date,precipitation\n")
+    lapsed, other_process, this_process, done = [
+        asyncio.run(jobs.create_job(user.id, f"{spool.name}.csv", "meteorological", 20, str(spool)))
+        for spool in spools
+    ]
+    asyncio.run(jobs.update_stage(lapsed.id, "processing", 0.5))
+    asyncio.run(jobs.finish_job(done.id, {"status": "success", "dataset_id": str(user.id)}))
+
+    stale = datetime.utcnow() - timedelta(seconds=settings.INGEST_LEASE_SECONDS + 60)
+    # Jobs of processes that stopped, or that run elsewhere and renew their leases
+    ingestion_service._active_jobs.difference_update({lapsed.id, other_process.id})
+    for job in (lapsed, this_process, done):
+        job.heartbeat_at = stale
+    db.commit()
+
+    assert asyncio.run(jobs.fail_orphaned_jobs()) == 1
+
+    db.refresh(lapsed)
+    assert lapsed.status == IngestionStatus.FAILED and lapsed.error_message == INTERRUPTED_ERROR
+    assert _stage_statuses(jobs.job_summary(lapsed))["processing"] == "failed"
+    assert db.get(IngestionJob, other_process.id).status == IngestionStatus.QUEUED
+    assert db.get(IngestionJob, this_process.id).status == IngestionStatus.QUEUED
+    assert db.get(IngestionJob, done.id).status == IngestionStatus.COMPLETED
+    assert [spool.exists() for spool in spools] == [False, True, True, True]
+
+    # This process keeps its own job alive by renewing the lease
+    asyncio.run(jobs.renew_leases([this_process.id]))
+    db.refresh(this_process)
+    assert this_process.heartbeat_at > stale
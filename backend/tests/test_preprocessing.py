@@ -0,0 +1,57 @@
+import numpy as np
+import pandas as pd
+
+from app.services.preprocessing import fill_climatology, fill_linear, preprocess_series, season_keys
+from app.services.timeseries_store import SeriesBuilder, TimeSeriesStore
+
+
+def _build(directory, df: pd.DataFrame) -> str:
+    builder = SeriesBuilder(str(directory))
+    builder.append(df, "date", pd.to_datetime(df["date"]))
+    builder.close()
+    return str(directory)
+
+
+def test_regularize_and_fill_linear(tmp_path):
+    """Test irregular readings become a complete daily series"""
+    df = pd.DataFrame({
+        "date": ["2020-01-01 06:00", "2020-01-01 18:00", "2020-01-02 12:00", "2020-01-05 00:00"],
+        "rain": [1.0, 2.0, 4.0, 3.0],
+        "temp": [10.0, 12.0, 14.0, 20.0]
+    })
+    source = _build(tmp_path / "source", df)
+    meta = preprocess_series(source, str(tmp_path / "daily"), "daily", "linear", ["rain"])
+    store = TimeSeriesStore(str(tmp_path / "daily"))
+
+    assert [str(d) for d in store.index] == [f"2020-01-0{day}T00:00:00" for day in range(1, 6)]
+    assert store.read()["temp"].tolist() == [11.0, 14.0, 16.0, 18.0, 20.0]
+    assert store.read()["rain"].tolist()[:2] == [3.0, 4.0]
+    assert meta["preprocessing"]["filled"] == {"rain": 2, "temp": 2}
+
+
+def test_fill_climatology_uses_same_day_of_other_years():
+    """Test gaps take the mean of the same day of the year"""
+    grid = np.arange(np.datetime64("2019-01-01"), np.datetime64("2022-01-01"))
+    values = (np.arange(len(grid)) % 365).astype(float)
+    values[400] = np.nan
+    filled = fill_climatology(values, season_keys(grid, "daily"))
+    keys = season_keys(grid, "daily")
+    assert filled[400] == np.nanmean(values[keys == keys[400]])
+    assert fill_linear(np.array([np.nan, 1.0, np.nan, 3.0])).tolist() == [1.0, 1.0, 2.0, 3.0]
+
+
+def test_fill_regression_from_neighbour(tmp_path):
+    """Test gaps are filled from a correlated neighbouring station"""
+    dates = pd.date_range("2020-01-01", periods=60).strftime("%Y-%m-%d")
+    neighbour = np.linspace(0, 30, 60)
+    station = pd.DataFrame({"date": dates, "flow": 2 * neighbour + 1})
+    station = station.drop(index=range(20, 30))
+    source = _build(tmp_path / "station", station)
+    other = _build(tmp_path / "neighbour", pd.DataFrame({"date": dates, "discharge": neighbour}))
+
+    meta = preprocess_series(
+        source, str(tmp_path / "filled"), "daily", "regression", [], other, {"flow": "discharge"}
+    )
+    filled = TimeSeriesStore(str(tmp_path / "filled")).read()["flow"]
+    np.testing.assert_allclose(filled, 2 * neighbour + 1)
+    assert meta["preprocessing"]["r2"]["flow"] == 1.0
@@ -0,0 +1,66 @@
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.models.models import ResultBlob
+from app.services.result_store import ResultBlobStore
+
+
+@pytest.fixture
+def db():
+    engine = create_engine("sqlite://")
+    ResultBlob.__table__.create(engine)
+    session = sessionmaker(bind=engine)()
+    yield session
+    session.close()
+
+
+def _ref_count(db, content_hash):
+    blob = db.get(ResultBlob, content_hash)
+    db.refresh(blob)
+    return blob.ref_count
+
+
+def test_identical_payloads_share_a_blob(db):
+    """Test equal payloads are stored once, whatever their key order"""
+    store = ResultBlobStore(db)
+    first = store.put({"dates": ["2023-01-01"], "runoff": [1.5]})
+    second = store.put({"runoff": [1.5], "dates": ["2023-01-01"]})
+    other = store.put({"runoff": [2.5]})
+    db.commit()
+    
+    assert first == second != other
+    assert db.query(ResultBlob).count() == 2
+    assert _ref_count(db, first) == 2
+    assert _ref_count(db, other) == 1
+
+
+def test_release_deletes_blob_with_last_reference(db):
+    """Test a shared blob survives until its last reference is released"""
+    store = ResultBlobStore(db)
+    content_hash = store.put({"runoff": [1.0, 2.0]})
+    store.put({"runoff": [1.0, 2.0]})
+    db.commit()
+    
+    store.release([content_hash])
+    db.commit()
+    assert _ref_count(db, content_hash) == 1
+    
+    store.release([content_hash, None])
+    db.commit()
+    assert db.get(ResultBlob, content_hash) is None
+
+
+def test_release_counts_repeated_hashes(db):
+    """Test releasing a hash twice drops two references"""
+    store = ResultBlobStore(db)
+    content_hash = store.put({"total_runoff": 6.3})
+    store.put({"total_runoff": 6.3})
+    kept = store.put({"total_runoff": 7.0})
+    db.commit()
+    
+    store.release([content_hash, content_hash])
+    db.commit()
+    
+    assert db.get(ResultBlob, content_hash) is None
+    assert _ref_count(db, kept) == 1
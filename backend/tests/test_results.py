@@ -0,0 +1,189 @@
+from datetime import datetime
+from types import SimpleNamespace
+from uuid import UUID
+import os
+
+import numpy as np
+import pyarrow.parquet as pq
+import pytest
+from fastapi.testclient import TestClient
+from scipy.io import netcdf_file
+
+from tests.conftest import TestingSessionLocal
+from app.models.models import ModelType, Simulation, SimulationResult, SimulationStatus
+from app.services.export_service import ResultsExporter, latest_results
+
+
+@pytest.fixture
+def completed_simulation(authenticated_client: TestClient):
+    """Create a completed simulation with daily and annual results"""
+    user_id = UUID(authenticated_client.get("/api/v1/users/me").json()["id"])
+    
+    db = TestingSessionLocal()
+    simulation = Simulation(
+        name="Completed Simulation",
+        start_date=datetime(2023, 1, 1),
+        end_date=datetime(2023, 1, 3),
+        configuration={},
+        status=SimulationStatus.COMPLETED,
+        completed_at=datetime(2023, 2, 1),
+        owner_id=user_id
+    )
+    db.add(simulation)
+    db.commit()
+    
+    db.add_all([
+        SimulationResult(
+            simulation_id=simulation.id,
+            result_type="daily_results",
+            data={
+                "dates": ["2023-01-01", "2023-01-02", "2023-01-03"],
+                "precipitation": [10.0, 0.0, 5.5],
+                "runoff": [3.2, 1.1, 2.0]
+            }
+        ),
+        SimulationResult(
+            simulation_id=simulation.id,
+            result_type="annual_results",
+            data={"total_precipitation": 15.5, "total_runoff": 6.3}
+        )
+    ])
+    db.commit()
+    simulation_id = str(simulation.id)
+    db.close()
+    
+    return simulation_id
+
+
+def test_export_csv_streams_all_tabular_results(authenticated_client: TestClient, completed_simulation):
+    """Test CSV export contains one section per tabular result type"""
+    response = authenticated_client.get(f"/api/v1/results/{completed_simulation}/export/csv")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/csv")
+    
+    body = response.text
+    assert "dates,precipitation,runoff" in body
+    assert "2023-01-03,5.5,2.0" in body
+    assert "total_precipitation,total_runoff\n15.5,6.3" in body
+
+
+def test_results_conditional_get(authenticated_client: TestClient, completed_simulation):
+    """Test results are served with an ETag, always revalidated and answered with 304"""
+    url = f"/api/v1/results/{completed_simulation}"
+    
+    response = authenticated_client.get(url)
+    assert response.status_code == 200
+    assert response.headers["cache-control"] == "private, no-cache"
+    etag = response.headers["etag"]
+    
+    response = authenticated_client.get(url, headers={"If-None-Match": etag})
+    assert response.status_code == 304
+    assert response.content == b""
+
+
+def test_export_unsupported_format(authenticated_client: TestClient, completed_simulation):
+    """Test exporting in an unknown format"""
+    response = authenticated_client.get(f"/api/v1/results/{completed_simulation}/export/xlsx")
+    assert response.status_code == 400
+
+
+DAILY = {
+    "dates": ["2023-01-01", "2023-01-02", "2023-01-03"],
+    "precipitation": [10.0, 0.0, 5.5],
+    "runoff": [3.2, 1.1, 2.0]
+}
+
+ENSEMBLE = {
+    "dates": ["2023-01-01", "2023-01-02", "2023-01-03"],
+    "members": [
+        {"runoff": [1.0, 2.0, 3.0]},
+        {"runoff": [4.0, 5.0, 6.0]}
+    ]
+}
+
+
+def _exporter(payloads):
+    """An exporter reading payloads from a dict instead of the database"""
+    exporter = ResultsExporter(db=None, chunk_rows=2)
+    exporter.load_result_data = payloads.get
+    return exporter
+
+
+def _simulation():
+    return SimpleNamespace(
+        id="sim",
+        name="Export",
+        start_date=datetime(2023, 1, 1),
+        model_type=ModelType.PHYSICAL
+    )
+
+
+def test_latest_results_keeps_last_of_each_type():
+    """Test a re-run's results replace the earlier run's"""
+    refs = [("a", "daily_results"), ("b", "annual_results"), ("c", "daily_results")]
+    assert latest_results(refs) == [("b", "annual_results"), ("c", "daily_results")]
+
+
+@pytest.mark.parametrize("payload,expected", [
+    (DAILY, {"runoff": [3.2, 1.1, 2.0]}),
+    (ENSEMBLE, {"member": [0, 0, 0, 1, 1, 1], "runoff": [1.0, 2.0, 3.0, 4.0, 5.0, 6.0]})
+])
+def test_write_parquet(tmp_path, monkeypatch, payload, expected):
+    """Test Parquet exports of single runs and ensembles, written in row groups"""
+    monkeypatch.chdir(tmp_path)
+    path = _exporter({"r": payload}).write_parquet("r", "daily_results")
+    
+    table = pq.read_table(path).to_pandas()
+    os.remove(path)
+    
+    assert table["dates"].dt.strftime("%Y-%m-%d").tolist()[:3] == payload["dates"]
+    for name, values in expected.items():
+        assert table[name].tolist() == values
+
+
+def test_write_parquet_fills_variables_missing_from_members(tmp_path, monkeypatch):
+    """Test ensemble members with different variables share one schema with nulls"""
+    monkeypatch.chdir(tmp_path)
+    payload = {
+        "dates": ["2023-01-01", "2023-01-02", "2023-01-03"],
+        "members": [
+            {"runoff": [1.0, 2.0, 3.0]},
+            {"runoff": [4.0, 5.0, 6.0], "baseflow": [0.5, 0.6, 0.7]}
+        ]
+    }
+    path = _exporter({"r": payload}).write_parquet("r", "daily_results")
+    
+    table = pq.read_table(path)
+    os.remove(path)
+    
+    assert table.column_names == ["dates", "member", "runoff", "baseflow"]
+    assert table.column("baseflow").to_pylist() == [None, None, None, 0.5, 0.6, 0.7]
+    assert table.column("runoff").to_pylist() == [1.0, 2.0, 3.0, 4.0, 5.0, 6.0]
+
+
+@pytest.mark.parametrize("payload,shape", [(DAILY, (3,)), (ENSEMBLE, (2, 3))])
+def test_write_netcdf(tmp_path, monkeypatch, payload, shape):
+    """Test NetCDF exports of single runs and ensembles"""
+    monkeypatch.chdir(tmp_path)
+    exporter = _exporter({"r": payload, "a": {"total_runoff": 6.3}})
+    path = exporter.write_netcdf(_simulation(), [("r", "daily_results"), ("a", "annual_results")])
+    
+    nc = netcdf_file(path, "r", mmap=False)
+    assert nc.variables["time"][:].tolist() == [0.0, 1.0, 2.0]
+    assert nc.variables["runoff"].shape == shape
+    assert float(nc.variables["annual_total_runoff"].getValue()) == 6.3
+    nc.close()
+    os.remove(path)
+
+
+def test_write_netcdf_after_rerun(tmp_path, monkeypatch):
+    """Test a repeated result type is written once, from the latest run"""
+    monkeypatch.chdir(tmp_path)
+    rerun = {**DAILY, "runoff": [9.0, 9.0, 9.0]}
+    exporter = _exporter({"old": DAILY, "new": rerun})
+    path = exporter.write_netcdf(_simulation(), [("old", "daily_results"), ("new", "daily_results")])
+    
+    nc = netcdf_file(path, "r", mmap=False)
+    assert np.asarray(nc.variables["runoff"][:]).tolist() == [9.0, 9.0, 9.0]
+    nc.close()
+    os.remove(path)
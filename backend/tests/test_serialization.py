@@ -0,0 +1,44 @@
+import json
+
+import numpy as np
+
+from app.core import serialization
+from app.core.serialization import dumps, round_floats
+
+
+def test_round_floats_vectorizes_numeric_series():
+    """Test float series are rounded as arrays and integer series keep their type"""
+    rounded = round_floats({"runoff": [1.23456, float("nan")], "days": [1, 2, 3]}, 2)
+    
+    np.testing.assert_array_equal(rounded["runoff"], [1.23, np.nan])
+    assert rounded["days"].dtype.kind == "i"
+    assert json.loads(dumps(rounded)) == {"runoff": [1.23, None], "days": [1, 2, 3]}
+
+
+def test_round_floats_keeps_mixed_lists_intact():
+    """Test lists mixing numbers with other values are not coerced"""
+    assert round_floats([1, "2"], 2) == [1, "2"]
+    assert round_floats([1, True], 2) == [1, True]
+    assert round_floats([1.2345, None], 2) == [1.23, None]
+    assert round_floats([2 ** 70, 1.5], 2) == [2 ** 70, 1.5]
+
+
+def test_dumps_keeps_full_precision_by_default():
+    """Test small values survive serialization without a precision"""
+    assert json.loads(dumps({"flux": [0.000012, 1.0]})) == {"flux": [0.000012, 1.0]}
+
+
+def test_dumps_writes_non_finite_floats_as_null_without_orjson(monkeypatch):
+    """Test the standard json fallback writes NaN and infinities as null"""
+    monkeypatch.setattr(serialization, "ORJSON_AVAILABLE", False)
+    payload = {
+        "runoff": [1.5, float("nan")],
+        "flux": np.array([float("inf"), 2.0]),
+        "peak": np.float64("-inf"),
+        "rounded": [float("nan"), 0.123456]
+    }
+
+    encoded = dumps(payload)
+    assert b"NaN" not in encoded and b"Infinity" not in encoded
+    assert json.loads(encoded) == {"runoff": [1.5, None], "flux": [None, 2.0], "peak": None, "rounded": [None, 0.123456]}
+    assert json.loads(dumps(payload, precision=2))["rounded"] == [None, 0.12]
@@ -0,0 +1,56 @@
+from datetime import datetime
+import asyncio
+
+from app.models.models import Simulation, SimulationResult
+from app.services.simulation_service import SimulationService, extract_key_metrics
+
+
+def _simulation(db, user):
+    simulation = Simulation(
+        name="summary", start_date=datetime(2020, 1, 1), end_date=datetime(2020, 12, 31),
+        configuration={}, owner_id=user.id
+    )
+    db.add(simulation)
+    db.commit()
+    return simulation
+
+
+def _result(simulation, result_type, created_at, key_metrics=None, data=None):
+    return SimulationResult(
+        simulation_id=simulation.id, result_type=result_type, created_at=created_at,
+        key_metrics=key_metrics, data=data
+    )
+
+
+def test_summary_reads_the_latest_run(db, user):
+    """Test a re-run's results replace the earlier run's in the summary"""
+    simulation = _simulation(db, user)
+    first, second = datetime(2024, 1, 1), datetime(2024, 2, 1)
+    db.add_all([
+        _result(simulation, "annual_results", first, {"total_runoff": 100.0}),
+        _result(simulation, "daily_results", first),
+        _result(simulation, "annual_results", second, {"total_runoff": 250.0}),
+        _result(simulation, "daily_results", second),
+        # Saved before key metrics were materialized
+        _result(simulation, "indicators", second, data={"water_stress": 0.4})
+    ])
+    db.commit()
+
+    summary = asyncio.run(SimulationService(db).get_simulation_summary(simulation.id, user.id))
+
+    assert sorted(summary["results_available"]) == ["annual_results", "daily_results", "indicators"]
+    assert summary["key_metrics"]["annual"] == {"total_runoff": 250.0}
+    assert summary["key_metrics"]["indicators"] == {"water_stress": 0.4}
+
+
+def test_summary_of_simulation_without_results(db, user):
+    """Test a simulation with no results has no summary"""
+    simulation = _simulation(db, user)
+    assert asyncio.run(SimulationService(db).get_simulation_summary(simulation.id, user.id)) is None
+
+
+def test_extract_key_metrics():
+    """Test summaries keep only the compact metrics of each result type"""
+    assert extract_key_metrics("events", {"summary": {"count": 3}, "events": [1, 2, 3]}) == {"count": 3}
+    assert extract_key_metrics("daily_results", {"dates": []}) is None
+    assert extract_key_metrics("annual_results", None) is None
@@ -0,0 +1,106 @@
+import asyncio
+import os
+
+import boto3
+import pytest
+from moto import mock_s3
+
+from app.core.storage import LocalStorageBackend, S3StorageBackend
+
+
+async def _collect(chunks):
+    return b"".join([chunk async for chunk in chunks])
+
+
+def test_local_storage_round_trip(tmp_path):
+    """Test files are stored by key, streamed back and deleted"""
+    storage = LocalStorageBackend(str(tmp_path))
+    source = os.path.join(storage.staging_dir(), "upload.csv")
+    with open(source, "wb") as f:
+        f.write(b"date,flow\n" * 1000)
+    
+    asyncio.run(storage.put_file(source, "uploads/user/flow.csv"))
+    asyncio.run(storage.put_bytes("exports/sim/a.nc", b"netcdf"))
+    
+    assert not os.path.exists(source)
+    assert asyncio.run(storage.exists("uploads/user/flow.csv"))
+    assert asyncio.run(_collect(storage.iter_chunks("uploads/user/flow.csv", chunk_size=64))) == b"date,flow\n" * 1000
+    assert asyncio.run(storage.get_bytes("exports/sim/a.nc")) == b"netcdf"
+    assert storage.local_path("uploads/user/flow.csv") == os.path.join(str(tmp_path), "uploads/user/flow.csv")
+    
+    asyncio.run(storage.delete_prefix("exports/sim/"))
+    asyncio.run(storage.delete("uploads/user/flow.csv"))
+    assert not asyncio.run(storage.exists("exports/sim/a.nc"))
+    with pytest.raises(FileNotFoundError):
+        storage.local_path("uploads/user/flow.csv")
+
+
+def test_local_storage_writes_are_atomic(tmp_path):
+    """Test a rewrite replaces the file whole and leaves no temporary files"""
+    storage = LocalStorageBackend(str(tmp_path))
+    asyncio.run(storage.put_bytes("exports/sim/a.parquet", b"old"))
+    asyncio.run(storage.put_bytes("exports/sim/a.parquet", b"new"))
+    
+    assert os.listdir(tmp_path / "exports" / "sim") == ["a.parquet"]
+    assert asyncio.run(storage.get_bytes("exports/sim/a.parquet")) == b"new"
+
+
+@pytest.fixture
+def s3_storage(tmp_path, monkeypatch):
+    """S3 backend against moto's in-process stand-in for S3"""
+    monkeypatch.setenv("AWS_ACCESS_KEY_ID", "testing")
+    monkeypatch.setenv("AWS_SECRET_ACCESS_KEY", "testing")
+    with mock_s3():
+        boto3.client("s3", region_name="us-east-1").create_bucket(Bucket="mhia-test")
+        yield S3StorageBackend(bucket="mhia-test", cache_dir=str(tmp_path / "cache"), region="us-east-1")
+
+
+def test_s3_storage_round_trip(s3_storage, tmp_path):
+    """Test files are stored by key, streamed back and deleted"""
+    source = tmp_path / "upload.csv"
+    source.write_bytes(b"date,flow\n" * 1000)
+    
+    asyncio.run(s3_storage.put_file(str(source), "uploads/user/flow.csv"))
+    asyncio.run(s3_storage.put_bytes("exports/sim/a.nc", b"netcdf"))
+    
+    assert not source.exists()
+    assert asyncio.run(s3_storage.exists("uploads/user/flow.csv"))
+    assert asyncio.run(_collect(s3_storage.iter_chunks("uploads/user/flow.csv", chunk_size=64))) == b"date,flow\n" * 1000
+    assert asyncio.run(s3_storage.get_bytes("exports/sim/a.nc")) == b"netcdf"
+    
+    asyncio.run(s3_storage.delete("uploads/user/flow.csv"))
+    assert not asyncio.run(s3_storage.exists("uploads/user/flow.csv"))
+    with pytest.raises(FileNotFoundError):
+        asyncio.run(s3_storage.get_bytes("uploads/user/flow.csv"))
+    with pytest.raises(FileNotFoundError):
+        asyncio.run(_collect(s3_storage.iter_chunks("uploads/user/flow.csv")))
+
+
+def test_s3_storage_caches_local_copies(s3_storage):
+    """Test local paths are downloaded once and dropped when the key is deleted"""
+    asyncio.run(s3_storage.put_bytes("uploads/user/met.csv", b"date,precipitation_mm\n"))
+    
+    path = s3_storage.local_path("uploads/user/met.csv")
+    with open(path, "rb") as f:
+        assert f.read() == b"date,precipitation_mm\n"
+    assert s3_storage.local_path("uploads/user/met.csv") == path
+    
+    asyncio.run(s3_storage.delete("uploads/user/met.csv"))
+    assert not os.path.exists(path)
+    with pytest.raises(FileNotFoundError):
+        s3_storage.local_path("uploads/user/met.csv")
+    assert [name for name in os.listdir(os.path.dirname(path)) if name.startswith(".tmp-")] == []
+
+
+def test_s3_storage_deletes_prefix(s3_storage):
+    """Test prefix deletes remove every key under the prefix, and only those"""
+    for i in range(5):
+        asyncio.run(s3_storage.put_bytes(f"exports/sim/{i}.parquet", b"x"))
+    asyncio.run(s3_storage.put_bytes("exports/other/0.parquet", b"y"))
+    s3_storage.local_path("exports/sim/0.parquet")
+    
+    asyncio.run(s3_storage.delete_prefix("exports/sim/"))
+    
+    assert not any(asyncio.run(s3_storage.exists(f"exports/sim/{i}.parquet")) for i in range(5))
+    assert asyncio.run(s3_storage.exists("exports/other/0.parquet"))
+    assert not os.path.exists(os.path.join(s3_storage.cache_dir, "exports/sim/0.parquet"))
@@ -0,0 +1,50 @@
+import numpy as np
+import pandas as pd
+
+from app.services.timeseries_store import SeriesBuilder, TimeSeriesStore
+
+
+def _build(tmp_path, df: pd.DataFrame, chunk_rows: int = 50) -> TimeSeriesStore:
+    builder = SeriesBuilder(str(tmp_path / "series"))
+    for start in range(0, len(df), chunk_rows):
+        chunk = df.iloc[start:start + chunk_rows]
+        builder.append(chunk, "date", pd.to_datetime(chunk["date"], errors="coerce"))
+    assert builder.close()
+    return TimeSeriesStore(str(tmp_path / "series"))
+
+
+def test_range_reads_sorted_series(tmp_path):
+    """Test out-of-order rows are sorted and ranges include both ends"""
+    dates = pd.date_range("2020-01-01", periods=120).strftime("%Y-%m-%d").tolist()
+    df = pd.DataFrame({
+        "date": dates[60:] + dates[:60] + ["not a date"],
+        "precipitation_mm": list(range(60, 120)) + list(range(60)) + [999],
+        "station": "A"
+    })
+    store = _build(tmp_path, df)
+    
+    assert store.variables == ["precipitation_mm"]
+    assert len(store.index) == 120
+    
+    data = store.read(start="2020-02-01", end="2020-02-05")
+    assert data["precipitation_mm"].tolist() == [31, 32, 33, 34, 35]
+    assert str(data["dates"][0]) == "2020-02-01T00:00:00"
+    assert len(store.read(start="2021-01-01")["dates"]) == 0
+
+
+def test_resample_ignores_missing_values(tmp_path):
+    """Test monthly aggregates over a series with gaps"""
+    df = pd.DataFrame({
+        "date": pd.date_range("2020-01-01", "2020-03-31").strftime("%Y-%m-%d"),
+        "flow": 1.0
+    })
+    df.loc[df["date"].str.startswith("2020-02"), "flow"] = np.nan
+    df.loc[0, "flow"] = 32.0
+    store = _build(tmp_path, df)
+    
+    monthly = store.resample("monthly", "sum")
+    assert [str(d) for d in monthly["dates"]] == ["2020-01", "2020-02", "2020-03"]
+    assert monthly["flow"][0] == 62.0
+    assert np.isnan(monthly["flow"][1])
+    assert store.resample("monthly", "mean")["flow"][2] == 1.0
+    assert store.resample("annual", "max")["flow"].tolist() == [32.0]
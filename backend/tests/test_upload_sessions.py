@@ -0,0 +1,145 @@
+from datetime import datetime, timedelta
+import asyncio
+import hashlib
+import os
+
+import pytest
+
+from app.core.storage import LocalStorageBackend
+from app.models.models import IngestionJob, UploadSession, UploadSessionStatus, User
+from app.services import upload_sessions
+from app.services.upload_sessions import UploadOffsetMismatch, UploadSessionService, parse_content_range
+
+CONTENT = b"date,precipitation\n" + b"2000-01-01,1.5\n" * 20
+
+
+async def _stream(*chunks):
+    for chunk in chunks:
+        yield chunk
+
+
+@pytest.fixture
+def uploads(db, tmp_path, monkeypatch):
+    monkeypatch.setattr(upload_sessions, "storage", LocalStorageBackend(str(tmp_path / "storage")))
+    return UploadSessionService(db)
+
+
+def _create(uploads, user, sha256=None):
+    return asyncio.run(uploads.create_session(user.id, "met.csv", "meteorological", len(CONTENT), sha256))
+
+
+def _append(uploads, session, start, end, data, chunk_sha256=None):
+    return asyncio.run(uploads.append_chunk(session.id, session.owner_id, start, end, _stream(data), chunk_sha256))
+
+
+def test_parse_content_range():
+    """Test byte ranges parse to start and exclusive end offsets"""
+    assert parse_content_range("bytes 0-1023/4096", 4096) == (0, 1024)
+    assert parse_content_range("bytes 4000-4095/*", 4096) == (4000, 4096)
+
+
+@pytest.mark.parametrize("header", [
+    None,
+    "0-1023/4096",
+    "bytes 0-1023/5000",
+    "bytes 100-99/4096",
+    "bytes 4000-4096/4096",
+])
+def test_parse_content_range_rejects_invalid_ranges(header):
+    """Test malformed ranges and ranges outside the upload are rejected"""
+    with pytest.raises(ValueError):
+        parse_content_range(header, 4096)
+
+
+def test_chunks_append_and_complete(uploads, db, user):
+    """Test chunks sent in order complete to the original file and a job"""
+    session = _create(uploads, user, hashlib.sha256(CONTENT).hexdigest())
+    _append(uploads, session, 0, 100, CONTENT[:100])
+    session = _append(uploads, session, 100, len(CONTENT), CONTENT[100:])
+    assert session.received_bytes == len(CONTENT)
+
+    session, job = asyncio.run(uploads.complete(session.id, user.id))
+    assert session.status == UploadSessionStatus.COMPLETED
+    assert job["spool_path"] == session.spool_path and job["content_hash"] == hashlib.sha256(CONTENT).hexdigest()
+    with open(session.spool_path, "rb") as f:
+        assert f.read() == CONTENT
+    assert db.get(IngestionJob, job["job_id"]).spool_path == session.spool_path
+    # The parts are gone once joined
+    assert not asyncio.run(upload_sessions.storage.exists(upload_sessions.part_key(session.id, 0)))
+    # Completing again returns the same session without a new job
+    assert asyncio.run(uploads.complete(session.id, user.id))[1] is None
+
+
+def test_rejected_chunks_leave_the_offset_to_resume_from(uploads, user):
+    """Test short, corrupt and out-of-order chunks are resent from the committed offset"""
+    session = _create(uploads, user)
+    _append(uploads, session, 0, 100, CONTENT[:100])
+
+    with pytest.raises(UploadOffsetMismatch) as error:
+        _append(uploads, session, 200, 300, CONTENT[200:300])
+    assert error.value.offset == 100
+    with pytest.raises(ValueError, match="Content-Range declares"):
+        _append(uploads, session, 100, 200, CONTENT[100:150])
+    with pytest.raises(ValueError, match="checksum"):
+        _append(uploads, session, 100, 200, CONTENT[100:200], chunk_sha256="0" * 64)
+
+    session = asyncio.run(uploads.get_session(session.id, user.id))
+    assert session.received_bytes == 100
+    _append(uploads, session, 100, len(CONTENT), CONTENT[100:])
+    session, job = asyncio.run(uploads.complete(session.id, user.id))
+    with open(job["spool_path"], "rb") as f:
+        assert f.read() == CONTENT
+
+
+def test_complete_on_another_replica(uploads, user):
+    """Test an upload completes from stored parts when no local spool exists"""
+    session = _create(uploads, user)
+    _append(uploads, session, 0, len(CONTENT), CONTENT)
+    assert not os.path.exists(session.spool_path)
+
+    session, job = asyncio.run(uploads.complete(session.id, user.id))
+    with open(job["spool_path"], "rb") as f:
+        assert f.read() == CONTENT
+
+
+def test_missing_parts_restart_the_upload(uploads, user):
+    """Test completing without every part resets the upload instead of failing"""
+    session = _create(uploads, user)
+    _append(uploads, session, 0, 100, CONTENT[:100])
+    _append(uploads, session, 100, len(CONTENT), CONTENT[100:])
+    asyncio.run(upload_sessions.storage.delete(upload_sessions.part_key(session.id, 100)))
+
+    with pytest.raises(ValueError, match="missing"):
+        asyncio.run(uploads.complete(session.id, user.id))
+    session = asyncio.run(uploads.get_session(session.id, user.id))
+    assert session.received_bytes == 0 and session.status == UploadSessionStatus.UPLOADING
+    assert not asyncio.run(upload_sessions.storage.exists(upload_sessions.part_key(session.id, 0)))
+
+
+def test_cancel_removes_parts(uploads, user):
+    """Test cancelling an upload deletes what was received"""
+    session = _create(uploads, user)
+    _append(uploads, session, 0, 100, CONTENT[:100])
+
+    assert asyncio.run(uploads.cancel(session.id, user.id))
+    assert not asyncio.run(upload_sessions.storage.exists(upload_sessions.part_key(session.id, 0)))
+    assert asyncio.run(uploads.get_session(session.id, user.id)) is None
+
+
+def test_new_upload_sweeps_every_users_expired_uploads(uploads, db, user):
+    """Test uploads abandoned by other users are removed with their parts"""
+    other = User(email="other@example.com", username="other", hashed_password="x")
+    db.add(other)
+    db.commit()
+    abandoned = _create(uploads, other)
+    _append(uploads, abandoned, 0, 100, CONTENT[:100])
+    active = _create(uploads, other)
+    abandoned.expires_at = datetime.utcnow() - timedelta(minutes=1)
+    db.commit()
+    abandoned_id = abandoned.id
+
+    _create(uploads, user)
+
+    assert db.get(UploadSession, abandoned_id) is None
+    assert not asyncio.run(upload_sessions.storage.exists(upload_sessions.part_key(abandoned_id, 0)))
+    assert asyncio.run(uploads.get_session(active.id, other.id)) is not None
@@ -0,0 +1,96 @@
+import numpy as np
+import pandas as pd
+
+from app.services.water_balance import compute_water_balance, soil_bucket
+
+
+def _daily_series(days=400, seed=0):
+    rng = np.random.default_rng(seed)
+    dates = pd.date_range("2022-01-01", periods=days).strftime("%Y-%m-%d").tolist()
+    precipitation = rng.gamma(2, 3, days)
+    runoff = precipitation * 0.3
+    evapotranspiration = precipitation * 0.5
+    return dates, precipitation, runoff, evapotranspiration
+
+
+def test_balance_closes_when_storage_absorbs_the_difference():
+    """Test soil moisture storage changes close the balance"""
+    dates, precipitation, runoff, evapotranspiration = _daily_series()
+    storage_mm = np.cumsum(precipitation - runoff - evapotranspiration)
+    member = {
+        "precipitation": precipitation.tolist(),
+        "runoff": runoff.tolist(),
+        "evapotranspiration": evapotranspiration.tolist(),
+        "soil_moisture": (0.2 + storage_mm / 2000).tolist()
+    }
+    
+    balance = compute_water_balance(dates, [member], soil_depth_m=2, tolerance_percent=1, soil_moisture_unit="fraction")
+    
+    assert balance["storage_source"] == "soil_moisture"
+    assert balance["within_tolerance"] is True
+    assert abs(balance["balance_error_percent"]) < 0.1
+    assert balance["annual"]["years"] == [2022, 2023]
+    assert len(balance["monthly"]["months"]) == 14
+
+
+def test_unclosed_balance_is_flagged_per_member():
+    """Test a member losing water without a storage term violates the tolerance"""
+    dates, precipitation, runoff, evapotranspiration = _daily_series()
+    closed = {
+        "precipitation": precipitation.tolist(),
+        "runoff": runoff.tolist(),
+        "evapotranspiration": evapotranspiration.tolist(),
+        "infiltration": (precipitation * 0.2).tolist()
+    }
+    leaking = dict(closed, runoff=(runoff * 2).tolist())
+    
+    balance = compute_water_balance(dates, [closed, leaking], tolerance_percent=5)
+    
+    assert balance["storage_source"] == "infiltration"
+    assert balance["within_tolerance"] is False
+    assert abs(balance["balance_error_percent"][0]) < 1e-6
+    assert balance["balance_error_percent"][1] < -5
+    assert balance["years_over_tolerance"] == 2
+
+
+def test_soil_bucket_series_close_the_balance():
+    """Test runs whose evapotranspiration draws on a soil store in mm balance"""
+    dates, precipitation, runoff, _ = _daily_series()
+    rng = np.random.default_rng(1)
+    potential_evapotranspiration = np.maximum(0, precipitation * 0.4 + rng.normal(2, 0.5, len(dates)))
+    evapotranspiration, storage = soil_bucket(precipitation - runoff, potential_evapotranspiration)
+    member = {
+        "precipitation": np.round(precipitation, 2).tolist(),
+        "runoff": np.round(runoff, 2).tolist(),
+        "evapotranspiration": np.round(evapotranspiration, 2).tolist(),
+        "infiltration": np.round(precipitation - runoff, 2).tolist(),
+        "soil_moisture": np.round(storage, 2).tolist()
+    }
+    
+    balance = compute_water_balance(dates, [member], tolerance_percent=5, soil_moisture_unit="mm")
+    
+    assert np.all(evapotranspiration <= potential_evapotranspiration)
+    assert balance["storage_source"] == "soil_moisture"
+    assert balance["within_tolerance"] is True
+    assert abs(balance["balance_error_percent"]) < 1
+
+
+def test_soil_moisture_is_read_in_its_declared_unit():
+    """Test a dry run in mm is not mistaken for fractions, and unlabelled series are not guessed"""
+    dates = ["2022-01-01", "2022-01-02", "2022-01-03"]
+    member = {
+        "precipitation": [1.0, 0.0, 0.0],
+        "evapotranspiration": [0.2, 0.3, 0.4],
+        "soil_moisture": [0.8, 0.5, 0.1]
+    }
+    
+    in_mm = compute_water_balance(dates, [member], soil_depth_m=2, soil_moisture_unit="mm")
+    unlabelled = compute_water_balance(dates, [member], soil_depth_m=2)
+    
+    assert in_mm["change_soil_storage"] == -0.7
+    assert unlabelled["storage_source"] is None
+
+
+def test_missing_precipitation_skips_accounting():
+    """Test results without precipitation have no balance"""
+    assert compute_water_balance(["2022-01-01"], [{"runoff": [1.0]}]) is None
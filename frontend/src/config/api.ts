@@ -48,6 +48,11 @@ export const API_ENDPOINTS = {
     deleteDataset: (id: string) => `/api/v1/data-import/dataset/${id}`,
     linkToSimulation: (datasetId: string) => `/api/v1/data-import/dataset/${datasetId}/use-in-simulation`,
     statistics: '/api/v1/data-import/statistics',
+    jobs: '/api/v1/data-import/jobs',
+    job: (id: string) => `/api/v1/data-import/jobs/${id}`,
+    uploads: '/api/v1/data-import/uploads',
+    uploadSession: (id: string) => `/api/v1/data-import/uploads/${id}`,
+    completeUpload: (id: string) => `/api/v1/data-import/uploads/${id}/complete`,
   },
   
   // Health Check